@@ -2,38 +2,39 @@
 import os
 from fastapi import FastAPI
 from fastapi.responses import StreamingResponse, Response
-from scipy.io import wavfile
-import io
 import json
-from tts_engine import TTSEngine
+from typing import Optional
+from tts_output import encode_audio
+from tts_pool import TTSEnginePool
 
 app = FastAPI()
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
-tts_engine = TTSEngine(
+# 여러 로봇의 동시 요청: 엔진 replica 몇 개를 두고 요청마다 하나씩 빌려 씀
+# (replica별로 intra-op 스레드를 나눠서 세션/스레드 풀 경쟁을 없앰)
+# - replica마다 모델 전체가 올라가므로 크기는 명시적으로 작게 (TTS_POOL_SIZE, 기본 2)
+# - micro_batch: 같은 replica를 빌린 동시 요청들의 청크를 batch로 묶어서 추론
+tts_engine = TTSEnginePool(
     onnx_dir=os.path.join(BASE_DIR, "assets", "onnx"),
-    voice_style_path=os.path.join(BASE_DIR, "assets", "voice_styles", "M1.json")
+    voice_style_path=os.path.join(BASE_DIR, "assets", "voice_styles", "M1.json"),
+    size=int(os.environ.get("TTS_POOL_SIZE", "2")),
+    micro_batch=True
 )
 
 
 @app.post("/tts")
-def tts(text: str):
+def tts(text: str, voice: Optional[str] = None, sample_rate: Optional[int] = None):
     """
-    전체 텍스트를 한번에 처리해서 wav 파일 반환
+    전체 텍스트를 한번에 처리해서 wav(int16 PCM) 반환
+    - sample_rate 지정 시 해당 샘플레이트로 resampling (예: 16000, 48000)
     """
     print(f"📝 TTS 요청: {text[:50]}...")
     
-    # 전체 음성 생성
-    import tempfile
-    temp_file = os.path.join(tempfile.gettempdir(), "tts_output.wav")
-    tts_engine.synthesize(text, temp_file)
-    
-    # 파일 읽어서 반환
-    with open(temp_file, "rb") as f:
-        audio_data = f.read()
-    
-    os.remove(temp_file)
+    # 전체 음성 생성 → 메모리에서 바로 WAV bytes (임시 파일 없음)
+    audio_data = tts_engine.synthesize_audio(
+        text, format="wav", target_rate=sample_rate, voice=voice
+    )
     
     return Response(
         content=audio_data,
@@ -41,22 +42,50 @@ def tts(text: str):
         headers={"Content-Disposition": "attachment; filename=output.wav"}
     )
 
+
+@app.get("/voices")
+def voices():
+    """선택 가능한 voice 목록 (voice=F1 ... M5)"""
+    return {"default": tts_engine.default_voice, "voices": tts_engine.styles.names()}
+
+
+@app.get("/tts-stats")
+def tts_stats():
+    """
+    engine pool 상태 (사용 중인 replica, checkout 대기) + replica별 micro-batching 스케줄러
+    (queue depth, batch occupancy, padding ratio) + waveform 캐시 + tier별 RTF + 잘라낸 무음
+    """
+    return {
+        "pool": tts_engine.stats(),
+        "scheduler": tts_engine.scheduler_stats(),
+        "cache": tts_engine.cache_stats(),
+        "tiers": tts_engine.tier_stats(),
+        "trim": tts_engine.trim_stats(),
+    }
+
+
 @app.post("/tts-stream")
-def tts_stream(text: str):
+def tts_stream(
+    text: str,
+    voice: Optional[str] = None,
+    block_frames: Optional[int] = None,
+    sample_rate: Optional[int] = None
+):
     """
     문장 단위로 스트리밍 생성 및 전송
+    - block_frames 지정 시 문장 vocoding이 끝나기 전에 block 단위로 전송
+    - 청크마다 int16 WAV (sample_rate 지정 시 resampling)
     """
     print(f"📝 TTS 스트리밍 요청: {text[:50]}...")
     
     def generate():
-        for wav, idx in tts_engine.synthesize_streaming(text):
+        for wav, idx in tts_engine.synthesize_streaming(
+            text, voice=voice, block_frames=block_frames
+        ):
             print(f"   📤 [{idx}] 청크 전송 중...")
             
-            # wav를 bytes로 변환
-            buffer = io.BytesIO()
-            wavfile.write(buffer, tts_engine.sample_rate, wav)
-            buffer.seek(0)
-            chunk_data = buffer.read()
+            # wav를 bytes로 변환 (int16 → float32 대비 절반 크기)
+            chunk_data = encode_audio(wav, tts_engine.sample_rate, "wav", sample_rate)
             
             # 청크 크기와 데이터를 함께 전송
             chunk_size = len(chunk_data)
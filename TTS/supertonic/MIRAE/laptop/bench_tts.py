@@ -0,0 +1,1033 @@
+# bench_tts.py
+"""
+Supertonic TTS 성능 측정 스크립트
+
+사용법 (laptop 폴더에서):
+    python bench_tts.py text-encoding
+    python bench_tts.py normalize
+    python bench_tts.py batch --sizes 1 2 4 8 16
+    python bench_tts.py startup
+    python bench_tts.py coldstart
+    python bench_tts.py styles
+    python bench_tts.py ttfs --windows 8 16 32
+    python bench_tts.py tiers
+    python bench_tts.py quant --variant int8_dynamic --stages vector_estimator
+    python bench_tts.py pipeline --threads 1 4 2
+    python bench_tts.py fused
+    python bench_tts.py assembly --minutes 5 10 20
+    python bench_tts.py profile --ort-sample 0.1 --out-dir profile_out
+    python bench_tts.py pool --sizes 2 4 --clients 1 2 4 8 16
+    python bench_tts.py farm --workers 2 --load-threads 2
+    python bench_tts.py gaps --lookahead 0 1 2
+    python bench_tts.py trim --threshold-db -45 --margin-ms 40
+    python bench_tts.py sink --paragraphs 4 --out sink_out.wav
+    python bench_tts.py barge --after 0.5 1.0 --total-step 10
+    python bench_tts.py filler --threshold 0.35
+    python bench_tts.py --onnx-dir ../../assets/onnx text-encoding --repeat 200
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Optional
+
+import numpy as np
+
+from helper import (
+    ONNX_STAGES,
+    AudioBuffer,
+    SessionConfig,
+    SilenceTrimmer,
+    StageProfiler,
+    TextNormalizer,
+    VoiceStyleRegistry,
+    load_text_processor,
+    load_text_to_speech,
+    load_voice_style,
+)
+from quantize_models import KO_EVAL_SENTENCES
+from tts_pipeline import PIPELINE_STAGES, StagePipeline
+from tts_audio_sink import NullSink
+from tts_engine import TTSEngine
+from tts_filler import DEFAULT_FILLER_TEXTS, FillerBank, FillerScheduler
+from tts_output import wav_bytes
+from tts_policy import QUALITY_TIERS
+from tts_pool import TTSEnginePool
+from tts_workers import TTSWorkerFarm
+
+# MIRAE/laptop에서 2단계 위
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_ONNX_DIR = os.path.join(BASE_DIR, "assets", "onnx")
+DEFAULT_VOICE = os.path.join(BASE_DIR, "assets", "voice_styles", "M1.json")
+DEFAULT_FILLER_DIR = os.path.join(BASE_DIR, "assets", "fillers")
+INPUT_TXT = os.path.join(os.path.dirname(__file__), "..", "raspberrypi", "input.txt")
+
+
+def _load_korean_paragraphs() -> list[str]:
+    with open(INPUT_TXT, "r", encoding="utf-8") as f:
+        text = f.read()
+    return [p.strip() for p in text.split("\n") if p.strip()]
+
+
+def _load_tts(args):
+    tts = load_text_to_speech(args.onnx_dir, use_gpu=args.gpu)
+    style = load_voice_style([args.voice])
+    return tts, style
+
+
+def _measure(fn, repeat: int) -> float:
+    """repeat회 실행 후 1회당 평균 시간(ms)"""
+    fn()  # warmup
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+# --------------------------------------------------
+# text → id 인코딩
+# --------------------------------------------------
+def bench_text_encoding(args) -> None:
+    processor = load_text_processor(args.onnx_dir)
+    paragraphs = _load_korean_paragraphs()
+    # 긴 한국어 문단: input.txt 전체를 배치로 사용
+    preprocessed = [processor._preprocess_text(p, "ko") for p in paragraphs]
+    lengths = np.array([len(t) for t in preprocessed], dtype=np.int64)
+
+    def legacy():
+        text_ids = np.zeros((len(preprocessed), lengths.max()), dtype=np.int64)
+        for i, text in enumerate(preprocessed):
+            unicode_vals = np.array([ord(char) for char in text], dtype=np.uint16)
+            text_ids[i, : len(unicode_vals)] = np.array(
+                [processor.indexer[val] for val in unicode_vals], dtype=np.int64
+            )
+        return text_ids
+
+    def vectorized():
+        text_ids = np.zeros((len(preprocessed), lengths.max()), dtype=np.int64)
+        flat_ids = processor._encode(processor._text_to_unicode_values("".join(preprocessed)))
+        valid = np.arange(text_ids.shape[1]) < lengths[:, None]
+        text_ids[valid] = flat_ids
+        return text_ids
+
+    # 결과 동일성 확인 (legacy는 미등록 문자를 -1로 두므로 해당 위치만 제외)
+    ref, new = legacy(), vectorized()
+    known = ref >= 0
+    assert np.array_equal(ref[known], new[known]), "vectorized encoding mismatch"
+
+    legacy_ms = _measure(legacy, args.repeat)
+    vector_ms = _measure(vectorized, args.repeat)
+
+    print(f"문단 {len(preprocessed)}개, 총 {int(lengths.sum())}자")
+    print(f"  legacy     : {legacy_ms:8.3f} ms")
+    print(f"  vectorized : {vector_ms:8.3f} ms")
+    print(f"  speedup    : x{legacy_ms / vector_ms:.1f}")
+
+
+# --------------------------------------------------
+# 텍스트 정규화 (compiled + LRU)
+# --------------------------------------------------
+def bench_normalize(args) -> None:
+    paragraphs = _load_korean_paragraphs()
+    normalizer = TextNormalizer(cache_size=len(paragraphs))
+
+    def uncached():
+        for p in paragraphs:
+            TextNormalizer.normalize(p, "ko")
+
+    def cached():
+        for p in paragraphs:
+            normalizer(p, "ko")
+
+    uncached_ms = _measure(uncached, args.repeat)
+    cached_ms = _measure(cached, args.repeat)
+
+    print(f"문단 {len(paragraphs)}개 / 1회")
+    print(f"  compiled (miss) : {uncached_ms:8.3f} ms")
+    print(f"  LRU hit         : {cached_ms:8.3f} ms")
+    print(f"  cache           : {normalizer.cache_info()}")
+
+
+# --------------------------------------------------
+# 청크 batch 합성 처리량
+# --------------------------------------------------
+def bench_batch(args) -> None:
+    tts, style = _load_tts(args)
+    with open(INPUT_TXT, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    # 첫 호출은 warmup
+    tts(text, "ko", style, args.total_step)
+
+    base = None
+    print(f"입력 {len(text)}자, total_step={args.total_step}")
+    for bs in args.sizes:
+        start = time.perf_counter()
+        wav, dur = tts(text, "ko", style, args.total_step, batch_size=bs)
+        elapsed = time.perf_counter() - start
+        audio_sec = wav.shape[1] / tts.sample_rate
+        base = base or elapsed
+        print(
+            f"  batch={bs:2d}: {elapsed:7.2f}s, audio {audio_sec:6.1f}s, "
+            f"RTF {elapsed / audio_sec:.3f}, x{base / elapsed:.2f}"
+        )
+
+
+# --------------------------------------------------
+# 세션 로딩 시간 (캐시 없음 / cold 캐시 / cached)
+# --------------------------------------------------
+def bench_startup(args) -> None:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        runs = [
+            ("no cache", SessionConfig(cache=False)),
+            ("cold", SessionConfig(cache_dir=cache_dir)),
+            ("cached", SessionConfig(cache_dir=cache_dir)),
+        ]
+        results = []
+        for name, config in runs:
+            start = time.perf_counter()
+            tts = load_text_to_speech(args.onnx_dir, use_gpu=args.gpu, session_config=config)
+            results.append((name, time.perf_counter() - start, tts.load_stats))
+
+    for name, total, stats in results:
+        stages = ", ".join(
+            f"{stage} {s['seconds']:.2f}s({s['cache']})" for stage, s in stats.items()
+        )
+        print(f"  {name:8s}: {total:6.2f}s  [{stages}]")
+
+
+# --------------------------------------------------
+# cold start: 순차/병렬 로딩 + warmup 유무에 따른 첫 요청 지연
+# --------------------------------------------------
+def bench_coldstart(args) -> None:
+    style = load_voice_style([args.voice])
+    text = "안녕하세요! 오늘은 날씨가 정말 좋네요. 산책하러 가실래요?"
+
+    for parallel, warmup in [(False, False), (True, False), (True, True)]:
+        start = time.perf_counter()
+        tts = load_text_to_speech(args.onnx_dir, use_gpu=args.gpu, parallel_load=parallel)
+        load_sec = time.perf_counter() - start
+
+        warmup_sec = 0.0
+        if warmup:
+            warmup_sec = sum(tts.warmup(style))
+
+        start = time.perf_counter()
+        tts(text, "ko", style, 5)
+        first_sec = time.perf_counter() - start
+
+        print(
+            f"  parallel={parallel!s:5s} warmup={warmup!s:5s}: load {load_sec:6.2f}s, "
+            f"warmup {warmup_sec:6.2f}s, first request {first_sec * 1000:8.1f} ms"
+        )
+
+
+# --------------------------------------------------
+# voice style 로딩: JSON vs packed/mmap 레지스트리 (각각 새 프로세스에서 측정)
+# --------------------------------------------------
+def _rss_mb() -> float:
+    with open("/proc/self/statm", "r") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1 << 20)
+
+
+def _load_styles_child(mode: str, style_dir: str, out: "multiprocessing.Queue") -> None:
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    if mode == "json":
+        paths = sorted(
+            os.path.join(style_dir, f) for f in os.listdir(style_dir) if f.endswith(".json")
+        )
+        styles = [load_voice_style([p]) for p in paths]
+    else:
+        registry = VoiceStyleRegistry(style_dir)
+        styles = [registry.get(n) for n in registry.names()]
+    elapsed = time.perf_counter() - start
+    out.put((len(styles), elapsed, _rss_mb() - rss_before))
+
+
+def bench_styles(args) -> None:
+    style_dir = os.path.dirname(os.path.abspath(args.voice))
+    VoiceStyleRegistry(style_dir)  # packed 파일이 없으면 미리 변환
+
+    ctx = multiprocessing.get_context("spawn")
+    for mode in ("json", "packed"):
+        out = ctx.Queue()
+        proc = ctx.Process(target=_load_styles_child, args=(mode, style_dir, out))
+        proc.start()
+        n, elapsed, rss = out.get()
+        proc.join()
+        print(f"  {mode:6s}: {n} styles, {elapsed * 1000:8.2f} ms, RSS +{rss:6.2f} MB")
+
+
+# --------------------------------------------------
+# time-to-first-sample: 문장 단위 vocoding vs window 단위 streaming vocoding
+# --------------------------------------------------
+def bench_ttfs(args) -> None:
+    tts, style = _load_tts(args)
+    tts.encoder_cache = None  # 매 실행마다 dp/text encoder까지 포함해서 측정
+    sentence = (
+        "오늘은 날씨가 정말 좋아서 공원에 산책을 나가 보려고 하는데, "
+        "혹시 같이 가고 싶은 사람이 있다면 지금 바로 준비해서 현관 앞으로 나와 주세요."
+    )
+    tts.warmup(style)
+
+    def first_sample(window: Optional[int]) -> float:
+        start = time.perf_counter()
+        if window is None:
+            tts(sentence, "ko", style, args.total_step)
+        else:
+            next(tts.stream(sentence, "ko", style, args.total_step, window_frames=window,
+                            overlap_frames=max(1, window // 4)))
+        return time.perf_counter() - start
+
+    print(f"문장 {len(sentence)}자, total_step={args.total_step}")
+    base = np.median([first_sample(None) for _ in range(args.repeat)])
+    print(f"  sentence      : {base * 1000:8.1f} ms")
+    for window in args.windows:
+        t = np.median([first_sample(window) for _ in range(args.repeat)])
+        print(f"  window={window:3d}    : {t * 1000:8.1f} ms (x{base / t:.2f})")
+
+
+# --------------------------------------------------
+# 품질 tier별 RTF / 첫 문장 지연 (adaptive 정책의 기준값)
+# --------------------------------------------------
+def bench_tiers(args) -> None:
+    tts, style = _load_tts(args)
+    tts.encoder_cache = None
+    paragraphs = _load_korean_paragraphs()
+    first_sentence = "안녕하세요! 오늘은 날씨가 정말 좋네요."
+    tts.warmup(style)
+
+    for tier, steps in QUALITY_TIERS.items():
+        synth_sec = audio_sec = 0.0
+        for p in paragraphs:
+            start = time.perf_counter()
+            wav, _ = tts(p, "ko", style, steps)
+            synth_sec += time.perf_counter() - start
+            audio_sec += wav.shape[1] / tts.sample_rate
+
+        first = np.median([
+            _measure(lambda: tts(first_sentence, "ko", style, steps), 1)
+            for _ in range(args.repeat)
+        ])
+        print(
+            f"  {tier:8s} (total_step={steps}): RTF {synth_sec / audio_sec:.3f}, "
+            f"first sentence {first:8.1f} ms"
+        )
+
+
+# --------------------------------------------------
+# INT8 양자화 모델: FP32 대비 RTF / waveform·mel 거리
+# --------------------------------------------------
+def _mel_filterbank(sr: int, n_fft: int, n_mels: int) -> np.ndarray:
+    def hz_to_mel(f):
+        return 2595.0 * np.log10(1.0 + f / 700.0)
+
+    def mel_to_hz(m):
+        return 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(0.0), hz_to_mel(sr / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / sr).astype(int)
+    fb = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        lo, mid, hi = bins[m - 1], bins[m], bins[m + 1]
+        if mid > lo:
+            fb[m - 1, lo:mid] = (np.arange(lo, mid) - lo) / (mid - lo)
+        if hi > mid:
+            fb[m - 1, mid:hi] = (hi - np.arange(mid, hi)) / (hi - mid)
+    return fb
+
+
+def _log_mel(wav: np.ndarray, fb: np.ndarray, n_fft: int = 1024, hop: int = 256) -> np.ndarray:
+    n_frames = max(1, 1 + (len(wav) - n_fft) // hop)
+    wav = np.pad(wav, (0, max(0, n_fft - len(wav))))
+    frames = np.lib.stride_tricks.sliding_window_view(wav, n_fft)[::hop][:n_frames]
+    spec = np.abs(np.fft.rfft(frames * np.hanning(n_fft), axis=1)) ** 2
+    return np.log(spec @ fb.T + 1e-6)
+
+
+def bench_quant(args) -> None:
+    style = load_voice_style([args.voice])
+    variants = {stage: args.variant for stage in args.stages}
+    runs = [
+        # fused=False: 두 쪽 모두 같은 stage별 경로로 돌려 모델 차이만 비교
+        ("fp32", load_text_to_speech(
+            args.onnx_dir, use_gpu=False, encoder_cache_bytes=0, fused=False
+        )),
+        (args.variant, load_text_to_speech(
+            args.onnx_dir, use_gpu=False, encoder_cache_bytes=0, stage_variants=variants,
+            fused=False,
+        )),
+    ]
+    sr = runs[0][1].sample_rate
+    fb = _mel_filterbank(sr, 1024, 80)
+
+    # 같은 seed → 같은 초기 noise (길이가 같을 때)로 모델 차이만 비교
+    outputs = {}
+    for name, tts in runs:
+        tts.warmup(style)
+        wavs, synth_sec = [], 0.0
+        for i, sentence in enumerate(KO_EVAL_SENTENCES):
+            start = time.perf_counter()
+            wav, _ = tts(sentence, "ko", style, args.total_step, seed=i)
+            synth_sec += time.perf_counter() - start
+            wavs.append(wav[0])
+        audio_sec = sum(len(w) for w in wavs) / sr
+        outputs[name] = (wavs, synth_sec / audio_sec)
+
+    ref_wavs, ref_rtf = outputs["fp32"]
+    q_wavs, q_rtf = outputs[args.variant]
+
+    snr, mel_l1, len_diff = [], [], []
+    for ref, q in zip(ref_wavs, q_wavs):
+        n = min(len(ref), len(q))
+        noise = np.sum((ref[:n] - q[:n]) ** 2) + 1e-12
+        snr.append(10 * np.log10(np.sum(ref[:n] ** 2) / noise + 1e-12))
+        mel_ref, mel_q = _log_mel(ref[:n], fb), _log_mel(q[:n], fb)
+        mel_l1.append(np.mean(np.abs(mel_ref - mel_q)))
+        len_diff.append(abs(len(ref) - len(q)) / sr * 1000)
+
+    print(f"문장 {len(KO_EVAL_SENTENCES)}개, total_step={args.total_step}, {args.variant}: {args.stages}")
+    print(f"  {'RTF fp32':18s}: {ref_rtf:.3f}")
+    print(f"  {'RTF ' + args.variant:18s}: {q_rtf:.3f} (x{ref_rtf / q_rtf:.2f})")
+    print(f"  {'waveform SNR':18s}: {np.mean(snr):6.2f} dB (min {np.min(snr):.2f})")
+    print(f"  {'log-mel L1':18s}: {np.mean(mel_l1):6.3f} (max {np.max(mel_l1):.3f})")
+    print(f"  {'duration diff':18s}: {np.mean(len_diff):6.1f} ms (max {np.max(len_diff):.1f})")
+
+
+# --------------------------------------------------
+# stage 파이프라인: 긴 입력의 청크 순차 처리 vs encode/denoise/vocode 겹쳐 실행
+# --------------------------------------------------
+def bench_pipeline(args) -> None:
+    enc, den, voc = args.threads
+    config = StagePipeline.session_config(enc, den, voc)
+    tts = load_text_to_speech(
+        args.onnx_dir, use_gpu=args.gpu, session_config=config, encoder_cache_bytes=0
+    )
+    style = load_voice_style([args.voice])
+    with open(INPUT_TXT, "r", encoding="utf-8") as f:
+        text = " ".join([f.read().strip()] * args.text_repeat)
+    tts.warmup(style)
+
+    pipeline = StagePipeline(tts, queue_size=args.queue_size)
+    print(f"입력 {len(text)}자, total_step={args.total_step}, threads enc/den/voc={enc}/{den}/{voc}")
+
+    base = None
+    for name, pl in (("sequential", None), ("pipeline", pipeline)):
+        tts.pipeline = pl
+        pipeline.reset_stats()
+        start = time.perf_counter()
+        wav, _ = tts(text, "ko", style, args.total_step, seed=0)
+        elapsed = time.perf_counter() - start
+        audio_sec = wav.shape[1] / tts.sample_rate
+        base = base or elapsed
+        print(
+            f"  {name:10s}: {elapsed:7.2f}s, {audio_sec / elapsed:6.2f} audio-s/s, "
+            f"RTF {elapsed / audio_sec:.3f}, x{base / elapsed:.2f}"
+        )
+
+    stats = pipeline.stats()
+    for stage in PIPELINE_STAGES:
+        s = stats[stage]
+        print(
+            f"    {stage:8s}: {s['items']:3d} chunks, busy {s['busy_sec']:6.2f}s, "
+            f"utilization {s['utilization'] * 100:5.1f}%"
+        )
+    pipeline.close()
+
+
+# --------------------------------------------------
+# denoising loop: Python loop (total_step회 run) vs ONNX Loop 1회 run (CPU)
+# --------------------------------------------------
+def bench_fused(args) -> None:
+    tts = load_text_to_speech(args.onnx_dir, use_gpu=False, encoder_cache_bytes=0)
+    style = load_voice_style([args.voice])
+    fused_denoise, fused_vocoder = tts.fused_denoise_ort, tts.fused_vocoder_ort
+    if fused_denoise is None and fused_vocoder is None:
+        print("fused 그래프가 없습니다 (python fuse_denoise_loop.py [--with-vocoder] 먼저 실행)")
+        return
+
+    paths = [("python loop", None, None)]
+    if fused_denoise is not None:
+        paths.append(("fused loop", fused_denoise, None))
+    if fused_vocoder is not None:
+        paths.append(("fused+vocoder", None, fused_vocoder))
+
+    print(f"문장 {len(KO_EVAL_SENTENCES)}개 (청크 1개씩), total_step={args.total_step}, CPU")
+    base = None
+    for name, denoise_sess, vocoder_sess in paths:
+        tts.fused_denoise_ort, tts.fused_vocoder_ort = denoise_sess, vocoder_sess
+        per_chunk = [
+            _measure(lambda: tts._infer([s], ["ko"], style, args.total_step), args.repeat)
+            for s in KO_EVAL_SENTENCES
+        ]
+        ms = float(np.median(per_chunk))
+        base = base or ms
+        print(f"  {name:14s}: {ms:8.2f} ms/chunk (x{base / ms:.2f})")
+
+
+# --------------------------------------------------
+# 긴 텍스트 출력 조립: 반복 np.concatenate vs AudioBuffer (모델 없이 청크 길이만 재현)
+# --------------------------------------------------
+def bench_assembly(args) -> None:
+    sr = 44100
+    gap = int(0.3 * sr)
+    rng = np.random.default_rng(0)
+
+    def legacy(chunks):
+        wav_cat = None
+        for wav in chunks:
+            if wav_cat is None:
+                wav_cat = wav
+            else:
+                silence = np.zeros((1, gap), dtype=np.float32)
+                wav_cat = np.concatenate([wav_cat, silence, wav], axis=1)
+        return wav_cat
+
+    def buffered(chunks):
+        # 첫 청크 길이 기준 추정 (join_chunks와 같은 방식)
+        buf = AudioBuffer(int(chunks[0].shape[1] * len(chunks) * 1.1) + gap * len(chunks))
+        for i, wav in enumerate(chunks):
+            if i:
+                buf.append_silence(gap)
+            buf.append(wav)
+        return buf.finalize()[None, :]
+
+    def run(fn, chunks) -> tuple[float, float]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        fn(chunks)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak / (1 << 20)
+
+    for minutes in args.minutes:
+        # 청크 1개 ≈ 한국어 120자 ≈ 5~9초
+        chunks, total = [], 0
+        while total < minutes * 60 * sr:
+            n = int(rng.uniform(5, 9) * sr)
+            chunks.append(rng.standard_normal((1, n), dtype=np.float32) * 0.1)
+            total += n + gap
+        audio_mb = total * 4 / (1 << 20)
+
+        assert np.array_equal(legacy(chunks), buffered(chunks))
+        print(f"{minutes}분 ({len(chunks)} 청크, 출력 {audio_mb:.1f} MB)")
+        for name, fn in (("concatenate", legacy), ("AudioBuffer", buffered)):
+            elapsed, peak = run(fn, chunks)
+            print(f"  {name:12s}: {elapsed * 1000:9.1f} ms, peak +{peak:7.1f} MB")
+
+
+# --------------------------------------------------
+# stage별 시간 분해 (StageProfiler) + profiler 자체 overhead
+# --------------------------------------------------
+def bench_profile(args) -> None:
+    tts = load_text_to_speech(args.onnx_dir, use_gpu=args.gpu, encoder_cache_bytes=0)
+    style = load_voice_style([args.voice])
+    tts.warmup(style)
+
+    def run() -> None:
+        for sentence in KO_EVAL_SENTENCES:
+            tts(sentence, "ko", style, args.total_step, seed=0)
+
+    profiler = StageProfiler(ort_profile_dir=args.out_dir, seed=0)
+    off = _measure(run, args.repeat)
+    tts.profiler = profiler
+    on = _measure(run, args.repeat)
+
+    # 기록은 overhead 측정 이후의 1회만 남김 (ORT profiling 샘플링도 이때만)
+    profiler.clear()
+    profiler.ort_sample_rate = args.ort_sample
+    run()
+
+    print(f"문장 {len(KO_EVAL_SENTENCES)}개, total_step={args.total_step}")
+    print(f"  profiler off: {off:8.2f} ms, on: {on:8.2f} ms (overhead {(on / off - 1) * 100:+.2f}%)")
+    for stage, s in profiler.summary().items():
+        print(
+            f"  {stage:20s}: {s['count']:4d}회, total {s['total_ms']:8.2f} ms, "
+            f"mean {s['mean_ms']:7.2f} / p95 {s['p95_ms']:7.2f} / max {s['max_ms']:7.2f} ms"
+        )
+    padding = [r["args"]["padding_ratio"] for r in profiler.records() if r["stage"] == "preprocess"]
+    print(f"  padding 비율 평균: {np.mean(padding) * 100:.1f}%")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    profiler.dump_json(os.path.join(args.out_dir, "stages.json"))
+    profiler.dump_chrome_trace(os.path.join(args.out_dir, "trace.json"))
+    print(f"  저장: {args.out_dir}/stages.json, {args.out_dir}/trace.json (chrome://tracing)")
+    for path in tts.end_ort_profiling():
+        print(f"  ORT profile: {path}")
+
+
+# --------------------------------------------------
+# 동시 요청 처리량: 엔진 1개 공유 vs TTSEnginePool (replica별 스레드 분할)
+# --------------------------------------------------
+def bench_pool(args) -> None:
+    cores = os.cpu_count() or 1
+
+    def run_clients(checkout, clients: int) -> tuple[float, float, float]:
+        """clients개 스레드가 각각 args.requests번 합성 → (audio-s/s, p50 ms, p95 ms)"""
+        latencies, audio = [], [0.0]
+        lock = threading.Lock()
+
+        def client(cid: int) -> None:
+            for i in range(args.requests):
+                sentence = KO_EVAL_SENTENCES[(cid + i) % len(KO_EVAL_SENTENCES)]
+                start = time.perf_counter()
+                with checkout() as engine:
+                    wav, _ = engine.tts(sentence, "ko", engine.voice_style, args.total_step)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed * 1000)
+                    audio[0] += wav.shape[1] / engine.sample_rate
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            list(pool.map(client, range(clients)))
+        wall = time.perf_counter() - start
+        return audio[0] / wall, float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95))
+
+    setups = [("single engine", lambda: TTSEngine(
+        args.onnx_dir, args.voice, cache_bytes=0
+    ))]
+    for size in args.sizes:
+        setups.append((f"pool x{size}", lambda size=size: TTSEnginePool(
+            args.onnx_dir, args.voice, size=size, cache_bytes=0
+        )))
+
+    print(f"코어 {cores}개, 요청 = 한국어 문장 1개, client당 {args.requests}회, total_step={args.total_step}")
+    for name, make in setups:
+        target = make()
+        if isinstance(target, TTSEnginePool):
+            checkout = target.checkout
+            print(f"{name} ({target.threads_per_engine} threads/replica)")
+        else:
+            checkout = lambda engine=target: nullcontext(engine)
+            print(f"{name} (ORT 기본 스레드, 모든 client가 공유)")
+        for clients in args.clients:
+            throughput, p50, p95 = run_clients(checkout, clients)
+            print(
+                f"  {clients:2d} clients: {throughput:7.2f} audio-s/s, "
+                f"latency p50 {p50:8.1f} / p95 {p95:8.1f} ms"
+            )
+        if isinstance(target, TTSEnginePool):
+            stats = target.stats()
+            print(f"  checkout 평균 대기 {stats['avg_wait_ms']:.1f} ms, 최대 {stats['max_wait_ms']:.1f} ms")
+        del target
+
+
+# --------------------------------------------------
+# ASR 메시지 지연: TTS 부하 없음 vs 같은 프로세스 TTS vs worker farm
+# (WhisperLiveKit 대신 20ms마다 PCM 프레임 + JSON 결과를 처리하는 asyncio handler로 재현)
+# --------------------------------------------------
+def _asr_message_latency(seconds: float, interval: float = 0.02) -> list[float]:
+    """예정 시각 대비 handler 완료까지의 지연(ms) 목록"""
+    frame = (np.random.default_rng(0).standard_normal(int(16000 * interval)) * 3000).astype(np.int16)
+
+    def handle() -> None:
+        pcm = frame.astype(np.float32) / 32768.0
+        msg = {"type": "transcript", "text": "안녕하세요 " * 8, "rms": float(np.sqrt((pcm ** 2).mean()))}
+        json.loads(json.dumps(msg, ensure_ascii=False))
+
+    async def run() -> list[float]:
+        latencies = []
+        loop = asyncio.get_running_loop()
+        due = loop.time()
+        end = due + seconds
+        while due < end:
+            due += interval
+            await asyncio.sleep(max(0.0, due - loop.time()))
+            handle()
+            latencies.append((loop.time() - due) * 1000)
+        return latencies
+
+    return asyncio.run(run())
+
+
+def bench_farm(args) -> None:
+    def with_load(synth) -> list[float]:
+        stop = threading.Event()
+
+        def load(i: int) -> None:
+            while not stop.is_set():
+                synth(KO_EVAL_SENTENCES[i % len(KO_EVAL_SENTENCES)])
+
+        threads = [threading.Thread(target=load, args=(i,)) for i in range(args.load_threads)]
+        for t in threads:
+            t.start()
+        try:
+            return _asr_message_latency(args.seconds)
+        finally:
+            stop.set()
+            for t in threads:
+                t.join()
+
+    def report(name: str, latencies: list[float]) -> None:
+        lat = np.asarray(latencies)
+        print(
+            f"  {name:16s}: p50 {np.percentile(lat, 50):6.2f} / p95 {np.percentile(lat, 95):6.2f} / "
+            f"p99 {np.percentile(lat, 99):6.2f} / max {lat.max():7.2f} ms"
+        )
+
+    print(f"ASR 메시지 20ms 간격, {args.seconds:.0f}초, TTS 부하 스레드 {args.load_threads}개")
+    report("TTS 없음", _asr_message_latency(args.seconds))
+
+    engine = TTSEngine(args.onnx_dir, args.voice, cache_bytes=0)
+    report("같은 프로세스", with_load(
+        lambda s: engine.tts(s, "ko", engine.voice_style, args.total_step)
+    ))
+    del engine
+
+    farm = TTSWorkerFarm(args.onnx_dir, args.voice, workers=args.workers, cache_bytes=0)
+    report(f"worker farm x{args.workers}", with_load(
+        lambda s: farm.synthesize_array(s, total_step=args.total_step)
+    ))
+    for w in farm.stats()["workers"]:
+        print(f"    worker {w['id']} (pid {w['pid']}): {w['completed']}건 완료, 재시작 {w['restarts']}회")
+    farm.close()
+
+
+# --------------------------------------------------
+# 재생 쪽 청크 간 공백: synthesize_streaming lookahead별
+# (청크마다 오디오 길이만큼 블로킹 재생하는 소비자로 재현)
+# --------------------------------------------------
+def bench_gaps(args) -> None:
+    engine = TTSEngine(args.onnx_dir, args.voice, cache_bytes=0, pipeline=args.pipeline)
+    text = " ".join(_load_korean_paragraphs()[: args.paragraphs])
+    print(f"입력 {len(text)}자, pipeline={args.pipeline}, total_step={args.total_step}")
+
+    for lookahead in args.lookahead:
+        gaps = []
+        start = time.perf_counter()
+        first = played_until = None
+        for wav, _ in engine.synthesize_streaming(
+            text, total_step=args.total_step, lookahead=lookahead
+        ):
+            now = time.perf_counter()
+            if first is None:
+                first = now - start
+            else:
+                gaps.append(max(0.0, now - played_until) * 1000)
+            time.sleep(len(wav) / engine.sample_rate)  # 재생
+            played_until = time.perf_counter()
+
+        gaps = np.asarray(gaps) if gaps else np.zeros(1)
+        print(
+            f"  lookahead {lookahead}: 첫 청크 {first * 1000:7.1f} ms, "
+            f"공백 합계 {gaps.sum():8.1f} ms / 최대 {gaps.max():7.1f} ms / "
+            f"10ms 초과 {int((gaps > 10).sum())}회"
+        )
+
+
+# --------------------------------------------------
+# 청크 앞뒤 무음 trim: 잘린 길이 / 줄어든 전송 bytes(int16) / trim 시간
+# --------------------------------------------------
+def bench_trim(args) -> None:
+    tts, style = _load_tts(args)
+    trimmer = SilenceTrimmer(
+        tts.sample_rate, threshold_db=args.threshold_db, margin_ms=args.margin_ms
+    )
+    print(f"threshold {args.threshold_db} dBFS, margin {args.margin_ms} ms, total_step={args.total_step}")
+
+    before = after = 0
+    trim_ms = []
+    for sentence in KO_EVAL_SENTENCES:
+        wav, _ = tts(sentence, "ko", style, args.total_step, seed=0)
+        wav = wav[0]
+        start = time.perf_counter()
+        start_idx, end_idx = trimmer.bounds(wav)
+        trim_ms.append((time.perf_counter() - start) * 1000)
+
+        head = start_idx / tts.sample_rate * 1000
+        tail = (len(wav) - end_idx) / tts.sample_rate * 1000
+        before += len(wav)
+        after += end_idx - start_idx
+        print(f"  {sentence[:20]:20s}: 앞 {head:6.1f} ms / 뒤 {tail:6.1f} ms 제거")
+
+    print(
+        f"  전송량(int16): {before * 2 / 1024:.1f} KB → {after * 2 / 1024:.1f} KB "
+        f"({(1 - after / before) * 100:.1f}% 감소), 검출 {np.mean(trim_ms):.3f} ms/청크"
+    )
+
+
+# --------------------------------------------------
+# 재생 경로: 청크마다 WAV bytes + 재생 프로세스 vs 계속 열린 sink(ring buffer)
+# --------------------------------------------------
+def bench_sink(args) -> None:
+    engine = TTSEngine(args.onnx_dir, args.voice, cache_bytes=0, pipeline=True)
+    text = " ".join(_load_korean_paragraphs()[: args.paragraphs])
+    sr = engine.sample_rate
+    print(f"입력 {len(text)}자, total_step={args.total_step}")
+
+    # 청크마다 재생 프로세스를 새로 띄우는 비용 (장치 open 포함, aplay가 있을 때만)
+    if shutil.which("aplay"):
+        silence = wav_bytes(np.zeros(sr // 100, dtype=np.int16), sr)
+        spawn_ms = []
+        for _ in range(5):
+            start = time.perf_counter()
+            subprocess.run(["aplay", "-q", "-"], input=silence, check=False)
+            spawn_ms.append((time.perf_counter() - start) * 1000)
+        print(f"  청크마다 aplay: 프로세스 시작~종료 {np.median(spawn_ms):.1f} ms/청크 (10ms 무음 기준)")
+    else:
+        print("  aplay 없음 → 청크당 프로세스 비용 측정 생략")
+
+    sink = NullSink(sr, path=args.out, realtime=True)
+    start = time.perf_counter()
+    first = None
+    chunks = 0
+    for wav, _ in engine.synthesize_streaming(
+        text, total_step=args.total_step, buffered_sec=lambda: sink.buffered_sec
+    ):
+        if first is None:
+            first = time.perf_counter() - start
+        chunks += 1
+        sink.write(wav)
+    sink.end_of_stream()
+    sink.drain()
+    total = time.perf_counter() - start
+    stats = sink.stats()
+
+    # 중단 지연: 버퍼가 찬 상태에서 clear → 더 이상 꺼내지 않을 때까지
+    sink.write(np.zeros(sr * 2, dtype=np.float32))
+    start = time.perf_counter()
+    sink.clear()
+    clear_ms = (time.perf_counter() - start) * 1000
+    sink.close()
+
+    print(
+        f"  sink: 청크 {chunks}개, 첫 청크 {first * 1000:.1f} ms, "
+        f"재생 {stats['played_sec']:.2f}s / 경과 {total:.2f}s"
+    )
+    print(
+        f"  underrun {stats['underruns']}회 ({stats['underrun_sec'] * 1000:.1f} ms), "
+        f"최대 buffer {stats['max_buffered_sec']:.2f}s, "
+        f"장치 latency {stats['device_latency_sec'] * 1000:.0f} ms, clear {clear_ms:.3f} ms"
+    )
+    if args.out:
+        print(f"  재생된 오디오(underrun 무음 포함): {args.out}")
+
+
+# --------------------------------------------------
+# barge-in: stop → 무음 / stop → 합성 중단 (cancel 없이 문장 끝까지 vs denoising step 사이 취소)
+# --------------------------------------------------
+def bench_barge(args) -> None:
+    engine = TTSEngine(args.onnx_dir, args.voice, cache_bytes=0)
+    text = " ".join(_load_korean_paragraphs()[: args.paragraphs])
+    print(f"입력 {len(text)}자, total_step={args.total_step} (lookahead 0: 합성은 producer 스레드에서만)")
+
+    for use_cancel in (False, True):
+        silence_ms, abort_ms = [], []
+        for after in args.after:
+            sink = NullSink(engine.sample_rate)
+            stop = threading.Event()
+
+            def produce() -> None:
+                for wav, _ in engine.synthesize_streaming(
+                    text,
+                    total_step=args.total_step,
+                    lookahead=0,
+                    cancel=stop if use_cancel else None,
+                ):
+                    if stop.is_set() or not sink.write(wav):
+                        break
+
+            producer = threading.Thread(target=produce)
+            producer.start()
+            time.sleep(after)
+
+            start = time.perf_counter()
+            stop.set()
+            sink.clear()
+            producer.join()
+            abort_ms.append((time.perf_counter() - start) * 1000)
+            sink.drain()
+            silence_ms.append(sink.stats()["stop_to_silence_last_ms"] or 0.0)
+            sink.close()
+
+        name = "cancel token" if use_cancel else "문장 끝까지"
+        print(
+            f"  {name:12s}: stop→무음 평균 {np.mean(silence_ms):6.1f} ms / 최대 {max(silence_ms):6.1f} ms, "
+            f"stop→합성 중단 평균 {np.mean(abort_ms):7.1f} ms / 최대 {max(abort_ms):7.1f} ms"
+        )
+
+
+# --------------------------------------------------
+# filler: 항상 "음..." vs 예상 TTFA 기반 선택 (첫 소리 전 무음 / filler 뒤 공백 / 첫 청크 지연)
+# --------------------------------------------------
+def bench_filler(args) -> None:
+    engine = TTSEngine(args.onnx_dir, args.voice, cache_bytes=0, pipeline=True)
+    sr = engine.sample_rate
+    bank = FillerBank.from_dir(args.filler_dir, sr)
+    if not len(bank):
+        # assets/fillers가 없으면 같은 텍스트로 메모리에서 생성
+        bank = FillerBank(
+            {name: engine.synthesize_audio(text, total_step=5)
+             for name, text in DEFAULT_FILLER_TEXTS.items()},
+            sr,
+        )
+    print("filler: " + ", ".join(f"{n} {sec:.2f}s" for n, sec in bank.durations().items()))
+
+    def ttfa(text: str) -> float:
+        start = time.perf_counter()
+        stream = engine.synthesize_streaming(text, reply_start=True)
+        next(stream, None)
+        stream.close()
+        return time.perf_counter() - start
+
+    always = bank.pick(0.0)
+    strategies = {
+        "filler 없음": lambda text: None,
+        f"항상 {always[0]}": lambda text: always,
+        "예상 TTFA": None,
+    }
+    for name, choose in strategies.items():
+        # 정책(RTF)과 scheduler를 매번 새로 학습
+        engine.step_policy = type(engine.step_policy)()
+        scheduler = FillerScheduler(engine.step_policy, bank, threshold_sec=args.threshold)
+        silent, gaps, delays, played = [], [], [], 0
+        for sentence in KO_EVAL_SENTENCES * args.rounds:
+            choice = scheduler.plan(sentence) if choose is None else choose(sentence)
+            actual = ttfa(sentence)
+            scheduler.observe(sentence, actual)
+            filler_sec = len(choice[1]) / sr if choice else 0.0
+            played += choice is not None
+            silent.append(0.0 if choice else actual)            # 아무 소리도 없는 시간
+            gaps.append(max(0.0, actual - filler_sec) if choice else 0.0)  # filler 끝 → 첫 청크
+            delays.append(max(0.0, filler_sec - actual))        # filler 때문에 밀린 첫 청크
+        print(
+            f"  {name:10s}: filler {played}/{len(silent)}회, 첫 소리 전 무음 {np.mean(silent) * 1000:6.1f} ms, "
+            f"filler 뒤 공백 {np.mean(gaps) * 1000:6.1f} ms, 첫 청크 지연 {np.mean(delays) * 1000:6.1f} ms"
+        )
+    print(f"  예측 오차(평균 |예상-실제| TTFA): {scheduler.stats()['mean_abs_error_sec'] * 1000:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Supertonic TTS benchmark")
+    parser.add_argument("--onnx-dir", default=DEFAULT_ONNX_DIR)
+    parser.add_argument("--voice", default=DEFAULT_VOICE)
+    parser.add_argument("--gpu", action="store_true")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("text-encoding", help="UnicodeProcessor text → id 인코딩")
+    p.add_argument("--repeat", type=int, default=100)
+    p.set_defaults(func=bench_text_encoding)
+
+    p = sub.add_parser("normalize", help="TextNormalizer 전처리 (miss vs LRU hit)")
+    p.add_argument("--repeat", type=int, default=100)
+    p.set_defaults(func=bench_normalize)
+
+    p = sub.add_parser("batch", help="TextToSpeech 청크 batch 합성 처리량")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    p.add_argument("--total-step", type=int, default=5)
+    p.set_defaults(func=bench_batch)
+
+    p = sub.add_parser("startup", help="ORT 세션 로딩 시간 (cold vs cached)")
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("coldstart", help="병렬 로딩/warmup 전후 cold start 및 첫 요청 지연")
+    p.set_defaults(func=bench_coldstart)
+
+    p = sub.add_parser("styles", help="voice style 로딩 시간/RSS (JSON vs packed mmap)")
+    p.set_defaults(func=bench_styles)
+
+    p = sub.add_parser("ttfs", help="time-to-first-sample (문장 vs streaming vocoder)")
+    p.add_argument("--windows", type=int, nargs="+", default=[8, 16, 32])
+    p.add_argument("--total-step", type=int, default=5)
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_ttfs)
+
+    p = sub.add_parser("tiers", help="품질 tier별 RTF / 첫 문장 지연")
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_tiers)
+
+    p = sub.add_parser("quant", help="INT8 양자화 모델 RTF / FP32 대비 waveform·mel 거리 (CPU)")
+    p.add_argument("--variant", default="int8_dynamic")
+    p.add_argument("--stages", nargs="+", choices=ONNX_STAGES, default=["vector_estimator"])
+    p.add_argument("--total-step", type=int, default=5)
+    p.set_defaults(func=bench_quant)
+
+    p = sub.add_parser("pipeline", help="청크 순차 처리 vs stage 파이프라인 처리량/utilization")
+    p.add_argument("--threads", type=int, nargs=3, default=[1, 0, 1],
+                   metavar=("ENCODE", "DENOISE", "VOCODE"), help="stage별 intra-op 스레드 (0=ORT 기본값)")
+    p.add_argument("--queue-size", type=int, default=2)
+    p.add_argument("--text-repeat", type=int, default=5, help="input.txt를 몇 번 이어 붙일지")
+    p.add_argument("--total-step", type=int, default=5)
+    p.set_defaults(func=bench_pipeline)
+
+    p = sub.add_parser("fused", help="청크당 지연: Python denoising loop vs ONNX Loop 그래프 (CPU)")
+    p.add_argument("--total-step", type=int, default=5)
+    p.add_argument("--repeat", type=int, default=10)
+    p.set_defaults(func=bench_fused)
+
+    p = sub.add_parser("assembly", help="긴 출력 조립 시간/peak 메모리 (concatenate vs AudioBuffer)")
+    p.add_argument("--minutes", type=float, nargs="+", default=[5, 10, 20])
+    p.set_defaults(func=bench_assembly)
+
+    p = sub.add_parser("profile", help="stage별 시간 분해 / padding 비율 / profiler overhead")
+    p.add_argument("--total-step", type=int, default=5)
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--ort-sample", type=float, default=0.0, help="ORT 내장 profiling을 켤 요청 비율")
+    p.add_argument("--out-dir", default="profile_out")
+    p.set_defaults(func=bench_profile)
+
+    p = sub.add_parser("pool", help="동시 client 처리량: 엔진 1개 공유 vs TTSEnginePool")
+    p.add_argument("--sizes", type=int, nargs="+", default=[2, 4], help="pool replica 수")
+    p.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    p.add_argument("--requests", type=int, default=4, help="client당 요청 수")
+    p.add_argument("--total-step", type=int, default=5)
+    p.set_defaults(func=bench_pool)
+
+    p = sub.add_parser("farm", help="ASR 메시지 지연: TTS 부하 없음 / 같은 프로세스 / worker farm")
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--load-threads", type=int, default=2, help="TTS 요청을 계속 보내는 스레드 수")
+    p.add_argument("--seconds", type=float, default=10.0)
+    p.add_argument("--total-step", type=int, default=5)
+    p.set_defaults(func=bench_farm)
+
+    p = sub.add_parser("gaps", help="재생 쪽 청크 간 공백: streaming lookahead 0 vs N")
+    p.add_argument("--lookahead", type=int, nargs="+", default=[0, 1, 2])
+    p.add_argument("--paragraphs", type=int, default=8, help="input.txt에서 사용할 줄 수")
+    p.add_argument("--pipeline", action="store_true", help="StagePipeline 사용")
+    p.add_argument("--total-step", type=int, default=5)
+    p.set_defaults(func=bench_gaps)
+
+    p = sub.add_parser("trim", help="청크 앞뒤 무음 trim 길이 / 전송량 감소")
+    p.add_argument("--threshold-db", type=float, default=-45.0)
+    p.add_argument("--margin-ms", type=float, default=40.0)
+    p.add_argument("--total-step", type=int, default=5)
+    p.set_defaults(func=bench_trim)
+
+    p = sub.add_parser("sink", help="계속 열린 오디오 sink: underrun / latency (NullSink)")
+    p.add_argument("--paragraphs", type=int, default=4, help="input.txt에서 사용할 줄 수")
+    p.add_argument("--total-step", type=int, default=5)
+    p.add_argument("--out", default=None, help="재생된 오디오를 기록할 WAV 경로")
+    p.set_defaults(func=bench_sink)
+
+    p = sub.add_parser("barge", help="barge-in: stop → 무음 / 합성 중단 지연 (cancel token 유무)")
+    p.add_argument("--after", type=float, nargs="+", default=[0.3, 0.6, 1.0],
+                   help="합성 시작 후 stop까지의 시간(초)")
+    p.add_argument("--paragraphs", type=int, default=8, help="input.txt에서 사용할 줄 수")
+    p.add_argument("--total-step", type=int, default=10)
+    p.set_defaults(func=bench_barge)
+
+    p = sub.add_parser("filler", help="filler 스케줄링: 없음 / 항상 재생 / 예상 TTFA 기반 선택")
+    p.add_argument("--filler-dir", default=DEFAULT_FILLER_DIR)
+    p.add_argument("--threshold", type=float, default=0.35, help="filler를 재생할 최소 예상 대기(초)")
+    p.add_argument("--rounds", type=int, default=2)
+    p.set_defaults(func=bench_filler)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
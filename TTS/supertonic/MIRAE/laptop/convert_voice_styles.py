@@ -0,0 +1,18 @@
+# convert_voice_styles.py
+import os
+import sys
+
+from helper import pack_voice_styles
+
+# MIRAE/laptop에서 2단계 위
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+STYLE_DIR = os.path.join(BASE_DIR, "assets", "voice_styles")
+
+
+if __name__ == "__main__":
+    # 인자로 폴더를 주면 그 폴더의 *.json을 변환
+    style_dir = sys.argv[1] if len(sys.argv) >= 2 else STYLE_DIR
+
+    print(f"🔄 voice style 변환 중: {style_dir}")
+    out_dir = pack_voice_styles(style_dir)
+    print(f"✅ 변환 완료: {out_dir} (ttl.npy, dp.npy, index.json)")
@@ -0,0 +1,171 @@
+# fuse_denoise_loop.py
+"""
+vector_estimator.onnx의 flow-matching denoising loop를 ONNX Loop 하나로 합친 그래프 생성
+
+사용법 (laptop 폴더에서):
+    python fuse_denoise_loop.py                 → <onnx_dir>/vector_estimator_loop.onnx
+    python fuse_denoise_loop.py --with-vocoder  → <onnx_dir>/vector_estimator_vocoder_loop.onnx
+    python fuse_denoise_loop.py --onnx-dir ../../assets/onnx
+
+입력: noisy_latent, text_emb, style_ttl, text_mask, latent_mask, total_step
+      (vector_estimator.onnx와 같고 current_step만 없음, 반복 횟수는 total_step[0])
+      + start_step / num_steps (int64 scalar, 전체 실행은 0 / total_step)
+        → step [start_step, min(start_step + num_steps, total_step)) 만 실행
+        (TextToSpeech가 cancel을 줄 때 몇 step씩 나눠 실행하고 그 사이마다 cancel 확인)
+출력: denoised_latent (--with-vocoder면 vocoder 출력 waveform)
+load_text_to_speech()는 이 파일이 있으면 자동으로 사용 (fused=False로 끌 수 있음)
+"""
+import argparse
+import os
+
+import onnx
+from onnx import TensorProto
+from onnx import helper as oh
+
+from helper import FUSED_DENOISE, FUSED_DENOISE_VOCODER
+
+# MIRAE/laptop에서 2단계 위
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_ONNX_DIR = os.path.join(BASE_DIR, "assets", "onnx")
+
+
+def _prefixed(graph: onnx.GraphProto, prefix: str, keep: set[str]):
+    """graph 내부 이름(중간 값, initializer, node 이름)에 prefix를 붙인 복사본"""
+
+    def rename(name: str) -> str:
+        return name if not name or name in keep else f"{prefix}{name}"
+
+    nodes = []
+    for node in graph.node:
+        if any(
+            a.type in (onnx.AttributeProto.GRAPH, onnx.AttributeProto.GRAPHS) for a in node.attribute
+        ):
+            raise ValueError(f"subgraph를 가진 node는 지원하지 않음: {node.op_type} ({node.name})")
+        new = onnx.NodeProto()
+        new.CopyFrom(node)
+        new.name = rename(node.name)
+        new.input[:] = [rename(n) for n in node.input]
+        new.output[:] = [rename(n) for n in node.output]
+        nodes.append(new)
+
+    inits = []
+    for init in graph.initializer:
+        new = onnx.TensorProto()
+        new.CopyFrom(init)
+        new.name = rename(init.name)
+        inits.append(new)
+    return nodes, inits, rename
+
+
+def _value_info(src: onnx.ValueInfoProto, name: str) -> onnx.ValueInfoProto:
+    vi = onnx.ValueInfoProto()
+    vi.CopyFrom(src)
+    vi.name = name
+    return vi
+
+
+def _opsets(*models: onnx.ModelProto) -> list:
+    versions: dict[str, int] = {}
+    for m in models:
+        for op in m.opset_import:
+            versions[op.domain] = max(versions.get(op.domain, 0), op.version)
+    return [oh.make_opsetid(domain, version) for domain, version in versions.items()]
+
+
+def build_fused_model(onnx_dir: str, with_vocoder: bool = False) -> onnx.ModelProto:
+    ve = onnx.load(os.path.join(onnx_dir, "vector_estimator.onnx"))
+    ve_inputs = {i.name: i for i in ve.graph.input}
+    ve_out = ve.graph.output[0]
+
+    # Loop body: (iter, cond, latent) → (cond, denoised latent)
+    # current_step = float(start_step + iter)을 total_step과 같은 [B] 모양으로 만들어 vector estimator 실행
+    # (loop-carried latent만 body 안의 이름을 쓰고, 나머지 입력은 바깥 graph 값을 그대로 참조)
+    outer_inputs = set(ve_inputs) - {"noisy_latent", "current_step"}
+    body_nodes, body_inits, rename = _prefixed(ve.graph, "ve/", outer_inputs)
+    body_latent = _value_info(ve_inputs["noisy_latent"], rename("noisy_latent"))
+    body = oh.make_graph(
+        [
+            oh.make_node("Identity", ["cond_in"], ["cond_out"]),
+            oh.make_node("Add", ["iter", "start_step"], ["step"]),
+            oh.make_node("Cast", ["step"], ["iter_f"], to=TensorProto.FLOAT),
+            oh.make_node("Shape", ["total_step"], ["step_shape"]),
+            oh.make_node("Expand", ["iter_f", "step_shape"], [rename("current_step")]),
+            *body_nodes,
+        ],
+        "denoise_step",
+        [
+            oh.make_tensor_value_info("iter", TensorProto.INT64, []),
+            oh.make_tensor_value_info("cond_in", TensorProto.BOOL, []),
+            body_latent,
+        ],
+        [
+            oh.make_tensor_value_info("cond_out", TensorProto.BOOL, []),
+            _value_info(ve_out, rename(ve_out.name)),
+        ],
+        body_inits,
+    )
+
+    # 반복 횟수 = min(total_step[0] - start_step, num_steps) (batch 내 total_step은 모두 같음)
+    nodes = [
+        oh.make_node("Gather", ["total_step", "loop/zero"], ["loop/steps_f"], axis=0),
+        oh.make_node("Cast", ["loop/steps_f"], ["loop/steps"], to=TensorProto.INT64),
+        oh.make_node("Sub", ["loop/steps", "start_step"], ["loop/remaining"]),
+        oh.make_node("Min", ["loop/remaining", "num_steps"], ["loop/trip_count"]),
+        oh.make_node(
+            "Loop",
+            ["loop/trip_count", "loop/cond", "noisy_latent"],
+            ["denoised_latent"],
+            body=body,
+            name="denoise_loop",
+        ),
+    ]
+    inits = [
+        oh.make_tensor("loop/zero", TensorProto.INT64, [], [0]),
+        oh.make_tensor("loop/cond", TensorProto.BOOL, [], [True]),
+    ]
+    inputs = [i for name, i in ve_inputs.items() if name != "current_step"] + [
+        oh.make_tensor_value_info("start_step", TensorProto.INT64, []),
+        oh.make_tensor_value_info("num_steps", TensorProto.INT64, []),
+    ]
+    outputs = [_value_info(ve_out, "denoised_latent")]
+    models = [ve]
+
+    if with_vocoder:
+        voc = onnx.load(os.path.join(onnx_dir, "vocoder.onnx"))
+        voc_in = voc.graph.input[0].name
+        voc_nodes, voc_inits, voc_rename = _prefixed(voc.graph, "voc/", set())
+        nodes.append(oh.make_node("Identity", ["denoised_latent"], [voc_rename(voc_in)]))
+        nodes.extend(voc_nodes)
+        inits.extend(voc_inits)
+        outputs = []
+        for out in voc.graph.output:
+            nodes.append(oh.make_node("Identity", [voc_rename(out.name)], [out.name]))
+            outputs.append(out)
+        models.append(voc)
+
+    graph = oh.make_graph(nodes, "fused_denoise", inputs, outputs, inits)
+    model = oh.make_model(graph, opset_imports=_opsets(*models))
+    model.ir_version = max(m.ir_version for m in models)
+    onnx.checker.check_model(model)
+    return model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fuse the Supertonic denoising loop into one ONNX graph"
+    )
+    parser.add_argument("--onnx-dir", default=DEFAULT_ONNX_DIR)
+    parser.add_argument("--with-vocoder", action="store_true", help="vocoder까지 한 그래프로 합침")
+    args = parser.parse_args()
+
+    name = FUSED_DENOISE_VOCODER if args.with_vocoder else FUSED_DENOISE
+    out_path = os.path.join(args.onnx_dir, f"{name}.onnx")
+
+    print(f"🔄 {name} 생성 중")
+    model = build_fused_model(args.onnx_dir, args.with_vocoder)
+    onnx.save(model, out_path)
+    print(f"✅ 생성 완료: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
+import hashlib
 import json
 import os
+import platform
+import tempfile
+import threading
 import time
-from contextlib import contextmanager
-from typing import Optional
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from itertools import count
+from typing import Callable, Iterator, Optional, Union
 from unicodedata import normalize
 
 import numpy as np
@@ -11,104 +18,175 @@ import re
 
 AVAILABLE_LANGS = ["en", "ko", "es", "pt", "fr"]
 
+# Remove emojis (wide Unicode range)
+_EMOJI_RE = re.compile(
+    "[\U0001f600-\U0001f64f"  # emoticons
+    "\U0001f300-\U0001f5ff"  # symbols & pictographs
+    "\U0001f680-\U0001f6ff"  # transport & map symbols
+    "\U0001f700-\U0001f77f"
+    "\U0001f780-\U0001f7ff"
+    "\U0001f800-\U0001f8ff"
+    "\U0001f900-\U0001f9ff"
+    "\U0001fa00-\U0001fa6f"
+    "\U0001fa70-\U0001faff"
+    "\u2600-\u26ff"
+    "\u2700-\u27bf"
+    "\U0001f1e6-\U0001f1ff]+",
+    flags=re.UNICODE,
+)
+
+# 1글자 치환(대시/따옴표/기호) + 특수기호 제거 + "@" 치환을 하나의 translate 테이블로
+_CHAR_TABLE = str.maketrans(
+    {
+        "–": "-",
+        "—": "-",
+        "_": " ",
+        "\u201c": '"',
+        "\u201d": '"',
+        "\u2018": "'",
+        "\u2019": "'",
+        "´": "'",
+        "`": "'",
+        "[": " ",
+        "]": " ",
+        "|": " ",
+        "/": " ",
+        "#": " ",
+        "→": " ",
+        "←": " ",
+        "♥": None,
+        "☆": None,
+        "♡": None,
+        "©": None,
+        "\\": None,
+        "@": " at ",
+    }
+)
+
+# Replace known expressions
+_EXPR_REPLACEMENTS = {
+    "e.g.,": "for example, ",
+    "i.e.,": "that is, ",
+}
+_EXPR_RE = re.compile("|".join(re.escape(k) for k in _EXPR_REPLACEMENTS))
+
+# Fix spacing around punctuation: " ," " ." " !" " ?" " ;" " :" " '"
+_PUNCT_SPACE_RE = re.compile(r" ([,.!?;:'])")
+# Remove duplicate quotes
+_DUP_QUOTE_RE = re.compile(r"([\"'`])\1+")
+_SPACES_RE = re.compile(r"\s+")
+# If text doesn't end with punctuation, quotes, or closing brackets, add a period
+_END_PUNCT_RE = re.compile(r"[.!?;:,'\"')\]}…。」』】〉》›»]$")
+
+
+class TextNormalizer:
+    """
+    UnicodeProcessor 전처리 엔진
+    - 정규식/translate 테이블은 모듈 로딩 시 1회만 컴파일
+    - 결과는 (text, lang) 키의 bounded LRU에 캐시 (LLM이 반복하는 청크는 재계산 없음)
+    """
 
-class UnicodeProcessor:
-    def __init__(self, unicode_indexer_path: str):
-        with open(unicode_indexer_path, "r") as f:
-            self.indexer = json.load(f)
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._lock = threading.Lock()
 
-    def _preprocess_text(self, text: str, lang: str) -> str:
-        # TODO: Need advanced normalizer for better performance
+    def __call__(self, text: str, lang: str) -> str:
+        if lang not in AVAILABLE_LANGS:
+            raise ValueError(f"Invalid language: {lang}")
+
+        key = (text, lang)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        result = self.normalize(text, lang)
+
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[key] = result
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def normalize(text: str, lang: str) -> str:
         text = normalize("NFKD", text)
+        text = _EMOJI_RE.sub("", text)
+        text = text.translate(_CHAR_TABLE)
+        text = _EXPR_RE.sub(lambda m: _EXPR_REPLACEMENTS[m.group(0)], text)
+        text = _PUNCT_SPACE_RE.sub(r"\1", text)
+        text = _DUP_QUOTE_RE.sub(r"\1", text)
 
-        # Remove emojis (wide Unicode range)
-        emoji_pattern = re.compile(
-            "[\U0001f600-\U0001f64f"  # emoticons
-            "\U0001f300-\U0001f5ff"  # symbols & pictographs
-            "\U0001f680-\U0001f6ff"  # transport & map symbols
-            "\U0001f700-\U0001f77f"
-            "\U0001f780-\U0001f7ff"
-            "\U0001f800-\U0001f8ff"
-            "\U0001f900-\U0001f9ff"
-            "\U0001fa00-\U0001fa6f"
-            "\U0001fa70-\U0001faff"
-            "\u2600-\u26ff"
-            "\u2700-\u27bf"
-            "\U0001f1e6-\U0001f1ff]+",
-            flags=re.UNICODE,
-        )
-        text = emoji_pattern.sub("", text)
-
-        # Replace various dashes and symbols
-        replacements = {
-            "–": "-",
-            "-": "-",
-            "—": "-",
-            "_": " ",
-            "\u201c": '"',
-            "\u201d": '"',
-            "\u2018": "'",
-            "\u2019": "'",
-            "´": "'",
-            "`": "'",
-            "[": " ",
-            "]": " ",
-            "|": " ",
-            "/": " ",
-            "#": " ",
-            "→": " ",
-            "←": " ",
-        }
-        for k, v in replacements.items():
-            text = text.replace(k, v)
+        # Remove extra spaces
+        text = _SPACES_RE.sub(" ", text).strip()
 
-        # Remove special symbols
-        text = re.sub(r"[♥☆♡©\\]", "", text)
+        if not _END_PUNCT_RE.search(text):
+            text += "."
 
-        # Replace known expressions
-        expr_replacements = {
-            "@": " at ",
-            "e.g.,": "for example, ",
-            "i.e.,": "that is, ",
-        }
-        for k, v in expr_replacements.items():
-            text = text.replace(k, v)
-
-        # Fix spacing around punctuation
-        text = re.sub(r" ,", ",", text)
-        text = re.sub(r" \.", ".", text)
-        text = re.sub(r" !", "!", text)
-        text = re.sub(r" \?", "?", text)
-        text = re.sub(r" ;", ";", text)
-        text = re.sub(r" :", ":", text)
-        text = re.sub(r" '", "'", text)
-
-        # Remove duplicate quotes
-        while '""' in text:
-            text = text.replace('""', '"')
-        while "''" in text:
-            text = text.replace("''", "'")
-        while "``" in text:
-            text = text.replace("``", "`")
+        return f"<{lang}>" + text + f"</{lang}>"
 
-        # Remove extra spaces
-        text = re.sub(r"\s+", " ", text).strip()
+    def cache_info(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "size": len(self._cache),
+                "maxsize": self.cache_size,
+            }
 
-        # If text doesn't end with punctuation, quotes, or closing brackets, add a period
-        if not re.search(r"[.!?;:,'\"')\]}…。」』】〉》›»]$", text):
-            text += "."
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
 
-        if lang not in AVAILABLE_LANGS:
-            raise ValueError(f"Invalid language: {lang}")
 
-        text = f"<{lang}>" + text + f"</{lang}>"
-        return text
+class UnicodeProcessor:
+    def __init__(
+        self,
+        unicode_indexer_path: str,
+        unknown_id: Optional[int] = None,
+        normalize_cache_size: int = 1024,
+    ):
+        with open(unicode_indexer_path, "r") as f:
+            self.indexer = json.load(f)
+        self.normalizer = TextNormalizer(cache_size=normalize_cache_size)
+
+        # indexer(list)를 로딩 시 1회 dense lookup 배열로 컴파일
+        # - 테이블 밖 code point, 그리고 테이블에서 -1(미등록)인 문자는 unknown_id로 매핑
+        # - unknown_id 기본값은 공백 문자의 id (모델 입력에 음수 id가 들어가지 않도록)
+        lookup = np.asarray(self.indexer, dtype=np.int64)
+        if unknown_id is None:
+            unknown_id = int(lookup[ord(" ")]) if len(lookup) > ord(" ") else 0
+        self.unknown_id = unknown_id
+        lookup[lookup < 0] = unknown_id
+        self._lookup = lookup
+
+    def _preprocess_text(self, text: str, lang: str) -> str:
+        return self.normalizer(text, lang)
 
     def _get_text_mask(self, text_ids_lengths: np.ndarray) -> np.ndarray:
         return length_to_mask(text_ids_lengths)
 
     def _text_to_unicode_values(self, text: str) -> np.ndarray:
-        return np.array([ord(char) for char in text], dtype=np.uint16)
+        # UTF-32 view: 문자 1개 = uint32 1개 (BMP 밖 문자도 잘리지 않음)
+        return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+    def _encode(self, unicode_vals: np.ndarray) -> np.ndarray:
+        in_range = unicode_vals < len(self._lookup)
+        ids = np.full(unicode_vals.shape, self.unknown_id, dtype=np.int64)
+        ids[in_range] = self._lookup[unicode_vals[in_range]]
+        return ids
 
     def __call__(
         self, text_list: list[str], lang_list: list[str]
@@ -118,12 +196,12 @@ class UnicodeProcessor:
         ]
         text_ids_lengths = np.array([len(text) for text in text_list], dtype=np.int64)
 
+        # 배치 전체를 한 문자열로 이어 붙여 한 번에 인코딩한 뒤,
+        # 길이 마스크(row-major 순서 = 이어 붙인 순서)로 padded 행렬에 흩뿌림
         text_ids = np.zeros((len(text_list), text_ids_lengths.max()), dtype=np.int64)
-        for i, text in enumerate(text_list):
-            unicode_vals = self._text_to_unicode_values(text)
-            text_ids[i, : len(unicode_vals)] = np.array(
-                [self.indexer[val] for val in unicode_vals], dtype=np.int64
-            )
+        flat_ids = self._encode(self._text_to_unicode_values("".join(text_list)))
+        valid = np.arange(text_ids.shape[1]) < text_ids_lengths[:, None]
+        text_ids[valid] = flat_ids
 
         text_mask = self._get_text_mask(text_ids_lengths)
         return text_ids, text_mask
@@ -135,6 +213,391 @@ class Style:
         self.dp = style_dp_onnx
 
 
+class AudioBuffer:
+    """
+    청크 waveform을 미리 잡아 둔 float32 버퍼에 제자리로 이어 쓰는 조립 버퍼
+    - capacity: dp 예측 길이로 미리 확보, 모자라면 1.5배씩 늘림 (복사량 O(n))
+    - 크기 조정은 새 버퍼를 잡고 채워진 앞부분만 복사한 뒤 교체
+      (제자리 realloc은 이미 돌려준 view가 해제된 메모리를 가리킬 수 있으므로 사용하지 않음)
+    - silence는 별도 배열 없이 버퍼 안에서 0으로 채움
+    - view(): 복사 없는 (n,) view, to_int16(): 변환 1회
+      (크기가 바뀐 뒤의 view는 이전 버퍼를 가리키므로 최신 내용은 다시 view()로)
+    """
+
+    def __init__(self, capacity: int = 0):
+        self._buf = np.empty(max(0, int(capacity)), dtype=np.float32)
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    def reserve(self, n: int) -> None:
+        """최소 n 샘플을 더 쓸 수 있도록 확보"""
+        need = self.length + n
+        if need <= len(self._buf):
+            return
+        self._realloc(max(need, int(len(self._buf) * 1.5)))
+
+    def _realloc(self, capacity: int) -> None:
+        buf = np.empty(capacity, dtype=np.float32)
+        buf[: self.length] = self._buf[: self.length]
+        self._buf = buf
+
+    def append(self, wav: np.ndarray) -> None:
+        wav = wav.reshape(-1)
+        self.reserve(len(wav))
+        self._buf[self.length : self.length + len(wav)] = wav
+        self.length += len(wav)
+
+    def append_silence(self, n: int) -> None:
+        self.reserve(n)
+        self._buf[self.length : self.length + n] = 0.0
+        self.length += n
+
+    def view(self) -> np.ndarray:
+        return self._buf[: self.length]
+
+    def finalize(self) -> np.ndarray:
+        """남는 capacity가 크면 버퍼를 실제 길이로 줄인 뒤 view 반환"""
+        if len(self._buf) - self.length > max(self.length // 10, 1):
+            self._realloc(self.length)
+        return self.view()
+
+    def to_int16(self) -> np.ndarray:
+        out = np.empty(self.length, dtype=np.int16)
+        np.multiply(np.clip(self.view(), -1.0, 1.0), 32767, out=out, casting="unsafe")
+        return out
+
+
+class SilenceTrimmer:
+    """
+    vocoder 출력 앞뒤의 저에너지 구간(dead air) 제거
+    - frame_ms 단위 RMS(dBFS)가 threshold_db 이하인 앞/뒤 frame을 잘라냄 (numpy로 한 번에 계산)
+    - 자른 경계에는 margin_ms만큼 여유를 남기고 fade_ms 길이로 fade → 이어 붙일 때 click 없음
+    - 전부 무음이면 자르지 않음
+    - stats(): 잘라낸 앞/뒤 길이(초) 합계 → 줄어든 지연/전송량 확인용
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        threshold_db: float = -45.0,
+        frame_ms: float = 10.0,
+        margin_ms: float = 40.0,
+        fade_ms: float = 5.0,
+    ):
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.frame = max(1, int(sample_rate * frame_ms / 1000))
+        self.margin = int(sample_rate * margin_ms / 1000)
+        self.fade = int(sample_rate * fade_ms / 1000)
+
+        self._lock = threading.Lock()
+        self._chunks = 0
+        self._head = 0
+        self._tail = 0
+        self._kept = 0
+
+    def voiced_frames(self, wav: np.ndarray) -> np.ndarray:
+        """frame별 RMS가 threshold_db를 넘는지 (bool 배열)"""
+        starts = np.arange(0, len(wav), self.frame)
+        energy = np.add.reduceat(np.square(wav, dtype=np.float32), starts)
+        energy /= np.diff(np.append(starts, len(wav)))
+        return 10.0 * np.log10(energy + 1e-12) > self.threshold_db
+
+    def bounds(self, wav: np.ndarray) -> tuple[int, int]:
+        """남길 구간 [start, end) (margin 포함)"""
+        if len(wav) == 0:
+            return 0, 0
+        voiced = np.flatnonzero(self.voiced_frames(wav))
+        if len(voiced) == 0:
+            return 0, len(wav)
+        start = max(0, voiced[0] * self.frame - self.margin)
+        end = min(len(wav), (voiced[-1] + 1) * self.frame + self.margin)
+        return int(start), int(end)
+
+    def trim(self, wav: np.ndarray) -> np.ndarray:
+        """1-D PCM → 앞뒤 무음을 잘라낸 view (잘린 경계는 fade 적용)"""
+        start, end = self.bounds(wav)
+        out = wav[start:end]
+        self._fade_edges(out, start > 0, end < len(wav))
+        self.record(start, len(wav) - end, len(out))
+        return out
+
+    def trim_blocks(self, blocks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+        """
+        PCM block 스트림용: 앞쪽 무음 block은 버리고 첫 유성 block의 앞부분을 자름
+        - 무음 block은 뒤에 유성 block이 올 때까지만 보류 → 마지막 무음 block들은 margin만 남김
+        """
+        head = tail = kept = 0
+        started = False
+        held: list[np.ndarray] = []
+        for block in blocks:
+            voiced = np.flatnonzero(self.voiced_frames(block)) if len(block) else []
+            if len(voiced) == 0:
+                if started:
+                    held.append(block)
+                else:
+                    head += len(block)
+                continue
+            if not started:
+                start = max(0, voiced[0] * self.frame - self.margin)
+                block = block[start:]
+                self._fade_edges(block, start > 0 or head > 0, False)
+                head += start
+                started = True
+            for h in held:
+                kept += len(h)
+                yield h
+            held = []
+            kept += len(block)
+            yield block
+
+        if held:
+            rest = np.concatenate(held)
+            out = rest[: self.margin]
+            self._fade_edges(out, False, len(out) < len(rest))
+            tail += len(rest) - len(out)
+            kept += len(out)
+            if len(out):
+                yield out
+        self.record(head, tail, kept)
+
+    def config(self) -> dict:
+        """출력 waveform을 바꾸는 설정 (waveform 캐시 키에 포함)"""
+        return {
+            "threshold_db": self.threshold_db,
+            "frame": self.frame,
+            "margin": self.margin,
+            "fade": self.fade,
+        }
+
+    def record(self, head: int, tail: int, kept: int) -> None:
+        with self._lock:
+            self._chunks += 1
+            self._head += head
+            self._tail += tail
+            self._kept += kept
+
+    def stats(self) -> dict:
+        with self._lock:
+            sr = self.sample_rate
+            total = self._head + self._tail + self._kept
+            return {
+                "chunks": self._chunks,
+                "trimmed_head_sec": self._head / sr,
+                "trimmed_tail_sec": self._tail / sr,
+                "trimmed_ratio": (self._head + self._tail) / total if total else 0.0,
+            }
+
+    def _fade_edges(self, wav: np.ndarray, fade_in: bool, fade_out: bool) -> None:
+        n = min(self.fade, len(wav) // 2)
+        if n == 0:
+            return
+        ramp = np.linspace(0.0, 1.0, n, endpoint=False, dtype=np.float32)
+        if fade_in:
+            wav[:n] *= ramp
+        if fade_out:
+            wav[-n:] *= ramp[::-1]
+
+
+class EncoderCache:
+    """
+    duration predictor / text encoder 중간 결과 캐시 (키: text_ids + style)
+    - 같은 문장을 speed/total_step만 바꿔 다시 합성하거나, 취소 후 재시도할 때
+      dp/text encoder를 건너뛰고 바로 latent 샘플링으로 진입
+    - max_bytes 기준 LRU
+    """
+
+    def __init__(self, max_bytes: int = 32 << 20):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._cache: OrderedDict[bytes, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text_ids: np.ndarray, style: Style) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(str(text_ids.shape).encode())
+        h.update(np.ascontiguousarray(text_ids).tobytes())
+        h.update(np.ascontiguousarray(style.ttl).tobytes())
+        h.update(np.ascontiguousarray(style.dp).tobytes())
+        return h.digest()
+
+    def get(self, key: bytes) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, dur: np.ndarray, text_emb: np.ndarray) -> None:
+        dur.flags.writeable = False
+        text_emb.flags.writeable = False
+        size = dur.nbytes + text_emb.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = (dur, text_emb)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (d, e) = self._cache.popitem(last=False)
+                self._bytes -= d.nbytes + e.nbytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "entries": len(self._cache),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class StageProfiler:
+    """
+    TextToSpeech 단계별 시간 기록 (tts.profiler = StageProfiler()로 연결)
+    - 기록: text 전처리(+padding 비율), duration predictor, text encoder,
+      denoising step별, vocoder(window별), _infer 1회 전체("infer")
+    - 최근 capacity개만 ring buffer(deque)에 보관 → 오래 켜 두어도 메모리 고정
+    - add_hook(fn): 기록마다 fn(record) 호출 (모니터링 연동용)
+    - dump_json() / dump_chrome_trace(): chrome://tracing, Perfetto에서 열람
+    - ort_sample_rate > 0: 그 비율의 _infer 호출을 ORT profiling을 켠 별도 세션으로 실행
+      (ORT 프로파일은 ort_profile_dir에 저장, tts.end_ort_profiling()으로 파일 확정)
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        ort_sample_rate: float = 0.0,
+        ort_profile_dir: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        self.ort_sample_rate = ort_sample_rate
+        self.ort_profile_dir = ort_profile_dir or os.path.join(os.getcwd(), "ort_profile")
+        self.hooks: list[Callable[[dict], None]] = []
+
+        self._records: deque[dict] = deque(maxlen=capacity)
+        self._t0 = time.perf_counter()
+        self._calls = count(1)
+        self._local = threading.local()
+        self._rng = np.random.default_rng(seed)
+        self._rng_lock = threading.Lock()
+
+    def add_hook(self, fn: Callable[[dict], None]) -> None:
+        self.hooks.append(fn)
+
+    def record(self, stage: str, start: float, duration: float, **args) -> None:
+        rec = {
+            "stage": stage,
+            "start": start - self._t0,
+            "dur": duration,
+            "thread": threading.get_ident(),
+            "call": getattr(self._local, "call", None),
+            "args": args,
+        }
+        self._records.append(rec)  # deque.append은 GIL 아래에서 atomic
+        for hook in self.hooks:
+            hook(rec)
+
+    @contextmanager
+    def span(self, stage: str, **args):
+        start = time.perf_counter()
+        try:
+            yield args  # 블록 안에서 args에 값을 추가할 수 있음
+        finally:
+            self.record(stage, start, time.perf_counter() - start, **args)
+
+    @contextmanager
+    def call(self, **args):
+        """_infer 1회: 새 call id를 붙이고 안쪽 기록들을 같은 id로 묶음"""
+        outer = getattr(self._local, "call", None)
+        self._local.call = next(self._calls)
+        try:
+            with self.span("infer", **args):
+                yield
+        finally:
+            self._local.call = outer
+
+    def sample_ort(self) -> bool:
+        if self.ort_sample_rate <= 0:
+            return False
+        with self._rng_lock:
+            return self._rng.random() < self.ort_sample_rate
+
+    def records(self) -> list[dict]:
+        return list(self._records)
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def summary(self) -> dict:
+        """stage별 count / 평균 / p50 / p95 / 최대 (ms)"""
+        by_stage: dict[str, list[float]] = {}
+        for rec in self.records():
+            by_stage.setdefault(rec["stage"], []).append(rec["dur"] * 1000)
+        summary = {}
+        for stage, durs in by_stage.items():
+            d = np.asarray(durs)
+            summary[stage] = {
+                "count": len(d),
+                "total_ms": float(d.sum()),
+                "mean_ms": float(d.mean()),
+                "p50_ms": float(np.percentile(d, 50)),
+                "p95_ms": float(np.percentile(d, 95)),
+                "max_ms": float(d.max()),
+            }
+        return summary
+
+    def dump_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "records": self.records()}, f, indent=1)
+
+    def dump_chrome_trace(self, path: str) -> None:
+        pid = os.getpid()
+        events = [
+            {
+                "name": rec["stage"],
+                "cat": "tts",
+                "ph": "X",
+                "ts": rec["start"] * 1e6,
+                "dur": rec["dur"] * 1e6,
+                "pid": pid,
+                "tid": rec["thread"],
+                "args": {"call": rec["call"], **rec["args"]},
+            }
+            for rec in self.records()
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+_NO_SPAN = nullcontext({})
+
+
+class SynthesisCancelled(Exception):
+    """cancel(threading.Event)이 set되어 합성을 중간에 멈춤"""
+
+
+def check_cancel(cancel: Optional[threading.Event]) -> None:
+    if cancel is not None and cancel.is_set():
+        raise SynthesisCancelled()
+
+
 class TextToSpeech:
     def __init__(
         self,
@@ -144,6 +607,10 @@ class TextToSpeech:
         text_enc_ort: ort.InferenceSession,
         vector_est_ort: ort.InferenceSession,
         vocoder_ort: ort.InferenceSession,
+        io_binding: Optional[bool] = None,
+        encoder_cache_bytes: int = 32 << 20,
+        fused_denoise_ort: Optional[ort.InferenceSession] = None,
+        fused_vocoder_ort: Optional[ort.InferenceSession] = None,
     ):
         self.cfgs = cfgs
         self.text_processor = text_processor
@@ -151,12 +618,74 @@ class TextToSpeech:
         self.text_enc_ort = text_enc_ort
         self.vector_est_ort = vector_est_ort
         self.vocoder_ort = vocoder_ort
+        # ONNX Loop으로 합친 denoising 그래프 (있으면 total_step번의 run()을 1번으로)
+        self.fused_denoise_ort = fused_denoise_ort
+        self.fused_vocoder_ort = fused_vocoder_ort
+        # cancel이 있을 때 fused 그래프 run() 1번에 실행할 step 수 (block 사이마다 cancel 확인)
+        # → barge-in 후 최대 이 step 수만큼 더 돌고 멈춤 (작을수록 빨리 멈추고 run() 호출이 늘어남)
+        self.fused_block_steps = 4
         self.sample_rate = cfgs["ae"]["sample_rate"]
         self.base_chunk_size = cfgs["ae"]["base_chunk_size"]
         self.chunk_compress_factor = cfgs["ttl"]["chunk_compress_factor"]
         self.ldim = cfgs["ttl"]["latent_dim"]
 
-    def sample_noisy_latent(self, duration: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # IO binding: None이면 CUDA 세션일 때만 자동 사용, CPU 전용이면 기존 run() 경로
+        on_cuda = "CUDAExecutionProvider" in vector_est_ort.get_providers()
+        self.io_device = "cuda" if on_cuda else "cpu"
+        self.use_io_binding = on_cuda if io_binding is None else io_binding
+
+        # dp/text encoder 출력 캐시 (0이면 비활성)
+        self.encoder_cache = EncoderCache(encoder_cache_bytes) if encoder_cache_bytes > 0 else None
+
+        # stage별 세션 로딩 시간/캐시 상태 (load_text_to_speech가 채움)
+        self.load_stats: dict[str, dict] = {}
+
+        # tts_pipeline.StagePipeline을 연결하면 __call__의 청크들을 stage 파이프라인으로 처리
+        self.pipeline = None
+
+        # SilenceTrimmer를 연결하면 청크 앞뒤 무음을 잘라서 이어 붙임 (None이면 그대로)
+        self.trimmer: Optional[SilenceTrimmer] = None
+
+        # StageProfiler를 연결하면 단계별 시간 기록 (None이면 기록 비용 없음)
+        self.profiler: Optional[StageProfiler] = None
+        # ORT profiling 샘플링용 세션을 다시 만들 때 쓰는 stage별 모델 경로 (load_text_to_speech가 채움)
+        self.model_paths: dict[str, str] = {}
+        # 세션을 만든 SessionConfig (fingerprint의 sha256 memo 위치, load_text_to_speech가 채움)
+        self.session_config: Optional["SessionConfig"] = None
+        self._ort_profiled: Optional["TextToSpeech"] = None
+        self._is_ort_profiled = False
+        self._ort_profile_lock = threading.Lock()
+
+    def fingerprint(self) -> dict:
+        """
+        출력 waveform을 결정하는 모델 구성 (waveform 캐시 키에 포함)
+        - stage별 모델 파일 sha256 (variant 파일이면 그 내용), 사용 중인 fused 그래프, 샘플레이트
+        - sha256은 세션 캐시 폴더의 hashes.json에 memo (size/mtime가 같으면 다시 읽지 않음),
+          세션 캐시를 끈 경우(SessionConfig(cache=False))에는 memo 없이 매번 계산
+        """
+        config = self.session_config
+        models = {
+            stage: _file_sha256(
+                path, config.resolve_cache_dir(path) if config and config.cache else None
+            )[:16]
+            for stage, path in sorted(self.model_paths.items())
+        }
+        return {
+            "models": models,
+            "fused": [
+                name
+                for name, sess in (
+                    (FUSED_DENOISE, self.fused_denoise_ort),
+                    (FUSED_DENOISE_VOCODER, self.fused_vocoder_ort),
+                )
+                if sess is not None
+            ],
+            "sample_rate": self.sample_rate,
+        }
+
+    def sample_noisy_latent(
+        self, duration: np.ndarray, rng: Optional[np.random.Generator] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
         bsz = len(duration)
         wav_len_max = duration.max() * self.sample_rate
         wav_lengths = (duration * self.sample_rate).astype(np.int64)
@@ -165,7 +694,11 @@ class TextToSpeech:
         latent_len = ((wav_len_max + chunk_size - 1) / chunk_size).astype(np.int32)
 
         latent_dim = self.ldim * self.chunk_compress_factor
-        noisy_latent = np.random.randn(bsz, latent_dim, latent_len).astype(np.float32)
+        shape = (bsz, latent_dim, int(latent_len))
+        if rng is None:
+            noisy_latent = np.random.randn(*shape).astype(np.float32)
+        else:
+            noisy_latent = rng.standard_normal(shape, dtype=np.float32)
 
         latent_mask = get_latent_mask(
             wav_lengths, self.base_chunk_size, self.chunk_compress_factor
@@ -173,6 +706,51 @@ class TextToSpeech:
         noisy_latent = noisy_latent * latent_mask
         return noisy_latent, latent_mask
 
+    def _span(self, stage: str, **args):
+        profiler = self.profiler
+        return profiler.span(stage, **args) if profiler is not None else _NO_SPAN
+
+    def _ort_profiled_tts(self) -> "TextToSpeech":
+        """ORT profiling을 켠 세션으로 만든 복제본 (첫 샘플 때 한 번만 로딩)"""
+        with self._ort_profile_lock:
+            if self._ort_profiled is not None:
+                return self._ort_profiled
+            if not self.model_paths:
+                raise RuntimeError("model_paths is empty (load with load_text_to_speech)")
+
+            profile_dir = self.profiler.ort_profile_dir
+            os.makedirs(profile_dir, exist_ok=True)
+            providers = self.vector_est_ort.get_providers()
+
+            def _load(stage: str) -> ort.InferenceSession:
+                opts = ort.SessionOptions()
+                opts.enable_profiling = True
+                opts.profile_file_prefix = os.path.join(profile_dir, stage)
+                return load_onnx(self.model_paths[stage], opts, providers)
+
+            clone = TextToSpeech(
+                self.cfgs,
+                self.text_processor,
+                *(_load(stage) for stage in ONNX_STAGES),
+                io_binding=self.use_io_binding,
+                encoder_cache_bytes=0,
+            )
+            clone.profiler = self.profiler
+            clone._is_ort_profiled = True
+            self._ort_profiled = clone
+            return clone
+
+    def end_ort_profiling(self) -> list[str]:
+        """샘플링된 ORT 프로파일을 파일로 확정하고 경로 목록 반환 (다음 샘플은 새 파일에 기록)"""
+        with self._ort_profile_lock:
+            clone, self._ort_profiled = self._ort_profiled, None
+        if clone is None:
+            return []
+        return [
+            sess.end_profiling()
+            for sess in (clone.dp_ort, clone.text_enc_ort, clone.vector_est_ort, clone.vocoder_ort)
+        ]
+
     def _infer(
         self,
         text_list: list[str],
@@ -180,44 +758,418 @@ class TextToSpeech:
         style: Style,
         total_step: int,
         speed: float = 1.0,
+        rng: Optional[np.random.Generator] = None,
+        cancel: Optional[threading.Event] = None,
     ) -> tuple[np.ndarray, np.ndarray]:
+        """cancel이 set되면 다음 denoising step 전(또는 vocoder 전)에 SynthesisCancelled"""
+        profiler = self.profiler
+        if profiler is None:
+            return self._infer_stages(
+                text_list, lang_list, style, total_step, speed, rng, cancel
+            )
+
+        if not self._is_ort_profiled and profiler.sample_ort():
+            return self._ort_profiled_tts()._infer(
+                text_list, lang_list, style, total_step, speed, rng, cancel
+            )
+        with profiler.call(
+            batch=len(text_list), total_step=total_step, ort_profiled=self._is_ort_profiled
+        ):
+            return self._infer_stages(
+                text_list, lang_list, style, total_step, speed, rng, cancel
+            )
+
+    def _infer_stages(
+        self,
+        text_list: list[str],
+        lang_list: list[str],
+        style: Style,
+        total_step: int,
+        speed: float = 1.0,
+        rng: Optional[np.random.Generator] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        text_emb_onnx, text_mask, dur_onnx = self._encode_stage(
+            text_list, lang_list, style, speed
+        )
+        check_cancel(cancel)
+        if self.fused_vocoder_ort is not None and (
+            cancel is None or self._fused_vocoder_blockable(total_step)
+        ):
+            # denoising loop + vocoder를 한 번의 run()으로
+            # (cancel이 있으면 앞쪽 step은 fused denoise 그래프로 나눠 실행, 마지막 block + vocoder만 한 번에)
+            feeds = self._fused_feeds(text_emb_onnx, text_mask, style, dur_onnx, total_step, rng)
+            with self._span("denoise_vocoder_fused", total_step=total_step):
+                if cancel is None:
+                    return self._run_fused(self.fused_vocoder_ort, feeds), dur_onnx
+                last = max(total_step - self.fused_block_steps, 0)
+                xt = self._run_fused_blocks(self.fused_denoise_ort, feeds, 0, last, cancel)
+                check_cancel(cancel)
+                feeds = dict(feeds, noisy_latent=xt, **self._step_range(last, total_step - last))
+                return self._run_fused(self.fused_vocoder_ort, feeds), dur_onnx
+
+        xt = self._denoise_stage(
+            text_emb_onnx, text_mask, style, dur_onnx, total_step, rng, cancel
+        )
+        check_cancel(cancel)
+        wav = self._vocode_stage(xt)
+        return wav, dur_onnx
+
+    # --------------------------------------------------
+    # stage 1: text processing + duration predictor + text encoder
+    # --------------------------------------------------
+    def _encode_stage(
+        self,
+        text_list: list[str],
+        lang_list: list[str],
+        style: Style,
+        speed: float = 1.0,
+    ) -> tuple[Union[np.ndarray, ort.OrtValue], np.ndarray, np.ndarray]:
         assert len(text_list) == style.ttl.shape[0], (
             "Number of texts must match number of style vectors"
         )
 
-        bsz = len(text_list)
-        text_ids, text_mask = self.text_processor(text_list, lang_list)
+        with self._span("preprocess", batch=len(text_list)) as args:
+            text_ids, text_mask = self.text_processor(text_list, lang_list)
+            if self.profiler is not None:
+                args["text_len"] = int(text_mask.shape[2])
+                args["padding_ratio"] = float(1.0 - text_mask.mean())
 
-        dur_onnx, *_ = self.dp_ort.run(
-            None, {"text_ids": text_ids, "style_dp": style.dp, "text_mask": text_mask}
-        )
+        dur_onnx, text_emb_onnx = self._run_encoders(text_ids, text_mask, style)
         dur_onnx = dur_onnx / speed
+        return text_emb_onnx, text_mask, dur_onnx
 
-        text_emb_onnx, *_ = self.text_enc_ort.run(
-            None,
-            {"text_ids": text_ids, "style_ttl": style.ttl, "text_mask": text_mask},
-        )
+    # --------------------------------------------------
+    # stage 2: flow-matching denoising loop
+    # --------------------------------------------------
+    def _denoise_stage(
+        self,
+        text_emb_onnx: Union[np.ndarray, ort.OrtValue],
+        text_mask: np.ndarray,
+        style: Style,
+        dur_onnx: np.ndarray,
+        total_step: int,
+        rng: Optional[np.random.Generator] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> Union[np.ndarray, ort.OrtValue]:
+        """
+        cancel: denoising step마다 확인
+        - fused 그래프는 cancel이 있으면 fused_block_steps개 step씩 나눠 실행하고 block 사이마다 확인
+          (start_step/num_steps 입력이 없는 예전 fused 그래프는 중간에 멈출 수 없으므로 step별 run() 경로)
+        """
+        if self.fused_denoise_ort is not None and (
+            cancel is None or self._fused_blockable(self.fused_denoise_ort)
+        ):
+            feeds = self._fused_feeds(text_emb_onnx, text_mask, style, dur_onnx, total_step, rng)
+            with self._span("denoise_fused", total_step=total_step):
+                if cancel is None:
+                    return self._run_fused(
+                        self.fused_denoise_ort, feeds, keep_on_device=self.use_io_binding
+                    )
+                return self._run_fused_blocks(
+                    self.fused_denoise_ort, feeds, 0, total_step, cancel
+                )
+
+        if self.use_io_binding:
+            return self._denoise_io_binding(
+                text_emb_onnx, text_mask, style, dur_onnx, total_step, rng, cancel
+            )
 
-        xt, latent_mask = self.sample_noisy_latent(dur_onnx)
+        bsz = len(dur_onnx)
+        xt, latent_mask = self.sample_noisy_latent(dur_onnx, rng)
 
-        total_step_np = np.array([total_step] * bsz, dtype=np.float32)
+        total_step_np = np.full(bsz, total_step, dtype=np.float32)
+        latent_len = xt.shape[2]
         for step in range(total_step):
-            current_step = np.array([step] * bsz, dtype=np.float32)
-            xt, *_ = self.vector_est_ort.run(
+            check_cancel(cancel)
+            current_step = np.full(bsz, step, dtype=np.float32)
+            with self._span("denoise_step", step=step, latent_len=latent_len):
+                xt, *_ = self.vector_est_ort.run(
+                    None,
+                    {
+                        "noisy_latent": xt,
+                        "text_emb": text_emb_onnx,
+                        "style_ttl": style.ttl,
+                        "text_mask": text_mask,
+                        "latent_mask": latent_mask,
+                        "current_step": current_step,
+                        "total_step": total_step_np,
+                    },
+                )
+        return xt
+
+    # --------------------------------------------------
+    # stage 3: vocoder
+    # --------------------------------------------------
+    def _vocode_stage(self, xt: Union[np.ndarray, ort.OrtValue]) -> np.ndarray:
+        latent_len = xt.shape()[2] if isinstance(xt, ort.OrtValue) else xt.shape[2]
+        with self._span("vocoder", latent_len=int(latent_len)):
+            return self._run_vocoder(xt)
+
+    def _run_vocoder(self, xt: Union[np.ndarray, ort.OrtValue]) -> np.ndarray:
+        if isinstance(xt, ort.OrtValue):
+            # device latent → vocoder, host로는 waveform만 복사
+            voc_binding = self.vocoder_ort.io_binding()
+            voc_binding.bind_ortvalue_input("latent", xt)
+            voc_binding.bind_output(self.vocoder_ort.get_outputs()[0].name, "cpu")
+            self.vocoder_ort.run_with_iobinding(voc_binding)
+            return voc_binding.copy_outputs_to_cpu()[0]
+
+        wav, *_ = self.vocoder_ort.run(None, {"latent": xt})
+        return wav
+
+    def _vocode_blocks(
+        self,
+        xt: Union[np.ndarray, ort.OrtValue],
+        window_frames: int = 16,
+        overlap_frames: int = 4,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[np.ndarray]:
+        """
+        latent(batch 1)을 시간축으로 겹치는 window로 나눠 vocoding하며 PCM block을 yield
+        - 인접 window는 overlap_frames만큼 겹치고, 겹친 구간은 linear crossfade
+        - 첫 block은 첫 window만 vocoding하면 바로 나오므로 문장 길이와 무관하게 빠름
+        """
+        if isinstance(xt, ort.OrtValue):
+            xt = xt.numpy()
+        latent_len = xt.shape[2]
+        if latent_len <= window_frames:
+            yield self._vocode_stage(xt)[0]
+            return
+
+        hop = window_frames - overlap_frames
+        tail = None
+        start = 0
+        while True:
+            check_cancel(cancel)
+            end = min(start + window_frames, latent_len)
+            wav = self._vocode_stage(np.ascontiguousarray(xt[:, :, start:end]))[0]
+            samples_per_frame = len(wav) // (end - start)
+            overlap = overlap_frames * samples_per_frame
+            last = end >= latent_len
+
+            if tail is None:
+                yield wav if last else wav[: len(wav) - overlap]
+            else:
+                n = len(tail)
+                ramp = np.linspace(0.0, 1.0, n, dtype=np.float32)
+                seam = tail * (1.0 - ramp) + wav[:n] * ramp
+                body = wav[n:] if last else wav[n : len(wav) - overlap]
+                yield np.concatenate([seam, body])
+
+            if last:
+                return
+            tail = wav[len(wav) - overlap :]
+            start += hop
+
+    def stream(
+        self,
+        text: str,
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float = 1.05,
+        silence_duration: float = 0.3,
+        window_frames: int = 16,
+        overlap_frames: int = 4,
+        seed: Optional[int] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[np.ndarray]:
+        """__call__과 같은 결과를 1-D PCM block 단위로 yield (청크 사이 silence 포함)"""
+        assert style.ttl.shape[0] == 1, "Single speaker supports single style only"
+
+        max_len = 120 if lang == "ko" else 300
+        rng = np.random.default_rng(seed) if seed is not None else None
+
+        for i, t in enumerate(chunk_text(text, max_len=max_len)):
+            if i > 0:
+                yield np.zeros(int(silence_duration * self.sample_rate), dtype=np.float32)
+            check_cancel(cancel)
+            text_emb_onnx, text_mask, dur_onnx = self._encode_stage([t], [lang], style, speed)
+            xt = self._denoise_stage(
+                text_emb_onnx, text_mask, style, dur_onnx, total_step, rng, cancel
+            )
+            blocks = self._vocode_blocks(xt, window_frames, overlap_frames, cancel)
+            if self.trimmer is not None:
+                blocks = self.trimmer.trim_blocks(blocks)
+            yield from blocks
+
+    def _run_encoders(
+        self, text_ids: np.ndarray, text_mask: np.ndarray, style: Style
+    ) -> tuple[np.ndarray, Union[np.ndarray, ort.OrtValue]]:
+        """duration predictor + text encoder (speed 적용 전 dur, text_emb)"""
+        key = None
+        if self.encoder_cache is not None:
+            key = EncoderCache.make_key(text_ids, style)
+            cached = self.encoder_cache.get(key)
+            if cached is not None:
+                if self.profiler is not None:
+                    self.profiler.record("encoder_cache_hit", time.perf_counter(), 0.0)
+                return cached
+
+        with self._span("duration_predictor", text_len=int(text_ids.shape[1])):
+            dur_onnx, *_ = self.dp_ort.run(
+                None, {"text_ids": text_ids, "style_dp": style.dp, "text_mask": text_mask}
+            )
+
+        if self.use_io_binding and key is None:
+            # 캐시를 안 쓰면 text encoder 출력(text_emb)을 device에 그대로 둠
+            enc_binding = self.text_enc_ort.io_binding()
+            enc_binding.bind_cpu_input("text_ids", text_ids)
+            enc_binding.bind_cpu_input("style_ttl", style.ttl)
+            enc_binding.bind_cpu_input("text_mask", text_mask)
+            enc_binding.bind_output(self.text_enc_ort.get_outputs()[0].name, self.io_device, 0)
+            with self._span("text_encoder", text_len=int(text_ids.shape[1])):
+                self.text_enc_ort.run_with_iobinding(enc_binding)
+            return dur_onnx, enc_binding.get_outputs()[0]
+
+        with self._span("text_encoder", text_len=int(text_ids.shape[1])):
+            text_emb_onnx, *_ = self.text_enc_ort.run(
                 None,
-                {
-                    "noisy_latent": xt,
-                    "text_emb": text_emb_onnx,
-                    "style_ttl": style.ttl,
-                    "text_mask": text_mask,
-                    "latent_mask": latent_mask,
-                    "current_step": current_step,
-                    "total_step": total_step_np,
-                },
+                {"text_ids": text_ids, "style_ttl": style.ttl, "text_mask": text_mask},
             )
 
-        wav, *_ = self.vocoder_ort.run(None, {"latent": xt})
-        return wav, dur_onnx
+        if key is not None:
+            self.encoder_cache.put(key, dur_onnx, text_emb_onnx)
+        return dur_onnx, text_emb_onnx
+
+    def _fused_feeds(
+        self,
+        text_emb: Union[np.ndarray, ort.OrtValue],
+        text_mask: np.ndarray,
+        style: Style,
+        dur_onnx: np.ndarray,
+        total_step: int,
+        rng: Optional[np.random.Generator] = None,
+    ) -> dict:
+        xt, latent_mask = self.sample_noisy_latent(dur_onnx, rng)
+        return {
+            "noisy_latent": xt,
+            "text_emb": text_emb,
+            "style_ttl": style.ttl,
+            "text_mask": text_mask,
+            "latent_mask": latent_mask,
+            "total_step": np.full(len(dur_onnx), total_step, dtype=np.float32),
+        }
+
+    @staticmethod
+    def _fused_blockable(sess: Optional[ort.InferenceSession]) -> bool:
+        """fused 그래프가 step 구간(start_step/num_steps) 실행을 지원하는지"""
+        return sess is not None and "start_step" in {i.name for i in sess.get_inputs()}
+
+    def _fused_vocoder_blockable(self, total_step: int) -> bool:
+        """cancel이 있을 때 fused vocoder 그래프 사용 가능 여부 (앞쪽 step은 fused denoise 그래프로)"""
+        return self._fused_blockable(self.fused_vocoder_ort) and (
+            total_step <= self.fused_block_steps or self._fused_blockable(self.fused_denoise_ort)
+        )
+
+    @staticmethod
+    def _step_range(start: int, num: int) -> dict:
+        return {
+            "start_step": np.array(start, dtype=np.int64),
+            "num_steps": np.array(num, dtype=np.int64),
+        }
+
+    def _run_fused_blocks(
+        self,
+        sess: Optional[ort.InferenceSession],
+        feeds: dict,
+        start: int,
+        stop: int,
+        cancel: Optional[threading.Event],
+    ) -> Union[np.ndarray, ort.OrtValue]:
+        """fused denoise 그래프로 step [start, stop)을 fused_block_steps씩 실행, block 전마다 cancel 확인"""
+        xt = feeds["noisy_latent"]
+        for block_start in range(start, stop, self.fused_block_steps):
+            check_cancel(cancel)
+            num = min(self.fused_block_steps, stop - block_start)
+            xt = self._run_fused(
+                sess,
+                dict(feeds, noisy_latent=xt, **self._step_range(block_start, num)),
+                keep_on_device=self.use_io_binding,
+            )
+        return xt
+
+    def _run_fused(
+        self, sess: ort.InferenceSession, feeds: dict, keep_on_device: bool = False
+    ) -> Union[np.ndarray, ort.OrtValue]:
+        """
+        fused 그래프 1회 실행 (IO binding 사용 시 device 입력은 그대로 bind)
+        - step 구간을 주지 않으면 전체 step (start_step/num_steps 입력이 있는 그래프만)
+        """
+        if "start_step" not in feeds and self._fused_blockable(sess):
+            feeds = dict(feeds, **self._step_range(0, int(feeds["total_step"][0])))
+        if not self.use_io_binding:
+            return sess.run(None, feeds)[0]
+
+        binding = sess.io_binding()
+        for name, value in feeds.items():
+            if isinstance(value, ort.OrtValue):
+                binding.bind_ortvalue_input(name, value)
+            else:
+                binding.bind_cpu_input(name, value)
+        out_name = sess.get_outputs()[0].name
+        if keep_on_device:
+            binding.bind_output(out_name, self.io_device, 0)
+            sess.run_with_iobinding(binding)
+            return binding.get_outputs()[0]
+        binding.bind_output(out_name, "cpu")
+        sess.run_with_iobinding(binding)
+        return binding.copy_outputs_to_cpu()[0]
+
+    def _to_device(self, arr: np.ndarray) -> ort.OrtValue:
+        return ort.OrtValue.ortvalue_from_numpy(np.ascontiguousarray(arr), self.io_device, 0)
+
+    def _denoise_io_binding(
+        self,
+        text_emb: Union[np.ndarray, ort.OrtValue],
+        text_mask: np.ndarray,
+        style: Style,
+        dur_onnx: np.ndarray,
+        total_step: int,
+        rng: Optional[np.random.Generator] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> ort.OrtValue:
+        """
+        denoising loop를 IO binding으로 실행 (결과 latent는 device에 남김)
+        - 상수 입력(text_emb, style_ttl, 마스크, total_step)은 device에 1회만 올림
+        - latent는 preallocated device 버퍼 2개를 ping-pong으로 재사용
+        - host로는 _vocode_stage에서 최종 waveform만 복사
+        """
+        bsz = len(dur_onnx)
+        device = self.io_device
+
+        if isinstance(text_emb, np.ndarray):
+            text_emb = self._to_device(text_emb)
+
+        xt, latent_mask = self.sample_noisy_latent(dur_onnx, rng)
+
+        binding = self.vector_est_ort.io_binding()
+        binding.bind_ortvalue_input("text_emb", text_emb)
+        binding.bind_ortvalue_input("style_ttl", self._to_device(style.ttl))
+        binding.bind_ortvalue_input("text_mask", self._to_device(text_mask))
+        binding.bind_ortvalue_input("latent_mask", self._to_device(latent_mask))
+        binding.bind_ortvalue_input(
+            "total_step", self._to_device(np.full(bsz, total_step, dtype=np.float32))
+        )
+        steps = [
+            self._to_device(np.full(bsz, step, dtype=np.float32))
+            for step in range(total_step)
+        ]
+
+        out_name = self.vector_est_ort.get_outputs()[0].name
+        cur = self._to_device(xt)
+        nxt = ort.OrtValue.ortvalue_from_shape_and_type(xt.shape, np.float32, device, 0)
+        for step in range(total_step):
+            check_cancel(cancel)
+            binding.bind_ortvalue_input("noisy_latent", cur)
+            binding.bind_ortvalue_input("current_step", steps[step])
+            binding.bind_ortvalue_output(out_name, nxt)
+            with self._span("denoise_step", step=step, latent_len=xt.shape[2]):
+                self.vector_est_ort.run_with_iobinding(binding)
+            cur, nxt = nxt, cur
+
+        return cur
 
     def __call__(
         self,
@@ -227,26 +1179,121 @@ class TextToSpeech:
         total_step: int,
         speed: float = 1.05,
         silence_duration: float = 0.3,
+        batch_size: int = 1,
+        seed: Optional[int] = None,
+        cancel: Optional[threading.Event] = None,
+        on_chunk: Optional[Callable[[], None]] = None,
     ) -> tuple[np.ndarray, np.ndarray]:
+        """on_chunk: 청크 합성이 끝날 때마다 호출 (worker heartbeat 등 진행 신호용)"""
         assert style.ttl.shape[0] == 1, "Single speaker supports single style only"
 
         max_len = 120 if lang == "ko" else 300
         text_list = chunk_text(text, max_len=max_len)
+        # seed 지정 시 noisy latent를 재현 가능하게 샘플링 (None이면 전역 np.random)
+        rng = np.random.default_rng(seed) if seed is not None else None
 
-        wav_cat = None
-        dur_cat = None
+        # batch_size > 1: 한 발화의 청크들을 길이순으로 묶어 padded batch로 추론
+        if batch_size > 1 and len(text_list) > 1:
+            results = self._infer_chunks_batched(
+                text_list, lang, style, total_step, speed, batch_size, rng, cancel
+            )
+        elif self.pipeline is not None and len(text_list) > 1:
+            # 청크 N+1의 encode / N의 denoise / N-1의 vocoding을 겹쳐서 실행
+            results = self.pipeline.map(
+                text_list, lang, style, total_step, speed, rng, cancel
+            )
+        else:
+            results = (
+                self._infer([t], [lang], style, total_step, speed, rng, cancel)
+                for t in text_list
+            )
+
+        return self.join_chunks(
+            results, silence_duration, char_counts=[len(t) for t in text_list],
+            on_chunk=on_chunk
+        )
+
+    def join_chunks(
+        self,
+        results,
+        silence_duration: float = 0.3,
+        char_counts: Optional[list[int]] = None,
+        on_chunk: Optional[Callable[[], None]] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        청크별 (wav (1, n), dur (1,))를 silence_duration 간격으로 AudioBuffer에 이어 씀
+        - results가 list면 전체 길이를 정확히 알고 한 번에 할당
+        - 아니면 첫 청크의 dp 길이 / 글자 수 비율 × 전체 글자 수로 버퍼 크기를 추정
+        - trimmer가 있으면 청크마다 앞뒤 무음을 자르고, dur도 잘린 만큼 줄임
+        - on_chunk가 있으면 청크를 받을 때마다 호출
+        """
+        gap = int(silence_duration * self.sample_rate)
+        buf = AudioBuffer()
+        if isinstance(results, list):
+            buf.reserve(sum(w.shape[1] for w, _ in results) + gap * (len(results) - 1))
 
-        for t in text_list:
-            wav, dur_onnx = self._infer([t], [lang], style, total_step, speed)
-            if wav_cat is None:
-                wav_cat = wav
-                dur_cat = dur_onnx
+        dur_cat = None
+        for i, (wav, dur_onnx) in enumerate(results):
+            if on_chunk is not None:
+                on_chunk()
+            if self.trimmer is not None:
+                trimmed = self.trimmer.trim(wav[0])
+                dur_onnx = dur_onnx - (wav.shape[1] - len(trimmed)) / self.sample_rate
+                wav = trimmed[None, :]
+            if dur_cat is None:
+                dur_cat = dur_onnx.copy()
+                if char_counts and buf.capacity == 0:
+                    samples_per_char = wav.shape[1] / max(char_counts[0], 1)
+                    estimate = samples_per_char * sum(char_counts) * 1.1
+                    buf.reserve(int(estimate) + gap * (len(char_counts) - 1))
             else:
-                silence = np.zeros((1, int(silence_duration * self.sample_rate)), dtype=np.float32)
-                wav_cat = np.concatenate([wav_cat, silence, wav], axis=1)
+                buf.append_silence(gap)
                 dur_cat += dur_onnx + silence_duration
+            buf.append(wav)
+
+        if dur_cat is None:
+            return None, None
+        return buf.finalize()[None, :], dur_cat
+
+    def _wav_lengths(self, duration: np.ndarray) -> np.ndarray:
+        """batch 1로 추론했을 때의 vocoder 출력 길이 (sample_noisy_latent와 동일한 계산)"""
+        chunk_size = self.base_chunk_size * self.chunk_compress_factor
+        latent_len = ((duration * self.sample_rate + chunk_size - 1) / chunk_size).astype(np.int64)
+        return latent_len * chunk_size
+
+    def _infer_chunks_batched(
+        self,
+        text_list: list[str],
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float,
+        batch_size: int,
+        rng: Optional[np.random.Generator] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        청크를 길이순으로 정렬해 batch_size씩 묶어 추론 (padding 낭비 최소화)
+        각 결과는 dur_onnx 기준 길이로 잘라 원래 순서대로 반환
+        """
+        order = sorted(range(len(text_list)), key=lambda i: len(text_list[i]))
+        results: list[Optional[tuple[np.ndarray, np.ndarray]]] = [None] * len(text_list)
+
+        for start in range(0, len(order), batch_size):
+            idx = order[start : start + batch_size]
+            bsz = len(idx)
+            batch_style = Style(
+                np.repeat(style.ttl, bsz, axis=0), np.repeat(style.dp, bsz, axis=0)
+            )
+            wav, dur_onnx = self._infer(
+                [text_list[i] for i in idx], [lang] * bsz, batch_style, total_step, speed, rng,
+                cancel
+            )
+            wav_lengths = np.minimum(self._wav_lengths(dur_onnx), wav.shape[1])
+            for row, i in enumerate(idx):
+                results[i] = (wav[row : row + 1, : wav_lengths[row]], dur_onnx[row : row + 1])
 
-        return wav_cat, dur_cat
+        return results
 
     def batch(
         self,
@@ -258,6 +1305,30 @@ class TextToSpeech:
     ) -> tuple[np.ndarray, np.ndarray]:
         return self._infer(text_list, lang_list, style, total_step, speed)
 
+    def warmup(
+        self,
+        style: Style,
+        lang: str = "ko",
+        total_step: int = 5,
+        rounds: int = 2,
+    ) -> list[float]:
+        """
+        대표 길이(짧은 문장 / 최대 청크 길이)의 더미 입력으로 _infer 전체 경로를 실행
+        - 첫 실제 요청이 kernel 선택/arena 확장 비용을 내지 않도록 함
+        - 반환: round별 소요 시간(초), 첫 값 = cold, 마지막 값 = steady
+        """
+        max_len = 120 if lang == "ko" else 300
+        short = "안녕하세요." if lang == "ko" else "Hello."
+        long_text = (short + " ") * (max_len // (len(short) + 1))
+
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for text in (short, long_text.strip()):
+                self._infer([text], [lang], style, total_step)
+            times.append(time.perf_counter() - start)
+        return times
+
 
 def length_to_mask(lengths: np.ndarray, max_len: Optional[int] = None) -> np.ndarray:
     max_len = max_len or lengths.max()
@@ -274,6 +1345,249 @@ def get_latent_mask(
     return length_to_mask(latent_lengths)
 
 
+ONNX_STAGES = ("duration_predictor", "text_encoder", "vector_estimator", "vocoder")
+# fuse_denoise_loop.py가 만드는 ONNX Loop 그래프 (denoising loop 전체 / + vocoder)
+FUSED_DENOISE = "vector_estimator_loop"
+FUSED_DENOISE_VOCODER = "vector_estimator_vocoder_loop"
+# fused 그래프마다 안에 그대로 들어간 FP32 stage (이 중 하나라도 variant를 고르면 해당 그래프는 사용 안 함)
+FUSED_STAGES = {
+    FUSED_DENOISE: ("vector_estimator",),
+    FUSED_DENOISE_VOCODER: ("vector_estimator", "vocoder"),
+}
+
+_GRAPH_OPT_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+_EXECUTION_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ort.ExecutionMode.ORT_PARALLEL,
+}
+
+
+class SessionConfig:
+    """
+    ORT 세션 설정 + 최적화된 모델 디스크 캐시
+    - graph_opt_level: "disable" | "basic" | "extended" | "all"
+    - intra/inter_op_threads: 0이면 ORT 기본값
+    - stage_threads: {"vector_estimator": (intra, inter), ...} 로 stage별 스레드 수 지정
+    - cache: 최적화된 그래프를 cache_dir에 저장하고 다음 실행부터 재사용
+      (키 = 모델 sha256 + ORT 버전 + 실제로 잡힌 provider + 최적화 레벨 + CPU fingerprint,
+       cache_dir 기본값은 <onnx_dir>/ort_cache)
+      ORT_ENABLE_ALL로 저장한 그래프에는 CPU 전용 fused kernel이 들어가므로,
+      cache 폴더를 다른 CPU 머신에 복사/공유해도 그 머신에서는 새로 최적화
+    """
+
+    def __init__(
+        self,
+        graph_opt_level: str = "all",
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+        execution_mode: str = "sequential",
+        stage_threads: Optional[dict[str, tuple[int, int]]] = None,
+        cache: bool = True,
+        cache_dir: Optional[str] = None,
+        log_severity_level: int = 2,
+    ):
+        self.graph_opt_level = graph_opt_level
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.execution_mode = execution_mode
+        self.stage_threads = stage_threads or {}
+        self.cache = cache
+        self.cache_dir = cache_dir
+        self.log_severity_level = log_severity_level
+        # stage → {"seconds": float, "cache": "hit" | "miss" | "off"}
+        self.load_stats: dict[str, dict] = {}
+
+    def replace(self, **changes) -> "SessionConfig":
+        """일부 설정만 바꾼 복사본 (load_stats는 새로 시작)"""
+        config = SessionConfig(
+            graph_opt_level=self.graph_opt_level,
+            intra_op_threads=self.intra_op_threads,
+            inter_op_threads=self.inter_op_threads,
+            execution_mode=self.execution_mode,
+            stage_threads=dict(self.stage_threads),
+            cache=self.cache,
+            cache_dir=self.cache_dir,
+            log_severity_level=self.log_severity_level,
+        )
+        for name, value in changes.items():
+            if not hasattr(config, name) or name == "load_stats":
+                raise TypeError(f"unknown SessionConfig option: {name}")
+            setattr(config, name, value)
+        return config
+
+    def session_options(self, stage: str) -> ort.SessionOptions:
+        opts = ort.SessionOptions()
+        opts.log_severity_level = self.log_severity_level
+        opts.graph_optimization_level = _GRAPH_OPT_LEVELS[self.graph_opt_level]
+        opts.execution_mode = _EXECUTION_MODES[self.execution_mode]
+        intra, inter = self.stage_threads.get(
+            stage, (self.intra_op_threads, self.inter_op_threads)
+        )
+        opts.intra_op_num_threads = intra
+        opts.inter_op_num_threads = inter
+        return opts
+
+    def resolve_cache_dir(self, onnx_path: str) -> str:
+        """onnx_path의 최적화 모델/hashes.json을 두는 폴더 (cache_dir 또는 <모델 폴더>/ort_cache)"""
+        return self.cache_dir or os.path.join(os.path.dirname(onnx_path), "ort_cache")
+
+    def _cache_path(self, onnx_path: str, provider: str) -> str:
+        cache_dir = self.resolve_cache_dir(onnx_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(onnx_path))[0]
+        key = "_".join(
+            [
+                _file_sha256(onnx_path, cache_dir)[:16],
+                f"ort{ort.__version__}",
+                provider.replace("ExecutionProvider", "").lower(),
+                self.graph_opt_level,
+                _machine_tag(),
+            ]
+        )
+        return os.path.join(cache_dir, f"{stem}.{key}.onnx")
+
+    def load(self, onnx_path: str, stage: str, providers: list[str]) -> ort.InferenceSession:
+        opts = self.session_options(stage)
+        start = time.perf_counter()
+
+        if not self.cache or self.graph_opt_level == "disable":
+            sess = load_onnx(onnx_path, opts, providers)
+            status = "off"
+        else:
+            # 캐시 키는 실제로 잡힌 provider 기준 (CPU 전용 onnxruntime에서 CUDA를 요청해도 cpu로 저장)
+            cached_path = self._cache_path(onnx_path, _resolve_provider(providers))
+            sess = None
+            if os.path.exists(cached_path):
+                # 이미 최적화된 그래프이므로 다시 최적화하지 않음
+                hit_opts = self.session_options(stage)
+                hit_opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+                sess = load_onnx(cached_path, hit_opts, providers)
+                status = "hit"
+                if self._cache_path(onnx_path, sess.get_providers()[0]) != cached_path:
+                    # provider 초기화가 실행 시점에 실패 → 다른 provider용 그래프는 쓰지 않음
+                    sess = None
+            if sess is None:
+                fd, tmp_path = tempfile.mkstemp(
+                    suffix=".tmp", prefix=os.path.basename(cached_path), dir=os.path.dirname(cached_path)
+                )
+                os.close(fd)
+                opts.optimized_model_filepath = tmp_path
+                try:
+                    sess = load_onnx(onnx_path, opts, providers)
+                    if os.path.getsize(tmp_path):
+                        os.replace(tmp_path, self._cache_path(onnx_path, sess.get_providers()[0]))
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                status = "miss"
+
+        self.load_stats[stage] = {"seconds": time.perf_counter() - start, "cache": status}
+        return sess
+
+
+_MACHINE_TAG: Optional[str] = None
+
+
+def _machine_tag() -> str:
+    """
+    최적화 모델 캐시 키용 CPU fingerprint (sha256[:8])
+    - 아키텍처(platform.machine) + CPU 모델명 + 명령어 집합 flags (Linux: /proc/cpuinfo)
+    - /proc/cpuinfo가 없으면(macOS/Windows) platform.processor()로 대신함
+    """
+    global _MACHINE_TAG
+    if _MACHINE_TAG is None:
+        info = {}
+        try:
+            with open("/proc/cpuinfo", "r") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    key = key.strip()
+                    # flags(x86) / Features(ARM)는 정렬해서 순서 차이를 무시
+                    if key in ("model name", "flags", "Features", "CPU part") and key not in info:
+                        info[key] = (
+                            " ".join(sorted(value.split())) if key in ("flags", "Features")
+                            else value.strip()
+                        )
+        except OSError:
+            info["processor"] = platform.processor()
+        desc = json.dumps([platform.machine(), info], sort_keys=True)
+        _MACHINE_TAG = hashlib.sha256(desc.encode()).hexdigest()[:8]
+    return _MACHINE_TAG
+
+
+def _resolve_provider(providers: list[str]) -> str:
+    """요청한 providers 중 이 onnxruntime 빌드에서 실제로 쓸 수 있는 첫 provider"""
+    available = ort.get_available_providers()
+    return next((p for p in providers if p in available), "CPUExecutionProvider")
+
+
+# load_onnx_all이 stage별로 병렬 로딩하므로 hashes.json 읽기-수정-쓰기를 직렬화
+_HASH_MEMO_LOCK = threading.Lock()
+
+
+def _read_hash_memo(memo_path: str) -> dict:
+    if not os.path.exists(memo_path):
+        return {}
+    try:
+        with open(memo_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _file_sha256(path: str, cache_dir: Optional[str]) -> str:
+    """
+    모델 파일 sha256 (size/mtime가 같으면 cache_dir/hashes.json에 저장된 값 재사용)
+    - cache_dir이 None이면 memo 없이 계산만
+    - hashes.json은 lock 안에서 다시 읽어 병합한 뒤 임시 파일 + os.replace로 교체
+      (동시에 로딩하는 다른 stage/프로세스의 항목을 덮어쓰거나 반쯤 쓴 파일을 읽지 않도록)
+    - memo 쓰기는 best-effort: 폴더를 만들 수 없거나 읽기 전용이면 저장하지 않고 hash만 반환
+    """
+    st = os.stat(path)
+    memo_path = os.path.join(cache_dir, "hashes.json") if cache_dir else None
+    memo_key = f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+    if memo_path is not None:
+        with _HASH_MEMO_LOCK:
+            digest = _read_hash_memo(memo_path).get(memo_key)
+        if digest is not None:
+            return digest
+
+    # 해싱은 lock 밖에서 (stage별 큰 모델 파일을 병렬로)
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    if memo_path is None:
+        return digest
+
+    with _HASH_MEMO_LOCK:
+        memo = _read_hash_memo(memo_path)
+        memo[memo_key] = digest
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", prefix="hashes.", dir=cache_dir)
+        except OSError:
+            return digest
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(memo, f)
+            os.replace(tmp_path, memo_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    return digest
+
+
 def load_onnx(
     onnx_path: str, opts: ort.SessionOptions, providers: list[str]
 ) -> ort.InferenceSession:
@@ -282,26 +1596,75 @@ def load_onnx(
     return sess
 
 
+def stage_model_path(onnx_dir: str, stage: str, variant: Optional[str] = None) -> str:
+    """<stage>.onnx, variant 지정 시 <stage>.<variant>.onnx (예: vector_estimator.int8_dynamic.onnx)"""
+    name = f"{stage}.{variant}.onnx" if variant else f"{stage}.onnx"
+    path = os.path.join(onnx_dir, name)
+    if variant and not os.path.exists(path):
+        raise FileNotFoundError(
+            f"{path} not found (run quantize_models.py to create the {variant} models)"
+        )
+    return path
+
+
 def load_onnx_all(
-    onnx_dir: str, opts: ort.SessionOptions, providers: list[str]
+    onnx_dir: str,
+    opts: Union[ort.SessionOptions, SessionConfig],
+    providers: list[str],
+    parallel: bool = True,
+    stage_variants: Optional[dict[str, str]] = None,
 ) -> tuple[
     ort.InferenceSession,
     ort.InferenceSession,
     ort.InferenceSession,
     ort.InferenceSession,
 ]:
-    dp_onnx_path = os.path.join(onnx_dir, "duration_predictor.onnx")
-    text_enc_onnx_path = os.path.join(onnx_dir, "text_encoder.onnx")
-    vector_est_onnx_path = os.path.join(onnx_dir, "vector_estimator.onnx")
-    vocoder_onnx_path = os.path.join(onnx_dir, "vocoder.onnx")
-
-    dp_ort = load_onnx(dp_onnx_path, opts, providers)
-    text_enc_ort = load_onnx(text_enc_onnx_path, opts, providers)
-    vector_est_ort = load_onnx(vector_est_onnx_path, opts, providers)
-    vocoder_ort = load_onnx(vocoder_onnx_path, opts, providers)
+    stage_variants = stage_variants or {}
+
+    def _load(stage: str) -> ort.InferenceSession:
+        onnx_path = stage_model_path(onnx_dir, stage, stage_variants.get(stage))
+        if isinstance(opts, SessionConfig):
+            return opts.load(onnx_path, stage, providers)
+        return load_onnx(onnx_path, opts, providers)
+
+    # parallel: 4개 세션을 동시에 생성 (그래프 로딩/최적화는 GIL 밖에서 진행됨)
+    if parallel:
+        with ThreadPoolExecutor(max_workers=len(ONNX_STAGES)) as pool:
+            sessions = list(pool.map(_load, ONNX_STAGES))
+    else:
+        sessions = [_load(stage) for stage in ONNX_STAGES]
+
+    dp_ort, text_enc_ort, vector_est_ort, vocoder_ort = sessions
     return dp_ort, text_enc_ort, vector_est_ort, vocoder_ort
 
 
+def load_fused_onnx(
+    onnx_dir: str,
+    opts: Union[ort.SessionOptions, SessionConfig],
+    providers: list[str],
+    stage_variants: Optional[dict[str, str]] = None,
+) -> tuple[Optional[ort.InferenceSession], Optional[ort.InferenceSession]]:
+    """
+    fuse_denoise_loop.py로 만든 그래프가 있으면 로딩 (없으면 None → 기존 Python loop)
+    - fused 그래프는 FP32 stage를 그대로 품고 있으므로 FUSED_STAGES 중 variant를 고른
+      stage가 있으면 그 그래프는 로딩하지 않음 (variant가 조용히 무시되지 않도록)
+    """
+    stage_variants = stage_variants or {}
+    sessions = []
+    for name in (FUSED_DENOISE, FUSED_DENOISE_VOCODER):
+        onnx_path = os.path.join(onnx_dir, f"{name}.onnx")
+        if not os.path.exists(onnx_path) or any(
+            stage_variants.get(stage) for stage in FUSED_STAGES[name]
+        ):
+            sessions.append(None)
+        elif isinstance(opts, SessionConfig):
+            sessions.append(opts.load(onnx_path, name, providers))
+        else:
+            sessions.append(load_onnx(onnx_path, opts, providers))
+    fused_denoise_ort, fused_vocoder_ort = sessions
+    return fused_denoise_ort, fused_vocoder_ort
+
+
 def load_cfgs(onnx_dir: str) -> dict:
     cfg_path = os.path.join(onnx_dir, "tts.json")
     with open(cfg_path, "r") as f:
@@ -313,14 +1676,29 @@ def load_text_processor(onnx_dir: str) -> UnicodeProcessor:
     return UnicodeProcessor(unicode_indexer_path)
 
 
-def load_text_to_speech(onnx_dir: str, use_gpu: bool = False):
+def load_text_to_speech(
+    onnx_dir: str,
+    use_gpu: bool = False,
+    io_binding: Optional[bool] = None,
+    session_config: Optional[SessionConfig] = None,
+    parallel_load: bool = True,
+    encoder_cache_bytes: int = 32 << 20,
+    stage_variants: Optional[dict[str, str]] = None,
+    fused: bool = True,
+):
     """
     - GPU 요청 시: CUDA → 실패하면 CPU로 자동 폴백
     - TensorRT는 사용하지 않음(명시적으로 provider list에서 제외)
+    - io_binding: None이면 CUDA에서만 IO binding 경로 사용 (CPU 폴백은 기존 경로)
+    - session_config: 최적화 레벨/스레드 수/최적화 모델 캐시 (기본: 캐시 사용)
+    - parallel_load: 4개 ONNX 세션을 병렬로 로딩
+    - encoder_cache_bytes: dp/text encoder 출력 캐시 크기 (0이면 비활성)
+    - stage_variants: stage별 모델 변형 선택 (예: {"vector_estimator": "int8_dynamic"})
+    - fused: fuse_denoise_loop.py로 만든 Loop 그래프가 있으면 사용
+      (그래프에 들어간 stage(vector_estimator/vocoder)의 variant를 고른 경우에는 사용하지 않음)
     """
-    opts = ort.SessionOptions()
-    # 필요하면 로그를 줄일 수 있습니다. (0=VERBOSE, 4=FATAL)
-    # opts.log_severity_level = 2  # WARNING 이상만
+    # 로그 레벨은 SessionConfig.log_severity_level (0=VERBOSE, 4=FATAL)
+    opts = session_config or SessionConfig()
 
     cfgs = load_cfgs(onnx_dir)
     text_processor = load_text_processor(onnx_dir)
@@ -330,30 +1708,50 @@ def load_text_to_speech(onnx_dir: str, use_gpu: bool = False):
         print("Using GPU (CUDA) for inference (CUDA -> CPU fallback enabled)")
         try:
             dp_ort, text_enc_ort, vector_est_ort, vocoder_ort = load_onnx_all(
-                onnx_dir, opts, providers
+                onnx_dir, opts, providers, parallel=parallel_load,
+                stage_variants=stage_variants
             )
         except Exception as e:
             print("\n[WARN] CUDAExecutionProvider 초기화 실패 → CPU로 폴백합니다.")
             print(f"       원인: {type(e).__name__}: {e}\n")
             providers = ["CPUExecutionProvider"]
             dp_ort, text_enc_ort, vector_est_ort, vocoder_ort = load_onnx_all(
-                onnx_dir, opts, providers
+                onnx_dir, opts, providers, parallel=parallel_load,
+                stage_variants=stage_variants
             )
     else:
         providers = ["CPUExecutionProvider"]
         print("Using CPU for inference")
         dp_ort, text_enc_ort, vector_est_ort, vocoder_ort = load_onnx_all(
-            onnx_dir, opts, providers
+            onnx_dir, opts, providers, parallel=parallel_load,
+            stage_variants=stage_variants
+        )
+
+    fused_denoise_ort = fused_vocoder_ort = None
+    if fused:
+        fused_denoise_ort, fused_vocoder_ort = load_fused_onnx(
+            onnx_dir, opts, providers, stage_variants=stage_variants
         )
 
-    return TextToSpeech(
+    tts = TextToSpeech(
         cfgs,
         text_processor,
         dp_ort,
         text_enc_ort,
         vector_est_ort,
         vocoder_ort,
+        io_binding=io_binding,
+        encoder_cache_bytes=encoder_cache_bytes,
+        fused_denoise_ort=fused_denoise_ort,
+        fused_vocoder_ort=fused_vocoder_ort,
     )
+    tts.load_stats = dict(opts.load_stats)
+    tts.session_config = opts
+    tts.model_paths = {
+        stage: stage_model_path(onnx_dir, stage, (stage_variants or {}).get(stage))
+        for stage in ONNX_STAGES
+    }
+    return tts
 
 
 def load_voice_style(voice_style_paths: list[str], verbose: bool = False) -> Style:
@@ -384,6 +1782,113 @@ def load_voice_style(voice_style_paths: list[str], verbose: bool = False) -> Sty
     return Style(ttl_style, dp_style)
 
 
+PACKED_STYLE_DIR = "packed"
+
+
+def pack_voice_styles(style_dir: str, out_dir: Optional[str] = None) -> str:
+    """
+    voice_styles/*.json → 바이너리 packed 포맷으로 변환
+    - <out_dir>/ttl.npy : [N, 50, 256] float32
+    - <out_dir>/dp.npy  : [N, 8, 16] float32
+    - <out_dir>/index.json : {"names": [...], "sources": {name: [size, mtime_ns]}}
+    """
+    out_dir = out_dir or os.path.join(style_dir, PACKED_STYLE_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+
+    paths = sorted(
+        os.path.join(style_dir, f) for f in os.listdir(style_dir) if f.endswith(".json")
+    )
+    names = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    style = load_voice_style(paths)
+
+    # 파일마다 임시 파일 + os.replace → 동시에 시작한 다른 프로세스(pool replica, worker)가
+    # 반쯤 쓴 .npy를 읽지 않음. index.json(최신 여부 표시)은 마지막에 교체
+    _atomic_write(os.path.join(out_dir, "ttl.npy"), lambda f: np.save(f, style.ttl))
+    _atomic_write(os.path.join(out_dir, "dp.npy"), lambda f: np.save(f, style.dp))
+    index = {"names": names, "sources": {n: _stat_key(p) for n, p in zip(names, paths)}}
+    _atomic_write(
+        os.path.join(out_dir, "index.json"),
+        lambda f: f.write(json.dumps(index, indent=2).encode("utf-8")),
+    )
+    return out_dir
+
+
+def _atomic_write(path: str, write: Callable) -> None:
+    """같은 폴더의 임시 파일에 write(f)로 쓴 뒤 os.replace로 교체"""
+    fd, tmp_path = tempfile.mkstemp(
+        suffix=".tmp", prefix=os.path.basename(path) + ".", dir=os.path.dirname(path)
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _stat_key(path: str) -> list[int]:
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class VoiceStyleRegistry:
+    """
+    packed 스타일을 mmap으로 로딩해 모든 voice(F1–F5, M1–M5)를 상주시킴
+    - get("M1") → Style (JSON 재파싱 없음, mmap 위의 view)
+    - packed 파일이 없거나 JSON이 더 새로우면 자동으로 다시 변환
+    """
+
+    def __init__(self, style_dir: str, mmap: bool = True):
+        self.style_dir = style_dir
+        packed_dir = os.path.join(style_dir, PACKED_STYLE_DIR)
+        if self._is_stale(packed_dir):
+            pack_voice_styles(style_dir, packed_dir)
+
+        with open(os.path.join(packed_dir, "index.json"), "r") as f:
+            index = json.load(f)
+        mmap_mode = "r" if mmap else None
+        self._ttl = np.load(os.path.join(packed_dir, "ttl.npy"), mmap_mode=mmap_mode)
+        self._dp = np.load(os.path.join(packed_dir, "dp.npy"), mmap_mode=mmap_mode)
+        self._rows = {name: i for i, name in enumerate(index["names"])}
+        self._styles = {name: self._slice([i]) for name, i in self._rows.items()}
+
+    def _is_stale(self, packed_dir: str) -> bool:
+        index_path = os.path.join(packed_dir, "index.json")
+        if not os.path.exists(index_path):
+            return True
+        with open(index_path, "r") as f:
+            sources = json.load(f)["sources"]
+        current = {
+            os.path.splitext(f)[0]: _stat_key(os.path.join(self.style_dir, f))
+            for f in os.listdir(self.style_dir)
+            if f.endswith(".json")
+        }
+        return current != sources
+
+    def _slice(self, rows: list[int]) -> Style:
+        if len(rows) == 1:
+            # 연속된 1행 slice는 복사 없이 mmap view 그대로 사용
+            i = rows[0]
+            return Style(self._ttl[i : i + 1], self._dp[i : i + 1])
+        return Style(self._ttl[rows], self._dp[rows])
+
+    def names(self) -> list[str]:
+        return list(self._rows)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rows
+
+    def get(self, name: str) -> Style:
+        if name not in self._styles:
+            raise KeyError(f"Unknown voice style: {name} (available: {self.names()})")
+        return self._styles[name]
+
+    def stack(self, names: list[str]) -> Style:
+        """여러 voice를 batch Style로 묶음"""
+        return self._slice([self._rows[n] for n in names])
+
+
 @contextmanager
 def timer(name: str):
     start = time.time()
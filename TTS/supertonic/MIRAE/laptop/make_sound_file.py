@@ -1,5 +1,6 @@
 import os
 from tts_engine import TTSEngine
+from tts_filler import DEFAULT_FILLER_TEXTS
 
 # ===== 경로 설정 =====
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -7,30 +8,31 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 FILLER_DIR = os.path.join(BASE_DIR, "assets", "fillers")
 os.makedirs(FILLER_DIR, exist_ok=True)
 
-OUTPUT_WAV = os.path.join(FILLER_DIR, "um.wav")
-
 # ===== TTS 엔진 =====
 ENGINE = TTSEngine(
     onnx_dir=os.path.join(BASE_DIR, "assets", "onnx"),
     voice_style_path=os.path.join(BASE_DIR, "assets", "voice_styles", "M1.json")
 )
 
-# ===== filler 텍스트 =====
-FILLER_TEXT = "음..."
+# ===== filler 텍스트 (파일 이름 → 텍스트) =====
+# 길이가 서로 다른 filler를 두면 FillerScheduler가 예상 대기 시간에 맞는 것을 고름
+FILLER_TEXTS = DEFAULT_FILLER_TEXTS
 
 if __name__ == "__main__":
-    if os.path.exists(OUTPUT_WAV):
-        print(f"♻️ 기존 filler 덮어쓰기: {OUTPUT_WAV}")
-    else:
-        print(f"🆕 filler 새로 생성: {OUTPUT_WAV}")
-
-    print("🎤 filler 음성 생성 중:", FILLER_TEXT)
-
-    ENGINE.synthesize(
-        text=FILLER_TEXT,
-        output_path=OUTPUT_WAV,
-        speed=1,        # 자연스럽게 약간 빠르게
-        total_step=5
-    )
-
-    print(f"✅ filler 음성 생성 완료: {OUTPUT_WAV}")
+    for name, text in FILLER_TEXTS.items():
+        output_wav = os.path.join(FILLER_DIR, f"{name}.wav")
+        if os.path.exists(output_wav):
+            print(f"♻️ 기존 filler 덮어쓰기: {output_wav}")
+        else:
+            print(f"🆕 filler 새로 생성: {output_wav}")
+
+        print("🎤 filler 음성 생성 중:", text)
+
+        ENGINE.synthesize(
+            text=text,
+            output_path=output_wav,
+            speed=1,        # 자연스럽게 약간 빠르게
+            total_step=5
+        )
+
+        print(f"✅ filler 음성 생성 완료: {output_wav}")
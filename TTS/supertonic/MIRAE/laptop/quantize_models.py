@@ -0,0 +1,160 @@
+# quantize_models.py
+"""
+Supertonic ONNX 모델 INT8 양자화
+
+사용법 (laptop 폴더에서):
+    python quantize_models.py dynamic
+    python quantize_models.py static --stages vector_estimator vocoder
+    python quantize_models.py --onnx-dir ../../assets/onnx dynamic --per-channel
+
+결과: <onnx_dir>/<stage>.int8_<mode>.onnx
+로딩: load_text_to_speech(onnx_dir, stage_variants={"vector_estimator": "int8_dynamic"})
+"""
+import argparse
+import os
+from typing import Optional
+
+import numpy as np
+
+from helper import ONNX_STAGES, load_text_to_speech, load_voice_style, stage_model_path
+
+# MIRAE/laptop에서 2단계 위
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_ONNX_DIR = os.path.join(BASE_DIR, "assets", "onnx")
+DEFAULT_VOICE = os.path.join(BASE_DIR, "assets", "voice_styles", "M1.json")
+
+# static 양자화 calibration + 정확도 비교에 쓰는 고정 한국어 문장
+KO_EVAL_SENTENCES = [
+    "안녕하세요! 만나서 반가워요.",
+    "오늘은 날씨가 정말 좋네요. 산책하러 가실래요?",
+    "저는 파이보예요. 궁금한 게 있으면 언제든지 물어보세요.",
+    "박수를 칩니다!",
+    "내일 아침 일곱 시에 알람을 맞춰 드릴까요?",
+    "천천히 숨을 들이마시고, 다시 천천히 내쉬어 보세요.",
+    "방금 들려주신 이야기가 정말 재미있었어요.",
+    "오늘 점심은 따뜻한 된장찌개가 어떨까요?",
+]
+
+# dynamic 양자화는 MatMul/Gemm만 (CPU에서 ConvInteger는 오히려 느린 경우가 많음)
+DYNAMIC_OP_TYPES = ["MatMul", "Gemm"]
+
+
+class _FeedRecorder:
+    """InferenceSession.run()에 들어간 입력을 기록 (static 양자화 calibration용)"""
+
+    def __init__(self, sess):
+        self.sess = sess
+        self.feeds: list[dict[str, np.ndarray]] = []
+
+    def run(self, output_names, input_feed, *args, **kwargs):
+        self.feeds.append({k: np.array(v) for k, v in input_feed.items()})
+        return self.sess.run(output_names, input_feed, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.sess, name)
+
+
+def collect_calibration_feeds(
+    onnx_dir: str, voice_style_path: str, total_step: int = 5
+) -> dict[str, list[dict[str, np.ndarray]]]:
+    """
+    FP32 모델로 KO_EVAL_SENTENCES를 합성하면서 stage별 실제 입력을 수집
+    - fused=False: Loop 그래프를 쓰면 vector_estimator/vocoder 세션이 호출되지 않아 기록이 비게 됨
+    """
+    tts = load_text_to_speech(
+        onnx_dir, use_gpu=False, io_binding=False, encoder_cache_bytes=0, fused=False
+    )
+    style = load_voice_style([voice_style_path])
+
+    recorders = {
+        "duration_predictor": _FeedRecorder(tts.dp_ort),
+        "text_encoder": _FeedRecorder(tts.text_enc_ort),
+        "vector_estimator": _FeedRecorder(tts.vector_est_ort),
+        "vocoder": _FeedRecorder(tts.vocoder_ort),
+    }
+    tts.dp_ort = recorders["duration_predictor"]
+    tts.text_enc_ort = recorders["text_encoder"]
+    tts.vector_est_ort = recorders["vector_estimator"]
+    tts.vocoder_ort = recorders["vocoder"]
+
+    rng = np.random.default_rng(0)
+    for sentence in KO_EVAL_SENTENCES:
+        tts._infer([sentence], ["ko"], style, total_step, rng=rng)
+
+    return {stage: rec.feeds for stage, rec in recorders.items()}
+
+
+def quantize_stage(
+    onnx_dir: str,
+    stage: str,
+    mode: str,
+    per_channel: bool = False,
+    calib_feeds: Optional[list[dict[str, np.ndarray]]] = None,
+) -> str:
+    # onnxruntime.quantization은 이 도구에서만 필요하므로 여기서 import
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_dynamic,
+        quantize_static,
+    )
+
+    src = stage_model_path(onnx_dir, stage)
+    dst = os.path.join(onnx_dir, f"{stage}.int8_{mode}.onnx")
+
+    if mode == "dynamic":
+        quantize_dynamic(
+            src,
+            dst,
+            op_types_to_quantize=DYNAMIC_OP_TYPES,
+            per_channel=per_channel,
+            weight_type=QuantType.QInt8,
+        )
+        return dst
+
+    class _FeedReader(CalibrationDataReader):
+        def __init__(self, feeds):
+            self._it = iter(feeds)
+
+        def get_next(self):
+            return next(self._it, None)
+
+    quantize_static(
+        src,
+        dst,
+        _FeedReader(calib_feeds),
+        quant_format=QuantFormat.QDQ,
+        per_channel=per_channel,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    return dst
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Supertonic INT8 quantization")
+    parser.add_argument("--onnx-dir", default=DEFAULT_ONNX_DIR)
+    parser.add_argument("--voice", default=DEFAULT_VOICE, help="static calibration용 voice style")
+    parser.add_argument("mode", choices=["dynamic", "static"])
+    parser.add_argument("--stages", nargs="+", choices=ONNX_STAGES, default=list(ONNX_STAGES))
+    parser.add_argument("--per-channel", action="store_true")
+    args = parser.parse_args()
+
+    calib = {}
+    if args.mode == "static":
+        print(f"🔄 calibration 입력 수집 중 ({len(KO_EVAL_SENTENCES)}문장)")
+        calib = collect_calibration_feeds(args.onnx_dir, args.voice)
+
+    for stage in args.stages:
+        print(f"🔄 {stage} → int8_{args.mode}")
+        dst = quantize_stage(
+            args.onnx_dir, stage, args.mode, args.per_channel, calib.get(stage)
+        )
+        src_mb = os.path.getsize(stage_model_path(args.onnx_dir, stage)) / (1 << 20)
+        dst_mb = os.path.getsize(dst) / (1 << 20)
+        print(f"✅ {os.path.basename(dst)} ({src_mb:.1f} MB → {dst_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,9 @@ ENGINE = TTSEngine(
     voice_style_path=os.path.join(BASE_DIR, "assets", "voice_styles", "M1.json")
 )
 
+# 긴 텍스트: 청크를 묶어서 한 번에 추론 (1이면 기존 순차 방식)
+BATCH_SIZE = 8
+
 # 출력 파일
 OUTPUT_WAV = os.path.join(os.path.dirname(__file__), "full_output.wav")
 
@@ -58,7 +61,7 @@ if __name__ == "__main__":
     start = time.time()
 
     # 전체 음성 생성
-    ENGINE.synthesize(text, OUTPUT_WAV)
+    ENGINE.synthesize(text, OUTPUT_WAV, batch_size=BATCH_SIZE)
 
     elapsed = time.time() - start
 
@@ -0,0 +1,170 @@
+# tests/conftest.py
+"""
+laptop 모듈 동등성 테스트용 공통 fixture
+- 실제 Supertonic 모델 없이 돌 수 있도록, 입출력 이름/shape만 같은 아주 작은 ONNX 모델을 만들어 씀
+  (duration_predictor / text_encoder / vector_estimator / vocoder + tts.json + unicode_indexer.json)
+- 모델 값은 의미 없지만 결정적이라 경로 간(기존 vs 최적화) 출력 비교에 충분함
+"""
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+LAPTOP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if LAPTOP_DIR not in sys.path:
+    sys.path.insert(0, LAPTOP_DIR)
+
+SAMPLE_RATE = 44100
+BASE_CHUNK_SIZE = 512
+CHUNK_COMPRESS_FACTOR = 6
+LATENT_DIM = 24
+
+
+def _unicode_indexer() -> list[int]:
+    """ASCII + 한글 자모/호환 자모만 등록, 나머지는 -1 (실제 indexer와 같은 형식)"""
+    indexer = [-1] * 65536
+    next_id = 1
+    for lo, hi in ((32, 126), (0x1100, 0x11FF), (0x3130, 0x318F)):
+        for cp in range(lo, hi + 1):
+            indexer[cp] = next_id
+            next_id += 1
+    return indexer
+
+
+def _build_models(onnx_dir: str) -> None:
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto as T
+    from onnx import helper as oh
+
+    def const(name, value, dtype=T.FLOAT):
+        dims = [len(value)] if isinstance(value, list) else []
+        return oh.make_tensor(name, dtype, dims, value if isinstance(value, list) else [value])
+
+    def save(name, nodes, inputs, outputs, inits=()):
+        graph = oh.make_graph(nodes, name, inputs, outputs, list(inits))
+        model = oh.make_model(graph, opset_imports=[oh.make_opsetid("", 17)])
+        model.ir_version = 8
+        onnx.checker.check_model(model)
+        onnx.save(model, os.path.join(onnx_dir, f"{name}.onnx"))
+
+    vi = oh.make_tensor_value_info
+    channels = LATENT_DIM * CHUNK_COMPRESS_FACTOR
+
+    # 길이(초) = 텍스트 길이 × 0.06
+    save(
+        "duration_predictor",
+        [
+            oh.make_node("ReduceSum", ["text_mask", "axes"], ["n"], keepdims=0),
+            oh.make_node("Mul", ["n", "k"], ["duration"]),
+        ],
+        [
+            vi("text_ids", T.INT64, ["B", "T"]),
+            vi("style_dp", T.FLOAT, ["B", 8, 16]),
+            vi("text_mask", T.FLOAT, ["B", 1, "T"]),
+        ],
+        [vi("duration", T.FLOAT, ["B"])],
+        [const("axes", [1, 2], T.INT64), const("k", 0.06)],
+    )
+    save(
+        "text_encoder",
+        [
+            oh.make_node("Cast", ["text_ids"], ["f"], to=T.FLOAT),
+            oh.make_node("Unsqueeze", ["f", "one"], ["u"]),
+            oh.make_node("Mul", ["u", "text_mask"], ["text_emb"]),
+        ],
+        [
+            vi("text_ids", T.INT64, ["B", "T"]),
+            vi("style_ttl", T.FLOAT, ["B", 50, 256]),
+            vi("text_mask", T.FLOAT, ["B", 1, "T"]),
+        ],
+        [vi("text_emb", T.FLOAT, ["B", 1, "T"])],
+        [const("one", [1], T.INT64)],
+    )
+    # step마다 latent를 줄이고 current_step에 비례한 값을 더함 (step 순서/횟수가 틀리면 결과가 달라짐)
+    save(
+        "vector_estimator",
+        [
+            oh.make_node("Mul", ["noisy_latent", "latent_mask"], ["a"]),
+            oh.make_node("Mul", ["a", "k"], ["b"]),
+            oh.make_node("Unsqueeze", ["current_step", "axes"], ["cs"]),
+            oh.make_node("Mul", ["cs", "k2"], ["cs2"]),
+            oh.make_node("Add", ["b", "cs2"], ["c"]),
+            oh.make_node("Mul", ["c", "latent_mask"], ["denoised_latent"]),
+        ],
+        [
+            vi("noisy_latent", T.FLOAT, ["B", channels, "L"]),
+            vi("text_emb", T.FLOAT, ["B", 1, "T"]),
+            vi("style_ttl", T.FLOAT, ["B", 50, 256]),
+            vi("text_mask", T.FLOAT, ["B", 1, "T"]),
+            vi("latent_mask", T.FLOAT, ["B", 1, "L"]),
+            vi("current_step", T.FLOAT, ["B"]),
+            vi("total_step", T.FLOAT, ["B"]),
+        ],
+        [vi("denoised_latent", T.FLOAT, ["B", channels, "L"])],
+        [const("k", 0.9), const("k2", 0.01), const("axes", [1, 2], T.INT64)],
+    )
+    # latent frame 1개 → 샘플 BASE_CHUNK_SIZE × CHUNK_COMPRESS_FACTOR개
+    save(
+        "vocoder",
+        [
+            oh.make_node("ReduceMean", ["latent"], ["m"], axes=[1], keepdims=1),
+            oh.make_node("Transpose", ["m"], ["t"], perm=[0, 2, 1]),
+            oh.make_node("Tile", ["t", "reps"], ["tiled"]),
+            oh.make_node("Reshape", ["tiled", "shape"], ["wav_tts"]),
+        ],
+        [vi("latent", T.FLOAT, ["B", channels, "L"])],
+        [vi("wav_tts", T.FLOAT, ["B", "N"])],
+        [
+            const("reps", [1, 1, BASE_CHUNK_SIZE * CHUNK_COMPRESS_FACTOR], T.INT64),
+            const("shape", [0, -1], T.INT64),
+        ],
+    )
+
+    with open(os.path.join(onnx_dir, "tts.json"), "w") as f:
+        json.dump(
+            {
+                "ae": {"sample_rate": SAMPLE_RATE, "base_chunk_size": BASE_CHUNK_SIZE},
+                "ttl": {"chunk_compress_factor": CHUNK_COMPRESS_FACTOR, "latent_dim": LATENT_DIM},
+            },
+            f,
+        )
+    with open(os.path.join(onnx_dir, "unicode_indexer.json"), "w") as f:
+        json.dump(_unicode_indexer(), f)
+
+
+def _write_voice_style(path: str, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    style = {
+        "style_ttl": {"dims": [1, 50, 256], "data": rng.standard_normal((1, 50, 256)).round(5).tolist()},
+        "style_dp": {"dims": [1, 8, 16], "data": rng.standard_normal((1, 8, 16)).round(5).tolist()},
+    }
+    with open(path, "w") as f:
+        json.dump(style, f)
+
+
+@pytest.fixture(scope="session")
+def onnx_dir(tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp("onnx"))
+    _build_models(path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def voice_style_paths(tmp_path_factory) -> list[str]:
+    style_dir = tmp_path_factory.mktemp("voice_styles")
+    paths = []
+    for seed, name in enumerate(("M1", "F1")):
+        path = str(style_dir / f"{name}.json")
+        _write_voice_style(path, seed)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture(scope="session")
+def unicode_indexer_path(tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp("indexer") / "unicode_indexer.json")
+    with open(path, "w") as f:
+        json.dump(_unicode_indexer(), f)
+    return path
@@ -0,0 +1,54 @@
+# tests/test_audio_sink.py
+"""
+open_sink(auto): 고른 backend가 받는 옵션만 전달 (sounddevice 전용 옵션을 줘도 폴백 backend가 뜸)
+"""
+import wave
+
+import numpy as np
+import pytest
+
+import tts_audio_sink
+from tts_audio_sink import NullSink, open_sink
+
+SAMPLE_RATE = 16000
+
+
+@pytest.fixture
+def no_audio_device(monkeypatch):
+    """sounddevice / aplay / 시스템 플레이어가 모두 없는 환경 → NullSink까지 폴백"""
+
+    class NoStreamSink(tts_audio_sink.StreamSink):
+        def __init__(self, sample_rate, buffer_sec=10.0, block_ms=20.0, device=None):
+            raise OSError("PortAudio library not found")
+
+    monkeypatch.setattr(tts_audio_sink, "StreamSink", NoStreamSink)
+    monkeypatch.setattr(tts_audio_sink.shutil, "which", lambda name: None)
+    monkeypatch.setattr(tts_audio_sink, "_system_player_available", lambda: False)
+
+
+def test_auto_filters_options_per_backend(no_audio_device, tmp_path):
+    path = str(tmp_path / "out.wav")
+    with pytest.warns(UserWarning, match="NullSink"):
+        sink = open_sink(
+            SAMPLE_RATE, device=3, device_buffer_ms=40, segment_sec=0.2,
+            path=path, realtime=False, block_ms=10,
+        )
+    try:
+        assert isinstance(sink, NullSink)
+        assert sink.path == path and not sink.realtime
+        assert sink.write(np.full(SAMPLE_RATE // 10, 0.1, dtype=np.float32))
+        sink.end_of_stream()
+    finally:
+        sink.close()
+    with wave.open(path, "rb") as f:
+        assert f.getframerate() == SAMPLE_RATE
+
+
+def test_auto_rejects_unknown_option(no_audio_device):
+    with pytest.raises(TypeError, match="no_such_option"):
+        open_sink(SAMPLE_RATE, no_such_option=1)
+
+
+def test_explicit_backend_passes_options_as_is():
+    with pytest.raises(TypeError):
+        open_sink(SAMPLE_RATE, "null", device=3)
@@ -0,0 +1,142 @@
+# tests/test_batcher.py
+"""
+TTSBatchScheduler: 여러 요청을 한 batch로 추론한 결과가 요청별 단독 추론(_infer)과 같은지
+- 초기 noise를 (channel, frame) 위치로만 정해지는 값으로 바꿔서 비교
+  (rng noise는 batch shape에 따라 값이 달라지므로, padding/batch 크기와 무관한 noise가 필요)
+- close(): 아직 batch에 들어가지 못한 요청은 RuntimeError로 실패, 이후 submit은 거부
+"""
+import threading
+from concurrent.futures import wait
+
+import numpy as np
+import pytest
+
+from helper import SessionConfig, TextToSpeech, load_text_to_speech, load_voice_style
+from tts_batcher import TTSBatchScheduler
+
+TEXTS = [
+    "안녕하세요.",
+    "오늘 날씨가 정말 좋네요!",
+    "hello there",
+    "짧게.",
+    "로봇이 박수를 칩니다, 하나 둘 셋.",
+]
+TOTAL_STEP = 3
+SPEED = 1.05
+
+
+def _positional_noise(tts: TextToSpeech):
+    """batch/padding과 무관하게 (channel, frame) 위치로만 정해지는 초기 noise"""
+
+    def sample_noisy_latent(duration, rng=None):
+        noisy_latent, latent_mask = TextToSpeech.sample_noisy_latent(tts, duration, rng)
+        _, channels, frames = noisy_latent.shape
+        c = np.arange(channels, dtype=np.float32)[:, None]
+        f = np.arange(frames, dtype=np.float32)[None, :]
+        noise = np.sin(0.37 * c + 0.11 * f + 0.05 * c * f).astype(np.float32)
+        return noise[None] * latent_mask, latent_mask
+
+    return sample_noisy_latent
+
+
+@pytest.fixture(scope="module")
+def tts(onnx_dir):
+    tts = load_text_to_speech(
+        onnx_dir,
+        session_config=SessionConfig(cache=False),
+        encoder_cache_bytes=0,
+        fused=False,
+    )
+    tts.sample_noisy_latent = _positional_noise(tts)
+    return tts
+
+
+@pytest.fixture(scope="module")
+def styles(voice_style_paths):
+    return [load_voice_style([path]) for path in voice_style_paths]
+
+
+def _sequential(tts, text, style):
+    wav, dur = tts._infer([text], ["ko"], style, TOTAL_STEP, SPEED)
+    return wav[:, : tts._wav_lengths(dur)[0]], dur
+
+
+def test_batched_matches_sequential(tts, styles):
+    # 요청이 모두 모일 때까지 기다리도록 max_wait를 길게
+    scheduler = TTSBatchScheduler(tts, max_batch_size=8, max_wait_ms=200)
+    try:
+        requests = [(text, styles[i % len(styles)]) for i, text in enumerate(TEXTS)]
+        futures = [
+            scheduler.submit(text, "ko", style, TOTAL_STEP, SPEED) for text, style in requests
+        ]
+        results = [fut.result(timeout=10) for fut in futures]
+        stats = scheduler.stats()
+    finally:
+        scheduler.close()
+
+    # 실제로 여러 요청이 한 batch로 묶였는지
+    assert stats["requests"] == len(TEXTS)
+    assert stats["batches"] < len(TEXTS)
+
+    for (text, style), (wav, dur) in zip(requests, results):
+        ref_wav, ref_dur = _sequential(tts, text, style)
+        assert wav.shape == ref_wav.shape, text
+        np.testing.assert_allclose(dur, ref_dur, rtol=1e-6)
+        np.testing.assert_allclose(wav, ref_wav, rtol=1e-5, atol=1e-6)
+
+
+def test_call_matches_text_to_speech(tts, styles):
+    """여러 청크로 나뉘는 긴 텍스트: scheduler(...) == tts(...) (청크 사이 무음 포함)"""
+    text = " ".join(TEXTS * 8)
+    ref_wav, ref_dur = tts(text, "ko", styles[0], TOTAL_STEP, SPEED)
+
+    scheduler = TTSBatchScheduler(tts, max_batch_size=8, max_wait_ms=50)
+    try:
+        wav, dur = scheduler(text, "ko", styles[0], TOTAL_STEP, SPEED)
+    finally:
+        scheduler.close()
+
+    assert wav.shape == ref_wav.shape
+    np.testing.assert_allclose(dur, ref_dur, rtol=1e-6)
+    np.testing.assert_allclose(wav, ref_wav, rtol=1e-5, atol=1e-6)
+
+
+def test_close_fails_queued_requests(tts, styles):
+    scheduler = TTSBatchScheduler(tts, max_batch_size=1, max_wait_ms=0)
+
+    # worker가 첫 batch 추론 중에 멈춰 있는 동안 나머지 요청을 queue에 쌓음
+    started = threading.Event()
+    release = threading.Event()
+    infer = scheduler._infer_batch
+
+    def blocking_infer(batch):
+        started.set()
+        release.wait(timeout=10)
+        infer(batch)
+
+    scheduler._infer_batch = blocking_infer
+
+    futures = [scheduler.submit(text, "ko", styles[0], TOTAL_STEP, SPEED) for text in TEXTS]
+    assert started.wait(timeout=10)
+
+    closer = threading.Thread(target=scheduler.close)
+    closer.start()
+    # close()가 queue에 남은 요청을 먼저 실패 처리한 뒤에 진행 중인 batch를 끝냄
+    _, not_done = wait(futures[1:], timeout=10)
+    assert not not_done
+    release.set()
+    closer.join(timeout=10)
+    assert not closer.is_alive()
+
+    # 진행 중이던 첫 요청은 끝까지 처리, 나머지는 모두 실패로 끝남 (영원히 기다리지 않음)
+    wav, _ = futures[0].result(timeout=1)
+    assert wav.shape[1] > 0
+    for fut in futures[1:]:
+        with pytest.raises(RuntimeError, match="scheduler closed"):
+            fut.result(timeout=1)
+
+    with pytest.raises(RuntimeError, match="scheduler closed"):
+        scheduler.submit(TEXTS[0], "ko", styles[0], TOTAL_STEP, SPEED)
+
+    # 두 번 닫아도 문제 없음
+    scheduler.close()
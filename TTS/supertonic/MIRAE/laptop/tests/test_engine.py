@@ -0,0 +1,124 @@
+# tests/test_engine.py
+"""
+TTSEngine 생성: waveform 캐시 키의 모델 fingerprint가 세션 캐시 설정과 무관하게 계산되는지
+- SessionConfig(cache=False): hashes.json memo 없이 sha256만 계산 (ort_cache 폴더를 만들지 않음)
+- SessionConfig(cache_dir=<아직 없는 폴더>): 그 폴더를 만들어 memo 저장
+"""
+import hashlib
+import os
+import shutil
+import time
+
+import pytest
+
+from helper import SessionConfig, _file_sha256, chunk_text
+import tts_engine
+from tts_engine import TTSEngine, sanitize_text
+
+
+def _engine(onnx_dir, voice_style_paths, session_config, **kwargs):
+    return TTSEngine(
+        onnx_dir=onnx_dir,
+        voice_style_path=voice_style_paths[0],
+        session_config=session_config,
+        warmup=False,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def model_dir(onnx_dir, tmp_path):
+    """세션 fixture의 모델 폴더에 ort_cache가 남지 않도록 복사본 사용"""
+    path = tmp_path / "onnx"
+    path.mkdir()
+    for name in os.listdir(onnx_dir):
+        if name.endswith((".onnx", ".json")):
+            shutil.copy(os.path.join(onnx_dir, name), path)
+    return str(path)
+
+
+def test_engine_without_session_cache(model_dir, voice_style_paths):
+    engine = _engine(model_dir, voice_style_paths, SessionConfig(cache=False))
+    assert set(engine._model_fingerprint["models"]) == {
+        "duration_predictor", "text_encoder", "vector_estimator", "vocoder"
+    }
+    assert not os.path.exists(os.path.join(model_dir, "ort_cache"))
+
+
+def test_engine_with_new_cache_dir(model_dir, voice_style_paths, tmp_path):
+    cache_dir = str(tmp_path / "elsewhere" / "ort_cache")
+    engine = _engine(model_dir, voice_style_paths, SessionConfig(cache_dir=cache_dir))
+    uncached = _engine(model_dir, voice_style_paths, SessionConfig(cache=False))
+
+    assert os.path.exists(os.path.join(cache_dir, "hashes.json"))
+    # memo 사용 여부와 관계없이 같은 fingerprint → 같은 waveform 캐시 키
+    assert engine._model_fingerprint == uncached._model_fingerprint
+    assert engine._cache_key("안녕하세요.", None, 1.05, 5, None) == uncached._cache_key(
+        "안녕하세요.", None, 1.05, 5, None
+    )
+
+
+def test_hash_memo_write_is_best_effort(model_dir):
+    """memo 폴더를 만들 수 없어도(읽기 전용 등) hash는 그대로 반환"""
+    path = os.path.join(model_dir, "vocoder.onnx")
+    with open(path, "rb") as f:
+        expected = hashlib.sha256(f.read()).hexdigest()
+    # 일반 파일 아래의 폴더 → makedirs가 OSError
+    unwritable = os.path.join(model_dir, "tts.json", "ort_cache")
+    assert _file_sha256(path, unwritable) == expected
+    assert _file_sha256(path, None) == expected
+
+
+def test_synthesize_audio_reports_each_chunk(model_dir, voice_style_paths):
+    """worker farm은 on_chunk로 일반 합성 중에도 청크마다 heartbeat를 보냄"""
+    engine = _engine(model_dir, voice_style_paths, SessionConfig(cache=False))
+    text = " ".join(["오늘 날씨가 정말 좋네요."] * 20)
+    chunks = []
+    wav = engine.synthesize_audio(text, total_step=2, on_chunk=lambda: chunks.append(1))
+    assert len(wav) > 0
+    assert len(chunks) == len(chunk_text(sanitize_text(text), max_len=120)) > 1
+
+
+def _slow_denoise(engine, delay: float) -> list:
+    """denoising step마다 delay초 → 진행 중인 합성이 있는지 step 수로 확인"""
+    steps = []
+    run = engine.tts.vector_est_ort.run
+
+    def slow_run(*args, **kwargs):
+        steps.append(time.perf_counter())
+        time.sleep(delay)
+        return run(*args, **kwargs)
+
+    engine.tts.vector_est_ort.run = slow_run
+    return steps
+
+
+def test_closing_stream_cancels_prefetched_synthesis(model_dir, voice_style_paths):
+    engine = _engine(model_dir, voice_style_paths, SessionConfig(cache=False), cache_bytes=0)
+    steps = _slow_denoise(engine, 0.02)
+    text = "첫 문장입니다. " + " ".join(["오늘 날씨가 정말 좋네요."] * 6)
+
+    stream = engine.synthesize_streaming(text, total_step=20, lookahead=1, min_chunk_length=10)
+    next(stream)  # 이 사이 백그라운드에서 다음 문장 합성 시작
+    time.sleep(0.1)
+    stream.close()  # 소비자 break (barge-in)
+    closed_at = time.perf_counter()
+
+    time.sleep(0.3)
+    # 닫은 뒤에는 진행 중이던 denoising step 1개까지만
+    assert len([t for t in steps if t > closed_at]) <= 1
+
+
+def test_single_sentence_skips_prefetch_thread(model_dir, voice_style_paths, monkeypatch):
+    engine = _engine(model_dir, voice_style_paths, SessionConfig(cache=False), cache_bytes=0)
+    calls = []
+    prefetch = tts_engine._prefetch
+    monkeypatch.setattr(
+        tts_engine, "_prefetch", lambda items, n: calls.append(n) or prefetch(items, n)
+    )
+
+    assert len(list(engine.synthesize_streaming("안녕하세요.", total_step=2))) == 1
+    assert calls == []
+    chunks = engine.synthesize_streaming("안녕하세요. 반갑습니다.", total_step=2, min_chunk_length=1)
+    assert len(list(chunks)) == 2
+    assert calls == [1]
@@ -0,0 +1,143 @@
+# tests/test_fused_loop.py
+"""
+fuse_denoise_loop.py로 만든 Loop 그래프: 기존 Python denoising loop와 출력이 같은지
+- vector_estimator_loop (denoise만) / vector_estimator_vocoder_loop (vocoder까지) 각각 비교
+- cancel을 주면 fused_block_steps개 step씩 나눠 실행 (출력은 같고, block 사이마다 cancel 확인)
+- vector_estimator/vocoder variant를 고르면 그 stage를 품은 fused 그래프만 사용하지 않는지
+"""
+import os
+import shutil
+import threading
+
+import numpy as np
+import pytest
+
+from helper import (
+    FUSED_DENOISE,
+    FUSED_DENOISE_VOCODER,
+    SessionConfig,
+    SynthesisCancelled,
+    load_text_to_speech,
+    load_voice_style,
+)
+
+onnx = pytest.importorskip("onnx")
+from fuse_denoise_loop import build_fused_model  # noqa: E402
+
+TEXTS = ["안녕하세요.", "오늘 날씨가 정말 좋네요!", "hello there"]
+TOTAL_STEP = 5
+SPEED = 1.05
+
+
+@pytest.fixture(scope="module")
+def fused_onnx_dir(onnx_dir, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("onnx_fused"))
+    for name in os.listdir(onnx_dir):
+        if name.endswith((".onnx", ".json")):
+            shutil.copy(os.path.join(onnx_dir, name), path)
+    onnx.save(build_fused_model(path, with_vocoder=False), os.path.join(path, f"{FUSED_DENOISE}.onnx"))
+    onnx.save(
+        build_fused_model(path, with_vocoder=True), os.path.join(path, f"{FUSED_DENOISE_VOCODER}.onnx")
+    )
+    # variant 선택 테스트용 (내용은 FP32 그대로)
+    shutil.copy(os.path.join(path, "vocoder.onnx"), os.path.join(path, "vocoder.int8_dynamic.onnx"))
+    return path
+
+
+def _load(onnx_dir, **kwargs):
+    return load_text_to_speech(
+        onnx_dir,
+        session_config=SessionConfig(cache=False),
+        encoder_cache_bytes=0,
+        **kwargs,
+    )
+
+
+@pytest.fixture(scope="module")
+def style(voice_style_paths):
+    # 두 voice를 batch로 → batch 차원까지 함께 확인
+    return load_voice_style(voice_style_paths)
+
+
+def _infer(tts, texts, style, cancel=None):
+    return tts._infer(
+        texts, ["ko"] * len(texts), style, TOTAL_STEP, SPEED, np.random.default_rng(0), cancel
+    )
+
+
+class _CancelAfter:
+    """is_set()을 n번째 호출부터 True로 (합성 도중 barge-in)"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.calls = 0
+
+    def is_set(self) -> bool:
+        self.calls += 1
+        return self.calls >= self.n
+
+
+@pytest.mark.parametrize("graph", ["denoise", "denoise_vocoder"])
+def test_fused_matches_python_loop(fused_onnx_dir, style, graph):
+    unfused = _load(fused_onnx_dir, fused=False)
+    fused = _load(fused_onnx_dir, fused=True)
+    assert unfused.fused_denoise_ort is None and unfused.fused_vocoder_ort is None
+    assert fused.fused_denoise_ort is not None and fused.fused_vocoder_ort is not None
+    if graph == "denoise":
+        # vocoder까지 합친 그래프가 우선이므로 끄고 denoise loop 그래프만 사용
+        fused.fused_vocoder_ort = None
+
+    for texts in (TEXTS[:2], TEXTS[1:]):
+        ref_wav, ref_dur = _infer(unfused, texts, style)
+        wav, dur = _infer(fused, texts, style)
+        np.testing.assert_array_equal(dur, ref_dur)
+        assert wav.shape == ref_wav.shape
+        np.testing.assert_allclose(wav, ref_wav, rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("graph", ["denoise", "denoise_vocoder"])
+@pytest.mark.parametrize("block_steps", [1, 2, 3, TOTAL_STEP, TOTAL_STEP + 2])
+def test_fused_blocks_with_cancel_match_python_loop(fused_onnx_dir, style, graph, block_steps):
+    unfused = _load(fused_onnx_dir, fused=False)
+    fused = _load(fused_onnx_dir, fused=True)
+    fused.fused_block_steps = block_steps
+    if graph == "denoise":
+        fused.fused_vocoder_ort = None
+
+    runs = []
+    run_fused = fused._run_fused
+    fused._run_fused = lambda sess, feeds, **kw: runs.append(sess) or run_fused(sess, feeds, **kw)
+
+    ref_wav, ref_dur = _infer(unfused, TEXTS[:2], style)
+    wav, dur = _infer(fused, TEXTS[:2], style, cancel=threading.Event())
+    np.testing.assert_array_equal(dur, ref_dur)
+    np.testing.assert_allclose(wav, ref_wav, rtol=1e-5, atol=1e-6)
+    # step별 run() 대신 fused 그래프를 block 수만큼만 실행
+    assert len(runs) == -(-TOTAL_STEP // block_steps)
+
+
+@pytest.mark.parametrize("graph", ["denoise", "denoise_vocoder"])
+def test_fused_blocks_stop_on_cancel(fused_onnx_dir, style, graph):
+    fused = _load(fused_onnx_dir, fused=True)
+    fused.fused_block_steps = 1
+    if graph == "denoise":
+        fused.fused_vocoder_ort = None
+
+    runs = []
+    run_fused = fused._run_fused
+    fused._run_fused = lambda sess, feeds, **kw: runs.append(sess) or run_fused(sess, feeds, **kw)
+
+    # encode 뒤 1번 + block 2개 실행 후 cancel
+    with pytest.raises(SynthesisCancelled):
+        _infer(fused, TEXTS[:2], style, cancel=_CancelAfter(4))
+    assert len(runs) == 2
+
+
+def test_stage_variant_disables_only_graphs_containing_it(fused_onnx_dir):
+    tts = _load(fused_onnx_dir, stage_variants={"vocoder": "int8_dynamic"})
+    assert tts.fused_denoise_ort is not None
+    assert tts.fused_vocoder_ort is None
+
+    tts = _load(fused_onnx_dir, stage_variants={"vector_estimator": None, "vocoder": None})
+    assert tts.fused_denoise_ort is not None
+    assert tts.fused_vocoder_ort is not None
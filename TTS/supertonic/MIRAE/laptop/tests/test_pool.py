@@ -0,0 +1,36 @@
+# tests/test_pool.py
+"""
+TTSEnginePool: 호출자가 준 session_config를 유지하고 replica 스레드 수만 바꾸는지
+"""
+from helper import SessionConfig
+from tts_pool import TTSEnginePool
+
+
+def test_pool_keeps_caller_session_config(onnx_dir, voice_style_paths):
+    config = SessionConfig(graph_opt_level="basic", cache=False, intra_op_threads=8)
+    pool = TTSEnginePool(
+        onnx_dir,
+        voice_style_paths[0],
+        size=2,
+        threads_per_engine=1,
+        session_config=config,
+        warmup=False,
+    )
+
+    assert len(pool.engines) == 2
+    engine_configs = [engine.tts.session_config for engine in pool.engines]
+    assert engine_configs[0] is not engine_configs[1]
+    for engine_config in engine_configs:
+        assert engine_config.graph_opt_level == "basic"
+        assert engine_config.cache is False
+        assert engine_config.intra_op_threads == 1
+        assert engine_config.inter_op_threads == 1
+        assert set(engine_config.load_stats) == {
+            "duration_predictor", "text_encoder", "vector_estimator", "vocoder"
+        }
+    # 호출자의 config는 그대로
+    assert config.intra_op_threads == 8
+    assert config.load_stats == {}
+
+    with pool.checkout() as engine:
+        assert len(engine.synthesize_audio("안녕하세요.", total_step=2)) > 0
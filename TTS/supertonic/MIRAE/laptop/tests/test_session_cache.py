@@ -0,0 +1,31 @@
+# tests/test_session_cache.py
+"""
+SessionConfig 최적화 모델 디스크 캐시
+- 같은 머신에서 다시 로딩하면 hit, CPU fingerprint가 다르면(cache 폴더를 다른 머신에 복사) miss
+"""
+import os
+
+import helper
+from helper import SessionConfig
+
+PROVIDERS = ["CPUExecutionProvider"]
+
+
+def test_cache_hit_and_machine_specific_key(onnx_dir, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "ort_cache")
+    onnx_path = os.path.join(onnx_dir, "vocoder.onnx")
+
+    config = SessionConfig(cache_dir=cache_dir)
+    config.load(onnx_path, "vocoder", PROVIDERS)
+    assert config.load_stats["vocoder"]["cache"] == "miss"
+    config.load(onnx_path, "vocoder", PROVIDERS)
+    assert config.load_stats["vocoder"]["cache"] == "hit"
+
+    cached = [name for name in os.listdir(cache_dir) if name.startswith("vocoder.")]
+    assert len(cached) == 1 and helper._machine_tag() in cached[0]
+
+    # 다른 CPU에서는 같은 cache 폴더라도 ORT_ENABLE_ALL 그래프를 재사용하지 않음
+    monkeypatch.setattr(helper, "_MACHINE_TAG", "othercpu")
+    config.load(onnx_path, "vocoder", PROVIDERS)
+    assert config.load_stats["vocoder"]["cache"] == "miss"
+    assert len([name for name in os.listdir(cache_dir) if name.startswith("vocoder.")]) == 2
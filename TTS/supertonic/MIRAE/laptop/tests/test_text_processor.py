@@ -0,0 +1,237 @@
+# tests/test_text_processor.py
+"""
+텍스트 전처리/인코딩: 최적화 전 구현(기준)과 결과가 같은지
+- TextNormalizer (컴파일된 정규식 + translate + LRU 캐시) vs 기존 _preprocess_text
+- dense lookup 벡터화 인코딩 vs 기존 문자별 indexer 조회
+"""
+import random
+import re
+from unicodedata import normalize
+
+import numpy as np
+import pytest
+
+from helper import AVAILABLE_LANGS, TextNormalizer, UnicodeProcessor
+
+
+# --------------------------------------------------
+# 기준 구현 (최적화 전 UnicodeProcessor 그대로)
+# --------------------------------------------------
+def _baseline_preprocess(text: str, lang: str) -> str:
+    text = normalize("NFKD", text)
+
+    emoji_pattern = re.compile(
+        "[\U0001f600-\U0001f64f"
+        "\U0001f300-\U0001f5ff"
+        "\U0001f680-\U0001f6ff"
+        "\U0001f700-\U0001f77f"
+        "\U0001f780-\U0001f7ff"
+        "\U0001f800-\U0001f8ff"
+        "\U0001f900-\U0001f9ff"
+        "\U0001fa00-\U0001fa6f"
+        "\U0001fa70-\U0001faff"
+        "\u2600-\u26ff"
+        "\u2700-\u27bf"
+        "\U0001f1e6-\U0001f1ff]+",
+        flags=re.UNICODE,
+    )
+    text = emoji_pattern.sub("", text)
+
+    replacements = {
+        "–": "-",
+        "-": "-",
+        "—": "-",
+        "_": " ",
+        "\u201c": '"',
+        "\u201d": '"',
+        "\u2018": "'",
+        "\u2019": "'",
+        "´": "'",
+        "`": "'",
+        "[": " ",
+        "]": " ",
+        "|": " ",
+        "/": " ",
+        "#": " ",
+        "→": " ",
+        "←": " ",
+    }
+    for k, v in replacements.items():
+        text = text.replace(k, v)
+
+    text = re.sub(r"[♥☆♡©\\]", "", text)
+
+    expr_replacements = {
+        "@": " at ",
+        "e.g.,": "for example, ",
+        "i.e.,": "that is, ",
+    }
+    for k, v in expr_replacements.items():
+        text = text.replace(k, v)
+
+    text = re.sub(r" ,", ",", text)
+    text = re.sub(r" \.", ".", text)
+    text = re.sub(r" !", "!", text)
+    text = re.sub(r" \?", "?", text)
+    text = re.sub(r" ;", ";", text)
+    text = re.sub(r" :", ":", text)
+    text = re.sub(r" '", "'", text)
+
+    while '""' in text:
+        text = text.replace('""', '"')
+    while "''" in text:
+        text = text.replace("''", "'")
+    while "``" in text:
+        text = text.replace("``", "`")
+
+    text = re.sub(r"\s+", " ", text).strip()
+
+    if not re.search(r"[.!?;:,'\"')\]}…。」』】〉》›»]$", text):
+        text += "."
+
+    if lang not in AVAILABLE_LANGS:
+        raise ValueError(f"Invalid language: {lang}")
+
+    return f"<{lang}>" + text + f"</{lang}>"
+
+
+def _baseline_encode(indexer: list[int], text_list: list[str]) -> np.ndarray:
+    lengths = [len(t) for t in text_list]
+    text_ids = np.zeros((len(text_list), max(lengths)), dtype=np.int64)
+    for i, text in enumerate(text_list):
+        unicode_vals = np.array([ord(char) for char in text], dtype=np.uint16)
+        text_ids[i, : len(unicode_vals)] = np.array(
+            [indexer[val] for val in unicode_vals], dtype=np.int64
+        )
+    return text_ids
+
+
+# 특수 규칙(치환/삭제/표현 치환/공백/따옴표 중복)에 걸리는 조각 위주로 무작위 조합
+_PIECES = list(
+    " ,.!?;:'\"`´_[]|/#→←♥☆♡©\\@–—-“”‘’abcie.g가나다한국어😀☀\n\t…」"
+) + ["e.g.,", "i.e.,", "  ", "''", '""', "``", " .", " ,"]
+
+KO_SENTENCES = [
+    "안녕하세요! 오늘 날씨가 정말 좋네요.",
+    "“로봇”이 말했다: ‘박수를 칩니다!’ — 그리고 웃었다 😀",
+    "가격은 1,200원 / 수량은 #3 [예시] 입니다",
+    "e.g., 이렇게 i.e., 저렇게 @home",
+    "   공백이    많은   문장   ",
+]
+
+
+def test_normalize_matches_baseline_on_random_inputs():
+    rng = random.Random(0)
+    for _ in range(20000):
+        text = "".join(rng.choice(_PIECES) for _ in range(rng.randint(0, 15)))
+        lang = rng.choice(AVAILABLE_LANGS)
+        assert TextNormalizer.normalize(text, lang) == _baseline_preprocess(text, lang), repr(text)
+
+
+@pytest.mark.parametrize("text", KO_SENTENCES)
+def test_normalize_matches_baseline_on_korean(text):
+    assert TextNormalizer.normalize(text, "ko") == _baseline_preprocess(text, "ko")
+
+
+def test_normalizer_cache_returns_same_result():
+    normalizer = TextNormalizer(cache_size=4)
+    first = [normalizer(t, "ko") for t in KO_SENTENCES]
+    second = [normalizer(t, "ko") for t in KO_SENTENCES]
+    assert first == second == [_baseline_preprocess(t, "ko") for t in KO_SENTENCES]
+    # 같은 텍스트라도 lang이 다르면 다른 키
+    assert normalizer(KO_SENTENCES[0], "en") == _baseline_preprocess(KO_SENTENCES[0], "en")
+
+
+def test_normalizer_rejects_unknown_lang():
+    with pytest.raises(ValueError):
+        TextNormalizer()("안녕", "xx")
+
+
+def test_encoding_matches_baseline(unicode_indexer_path):
+    processor = UnicodeProcessor(unicode_indexer_path)
+    rng = random.Random(1)
+    texts = KO_SENTENCES + [
+        "".join(rng.choice(_PIECES) for _ in range(rng.randint(1, 40))) for _ in range(200)
+    ]
+    langs = ["ko"] * len(texts)
+
+    text_ids, text_mask = processor(texts, langs)
+
+    preprocessed = [_baseline_preprocess(t, "ko") for t in texts]
+    ref = _baseline_encode(processor.indexer, preprocessed)
+    lengths = np.array([len(t) for t in preprocessed])
+
+    assert text_ids.shape == ref.shape
+    np.testing.assert_array_equal(text_mask[:, 0, :].sum(axis=1), lengths)
+    # 등록된 문자는 기존과 같은 id, 미등록(-1)은 unknown_id로 바뀜
+    known = ref >= 0
+    np.testing.assert_array_equal(text_ids[known], ref[known])
+    assert (text_ids[~known] == processor.unknown_id).all()
+
+
+# --------------------------------------------------
+# 의도된 동작 변경: 미등록 문자 / BMP 밖 문자
+# --------------------------------------------------
+UNMAPPED_BMP = "中é"  # indexer에서 -1 (테스트 indexer는 ASCII + 한글 자모만 등록)
+# BMP 밖 문자 (하위 16bit: U+10041 → 0x0041 'A', U+1D11E → 0xD11E 한글 음절 영역)
+ASTRAL = "\U00010041\U0001d11e"
+
+
+def _legacy_ids(indexer: list[int], text: str) -> list:
+    """기존 문자별 조회: uint16 변환 → numpy 1.x는 하위 16bit로 wrap, 2.x는 OverflowError"""
+    ids = []
+    for char in text:
+        try:
+            val = np.array([ord(char)], dtype=np.uint16)[0]
+        except OverflowError:
+            ids.append(OverflowError)
+            continue
+        ids.append(indexer[val])
+    return ids
+
+
+def test_encoding_behavior_change_on_unmapped_and_astral(unicode_indexer_path):
+    processor = UnicodeProcessor(unicode_indexer_path)
+    indexer = processor.indexer
+    text = "ㄱA " + UNMAPPED_BMP + ASTRAL + "z"
+
+    vals = processor._text_to_unicode_values(text)
+    # UTF-32: BMP 밖 문자도 surrogate pair로 쪼개지지 않고 문자 1개 = 값 1개
+    assert vals.tolist() == [ord(c) for c in text]
+    new = processor._encode(vals).tolist()
+    legacy = _legacy_ids(indexer, text)
+
+    # 공백 id가 unknown_id (모델 입력에 음수 id 없음)
+    assert processor.unknown_id == indexer[ord(" ")]
+    for char, new_id, legacy_id in zip(text, new, legacy):
+        if char in UNMAPPED_BMP:
+            # 기존: -1 그대로 모델에 입력 → 변경: unknown_id
+            assert legacy_id == -1 and new_id == processor.unknown_id
+        elif char in ASTRAL:
+            # 기존: 엉뚱한 BMP 문자의 id(1.x) 또는 예외(2.x) → 변경: unknown_id
+            wrapped = indexer[ord(char) & 0xFFFF]
+            assert legacy_id in (wrapped, OverflowError)
+            assert new_id == processor.unknown_id
+        else:
+            assert new_id == legacy_id == indexer[ord(char)]
+
+    # U+10041은 기존 wrap 경로에서 'A'로 읽혔음 (변경 후에는 더 이상 'A'가 아님)
+    assert indexer[0x10041 & 0xFFFF] == indexer[ord("A")] != new[text.index("\U00010041")]
+
+
+def test_call_maps_unmapped_and_astral_to_unknown_id(unicode_indexer_path):
+    processor = UnicodeProcessor(unicode_indexer_path)
+    texts = ["안녕 中 \U00010041", "하나 \U0001d11e 둘"]
+    text_ids, text_mask = processor(texts, ["ko", "ko"])
+
+    lengths = text_mask[:, 0, :].sum(axis=1).astype(int)
+    for row, text in enumerate(texts):
+        normalized = processor._preprocess_text(text, "ko")
+        assert lengths[row] == len(normalized)
+        ids = text_ids[row, : lengths[row]]
+        assert (ids >= 0).all()
+        for char, char_id in zip(normalized, ids):
+            if ord(char) >= len(processor.indexer) or processor.indexer[ord(char)] < 0:
+                assert char_id == processor.unknown_id
+            else:
+                assert char_id == processor.indexer[ord(char)]
@@ -0,0 +1,492 @@
+# tts_audio_sink.py
+import abc
+import inspect
+import platform
+import shutil
+import subprocess
+import threading
+import time
+import warnings
+import wave
+from collections import deque
+from typing import Iterable, Optional
+
+import numpy as np
+
+from tts_output import play_wav, resample, to_int16, wav_bytes
+
+AUDIO_SINKS = ("auto", "sounddevice", "aplay", "system", "null")
+
+
+def latency_stats(name: str, samples: Iterable[float]) -> dict:
+    """초 단위 지연 샘플 → {name_count, name_last_ms, name_avg_ms, name_max_ms}"""
+    ms = [s * 1000 for s in samples]
+    return {
+        f"{name}_count": len(ms),
+        f"{name}_last_ms": ms[-1] if ms else None,
+        f"{name}_avg_ms": sum(ms) / len(ms) if ms else None,
+        f"{name}_max_ms": max(ms) if ms else None,
+    }
+
+
+class AudioSink:
+    """
+    출력 장치 stream 1개를 계속 열어 두고 ring buffer로 PCM을 받는 오디오 출력
+    - write(pcm): producer가 float32 PCM을 바로 씀 (WAV 파일/bytes, 청크마다 aplay 프로세스 없음)
+      buffer가 가득 차면 자리가 날 때까지 대기
+    - 출력 쪽(장치 callback 또는 재생 스레드)은 block 단위로 꺼내 재생 → 청크 사이 공백 없음
+    - 재생 중 buffer가 비면 무음으로 채우고 underrun으로 집계
+      (write 전 / end_of_stream 이후 buffer가 비는 것은 정상 종료라 제외)
+    - clear(): buffer를 비우고 대기 중인 write를 False로 깨움 (중단용)
+      재생 중이던 소리는 clear_fade_ms 동안 fade-out (뚝 끊기는 click 방지)
+    - generation: clear()마다 증가. 발화 시작 시 읽어 둔 값을 write(generation=)로 넘기면
+      그 사이 clear()가 있었을 때 write가 버려짐 → stop 확인과 write 사이에 끝난 청크도 재생 안 됨
+    - stats(): 쓰기/재생 길이, buffer 길이, underrun 횟수/길이, 장치 latency,
+      clear → 무음까지 걸린 시간(stop_to_silence, fade + 장치 latency 포함)
+    """
+
+    clear_fade_ms = 5.0
+
+    def __init__(self, sample_rate: int, buffer_sec: float = 10.0):
+        self.sample_rate = sample_rate
+        self._ring = np.zeros(max(1, int(sample_rate * buffer_sec)), dtype=np.float32)
+        self._cond = threading.Condition()
+        # 누적 샘플 위치 (ring index = 위치 % 크기)
+        self._write_pos = 0
+        self._read_pos = 0
+        self._generation = 0
+        self._active = False
+        self._starving = False
+        self._closed = False
+
+        self.device_latency_sec = 0.0
+        self._dropped = 0
+        self._underruns = 0
+        self._underrun_frames = 0
+        self._device_underflows = 0
+        self._max_buffered = 0
+        # clear() 시각과 fade가 끝나는 위치 → 출력 쪽이 그 위치를 지나면 무음
+        self._clear_at: Optional[float] = None
+        self._silence_pos = 0
+        self._stop_latency: deque = deque(maxlen=256)
+
+    # --------------------------------------------------
+    # producer 쪽
+    # --------------------------------------------------
+    @property
+    def generation(self) -> int:
+        """clear() 횟수 (발화 시작 시 읽어 write(generation=)에 넘김)"""
+        with self._cond:
+            return self._generation
+
+    def write(
+        self,
+        pcm: np.ndarray,
+        sample_rate: Optional[int] = None,
+        generation: Optional[int] = None,
+    ) -> bool:
+        """
+        PCM을 buffer에 추가 (다 들어갈 때까지 블로킹), 도중에 clear/close되면 False
+        - generation: 이 값 이후 clear()가 있었으면 쓰지 않고 False (버린 길이는 dropped로 집계)
+        """
+        pcm = np.asarray(pcm, dtype=np.float32).reshape(-1)
+        if sample_rate is not None and sample_rate != self.sample_rate:
+            pcm = resample(pcm, sample_rate, self.sample_rate)
+
+        size = len(self._ring)
+        with self._cond:
+            if generation is None:
+                generation = self._generation
+            elif generation != self._generation:
+                self._dropped += len(pcm)
+                return False
+            self._active = True
+            pos = 0
+            while pos < len(pcm):
+                self._cond.wait_for(
+                    lambda: self._closed
+                    or self._generation != generation
+                    or self._write_pos - self._read_pos < size
+                )
+                if self._closed or self._generation != generation:
+                    return False
+
+                n = min(len(pcm) - pos, size - (self._write_pos - self._read_pos))
+                start = self._write_pos % size
+                first = min(n, size - start)
+                self._ring[start:start + first] = pcm[pos:pos + first]
+                self._ring[: n - first] = pcm[pos + first:pos + n]
+                self._write_pos += n
+                pos += n
+                self._max_buffered = max(self._max_buffered, self._write_pos - self._read_pos)
+                self._cond.notify_all()
+        return True
+
+    def end_of_stream(self) -> None:
+        """이번 발화의 마지막 write 이후 호출 → 남은 오디오를 재생하고 비는 것은 underrun이 아님"""
+        with self._cond:
+            self._active = False
+            self._cond.notify_all()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """buffer가 모두 재생될 때까지 대기 (장치 쪽 latency만큼 더 기다림), timeout이면 False"""
+        with self._cond:
+            done = self._cond.wait_for(
+                lambda: self._closed or self._write_pos == self._read_pos, timeout
+            )
+        if done and not self._closed:
+            time.sleep(self.device_latency_sec)
+        return done
+
+    def clear(self) -> None:
+        """재생 대기 중인 오디오를 버리고 진행 중인 write를 중단 (앞쪽 clear_fade_ms만 fade-out으로 남김)"""
+        now = time.perf_counter()
+        with self._cond:
+            buffered = self._write_pos - self._read_pos
+            playing = buffered > 0 or self._active
+            keep = min(buffered, int(self.sample_rate * self.clear_fade_ms / 1000))
+            if keep:
+                idx = (self._read_pos + np.arange(keep)) % len(self._ring)
+                self._ring[idx] *= np.linspace(1.0, 0.0, keep, dtype=np.float32)
+            self._dropped += buffered - keep
+            self._write_pos = self._read_pos + keep
+            self._generation += 1
+            self._active = False
+
+            if playing:
+                if keep:
+                    self._clear_at, self._silence_pos = now, self._write_pos
+                else:
+                    self._stop_latency.append(time.perf_counter() - now + self.device_latency_sec)
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def buffered_sec(self) -> float:
+        """write됐지만 아직 장치로 넘어가지 않은 오디오 길이(초)"""
+        return (self._write_pos - self._read_pos) / self.sample_rate
+
+    @property
+    def latency_sec(self) -> float:
+        """지금 write한 샘플이 들리기까지의 예상 지연 = buffer + 장치 latency"""
+        return self.buffered_sec + self.device_latency_sec
+
+    def stats(self) -> dict:
+        sr = self.sample_rate
+        with self._cond:
+            return {
+                "backend": type(self).__name__,
+                "sample_rate": sr,
+                "written_sec": (self._write_pos + self._dropped) / sr,
+                "played_sec": self._read_pos / sr,
+                "dropped_sec": self._dropped / sr,
+                "buffered_sec": (self._write_pos - self._read_pos) / sr,
+                "max_buffered_sec": self._max_buffered / sr,
+                "underruns": self._underruns,
+                "underrun_sec": self._underrun_frames / sr,
+                "device_underflows": self._device_underflows,
+                "device_latency_sec": self.device_latency_sec,
+                **latency_stats("stop_to_silence", self._stop_latency),
+            }
+
+    # --------------------------------------------------
+    # 출력 쪽
+    # --------------------------------------------------
+    def _pull(self, out: np.ndarray) -> tuple[int, bool]:
+        """out을 buffer 내용으로 채움 (모자라면 0) → (채운 샘플 수, 발화 진행 중 여부)"""
+        size = len(self._ring)
+        with self._cond:
+            n = min(len(out), self._write_pos - self._read_pos)
+            start = self._read_pos % size
+            first = min(n, size - start)
+            out[:first] = self._ring[start:start + first]
+            out[first:n] = self._ring[: n - first]
+            out[n:] = 0.0
+            self._read_pos += n
+            if self._clear_at is not None and self._read_pos >= self._silence_pos:
+                self._stop_latency.append(
+                    time.perf_counter() - self._clear_at + self.device_latency_sec
+                )
+                self._clear_at = None
+
+            if n < len(out) and self._active:
+                if not self._starving:
+                    self._underruns += 1
+                self._starving = True
+                self._underrun_frames += len(out) - n
+            else:
+                self._starving = False
+            active = self._active
+            self._cond.notify_all()
+        return n, active
+
+
+class StreamSink(AudioSink):
+    """sounddevice(PortAudio) OutputStream 1개, 장치 callback이 ring buffer에서 직접 꺼냄"""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        buffer_sec: float = 10.0,
+        block_ms: float = 20.0,
+        device=None,
+    ):
+        super().__init__(sample_rate, buffer_sec)
+        import sounddevice as sd
+
+        self._stream = sd.OutputStream(
+            samplerate=sample_rate,
+            channels=1,
+            dtype="float32",
+            blocksize=int(sample_rate * block_ms / 1000),
+            latency="low",
+            device=device,
+            callback=self._callback,
+        )
+        self._stream.start()
+        self.device_latency_sec = float(self._stream.latency)
+
+    def _callback(self, outdata, frames, time_info, status) -> None:
+        if status.output_underflow:
+            self._device_underflows += 1
+        self._pull(outdata[:, 0])
+
+    def close(self) -> None:
+        super().close()
+        self._stream.stop()
+        self._stream.close()
+
+
+class _ClockedSink(AudioSink, metaclass=abc.ABCMeta):
+    """
+    재생 스레드가 block_ms 단위로 buffer를 꺼내 _emit으로 넘김 (하위 클래스가 _emit 구현)
+    - realtime=True: 실제 재생 속도(lead_sec만큼 앞서)로 꺼냄 → underrun/latency가 장치와 같게 측정
+    - realtime=False: 대기 없이 바로 꺼냄 (파일 기록용)
+    - 발화가 없을 때는 데이터가 들어올 때까지 대기
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        buffer_sec: float = 10.0,
+        block_ms: float = 20.0,
+        lead_sec: float = 0.05,
+        realtime: bool = True,
+    ):
+        super().__init__(sample_rate, buffer_sec)
+        self.realtime = realtime
+        self.lead_sec = lead_sec if realtime else 0.0
+        self._block = np.zeros(max(1, int(sample_rate * block_ms / 1000)), dtype=np.float32)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _has_work(self) -> bool:
+        return (
+            self._closed
+            or self._write_pos > self._read_pos
+            or (self.realtime and self._active)
+        )
+
+    def _run(self) -> None:
+        start, emitted = time.monotonic(), 0
+        while True:
+            with self._cond:
+                if not self._has_work():
+                    self._cond.wait_for(self._has_work, timeout=0.5)
+                    start, emitted = time.monotonic(), 0
+                if self._closed:
+                    break
+                if not self._has_work():
+                    continue
+
+            if self.realtime:
+                ahead = emitted / self.sample_rate - (time.monotonic() - start) - self.lead_sec
+                if ahead > 0:
+                    time.sleep(ahead)
+            n, active = self._pull(self._block)
+            self._emit(self._block, n, active)
+            emitted += len(self._block)
+
+    @abc.abstractmethod
+    def _emit(self, block: np.ndarray, n: int, active: bool) -> None:
+        """꺼낸 block 전달 (n: 실제 데이터 샘플 수, 나머지는 0 / active: 발화 진행 중)"""
+
+    def close(self) -> None:
+        super().close()
+        self._thread.join()
+
+
+class PipeSink(_ClockedSink):
+    """장치 API가 없을 때: 계속 떠 있는 aplay 프로세스 1개에 raw int16 PCM을 stdin으로 전달 (Linux)"""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        buffer_sec: float = 10.0,
+        block_ms: float = 20.0,
+        device_buffer_ms: int = 60,
+        lead_sec: float = 0.03,
+    ):
+        # aplay 쪽 buffer가 작을수록 clear() 후 빨리 조용해짐 (너무 작으면 장치 underflow)
+        super().__init__(sample_rate, buffer_sec, block_ms, lead_sec=lead_sec)
+        self._proc = subprocess.Popen(
+            [
+                "aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "1",
+                "-r", str(sample_rate), "-B", str(device_buffer_ms * 1000),
+            ],
+            stdin=subprocess.PIPE,
+        )
+        self.device_latency_sec = self.lead_sec + device_buffer_ms / 1000
+        self._thread.start()
+
+    def _emit(self, block: np.ndarray, n: int, active: bool) -> None:
+        try:
+            self._proc.stdin.write(to_int16(block).tobytes())
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            warnings.warn("aplay 출력이 종료되었습니다.")
+            AudioSink.close(self)  # 재생 스레드 안이므로 join 없이 종료 표시만
+
+    def close(self) -> None:
+        super().close()
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        self._proc.wait()
+
+
+class NullSink(_ClockedSink):
+    """
+    장치 없는 환경(테스트/CI)용: 재생된 오디오를 WAV 파일(path)에 기록하거나 버림
+    - 발화 중 underrun 구간은 무음으로 기록 → 파일에서 공백을 그대로 확인 가능
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        path: Optional[str] = None,
+        buffer_sec: float = 10.0,
+        block_ms: float = 20.0,
+        realtime: bool = True,
+    ):
+        super().__init__(sample_rate, buffer_sec, block_ms, lead_sec=block_ms / 1000, realtime=realtime)
+        self.path = path
+        self._file = None
+        if path is not None:
+            self._file = wave.open(path, "wb")
+            self._file.setnchannels(1)
+            self._file.setsampwidth(2)
+            self._file.setframerate(sample_rate)
+        self.device_latency_sec = self.lead_sec
+        self._thread.start()
+
+    def _emit(self, block: np.ndarray, n: int, active: bool) -> None:
+        if self._file is None:
+            return
+        if active:
+            self._file.writeframes(to_int16(block).tobytes())
+        elif n:
+            self._file.writeframes(to_int16(block[:n]).tobytes())
+
+    def close(self) -> None:
+        super().close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SystemPlayerSink(_ClockedSink):
+    """
+    sounddevice/aplay가 없을 때의 플랫폼 기본 재생 (Windows winsound, macOS afplay → tts_output.play_wav)
+    - 장치 stream이 없으므로 buffer를 segment_sec 단위로 모아 WAV bytes 1개씩 재생 (재생 동안 블로킹)
+    - buffer가 비면(발화 끝/합성이 느림) 모인 만큼 바로 재생
+    - clear()는 재생 중인 segment가 끝난 뒤 적용됨 → stop_to_silence 최대 segment_sec
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        buffer_sec: float = 10.0,
+        block_ms: float = 20.0,
+        segment_sec: float = 0.5,
+    ):
+        super().__init__(sample_rate, buffer_sec, block_ms, realtime=False)
+        self._segment = int(sample_rate * segment_sec)
+        self._pending: list[np.ndarray] = []
+        self._pending_len = 0
+        self.device_latency_sec = segment_sec
+        self._thread.start()
+
+    def _emit(self, block: np.ndarray, n: int, active: bool) -> None:
+        if n:
+            self._pending.append(block[:n].copy())
+            self._pending_len += n
+        if self._pending_len >= self._segment or (n < len(block) and self._pending_len):
+            pcm = np.concatenate(self._pending)
+            self._pending, self._pending_len = [], 0
+            try:
+                play_wav(wav_bytes(to_int16(pcm), self.sample_rate))
+            except Exception as e:
+                warnings.warn(f"재생 실패: {type(e).__name__}: {e}")
+
+
+def _system_player_available() -> bool:
+    system = platform.system()
+    return system == "Windows" or (system == "Darwin" and shutil.which("afplay") is not None)
+
+
+def _sink_kwargs(cls: type, kwargs: dict, strict: bool) -> dict:
+    """backend를 직접 고른 경우(strict)는 그대로, auto면 cls가 받는 옵션만"""
+    if strict:
+        return kwargs
+    params = inspect.signature(cls.__init__).parameters
+    return {name: value for name, value in kwargs.items() if name in params}
+
+
+def open_sink(sample_rate: int, backend: str = "auto", **kwargs) -> AudioSink:
+    """
+    backend: "sounddevice" | "aplay" | "system" | "null" | "auto"
+    - auto: sounddevice → aplay(Linux) → system(Windows winsound / macOS afplay)
+      → NullSink(경고) 순으로 사용 가능한 것
+    - kwargs: backend별 옵션 (buffer_sec / block_ms는 공통)
+      · sounddevice: device   · aplay: device_buffer_ms, lead_sec
+      · system: segment_sec   · null: path, realtime
+      backend를 직접 고르면 그대로 전달(맞지 않는 옵션은 TypeError),
+      auto면 고른 backend가 받는 옵션만 전달 (어느 backend에도 없는 옵션은 TypeError)
+    """
+    if backend not in AUDIO_SINKS:
+        raise ValueError(f"Unknown audio sink: {backend} (available: {AUDIO_SINKS})")
+
+    strict = backend != "auto"
+    if not strict:
+        known = set()
+        for cls in (StreamSink, PipeSink, SystemPlayerSink, NullSink):
+            known.update(inspect.signature(cls.__init__).parameters)
+        unknown = sorted(set(kwargs) - known)
+        if unknown:
+            raise TypeError(f"open_sink() got unexpected audio sink options: {unknown}")
+
+    if backend in ("auto", "sounddevice"):
+        try:
+            return StreamSink(sample_rate, **_sink_kwargs(StreamSink, kwargs, strict))
+        except Exception as e:
+            if backend == "sounddevice":
+                raise
+            reason = f"{type(e).__name__}: {e}"
+    if backend in ("auto", "aplay"):
+        if shutil.which("aplay"):
+            return PipeSink(sample_rate, **_sink_kwargs(PipeSink, kwargs, strict))
+        if backend == "aplay":
+            raise RuntimeError("aplay not found")
+    if backend in ("auto", "system"):
+        if _system_player_available():
+            return SystemPlayerSink(sample_rate, **_sink_kwargs(SystemPlayerSink, kwargs, strict))
+        if backend == "system":
+            raise RuntimeError(f"no system audio player on {platform.system()}")
+    if backend == "auto":
+        warnings.warn(f"오디오 출력 장치를 열 수 없어 NullSink 사용 ({reason})")
+    return NullSink(sample_rate, **_sink_kwargs(NullSink, kwargs, strict))
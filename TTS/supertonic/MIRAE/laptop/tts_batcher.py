@@ -0,0 +1,248 @@
+# tts_batcher.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+import numpy as np
+
+from helper import Style, TextToSpeech, check_cancel, chunk_text
+
+
+class _Request:
+    __slots__ = ("text", "lang", "style", "total_step", "speed", "seed", "future")
+
+    def __init__(
+        self,
+        text: str,
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float,
+        seed: Optional[int] = None,
+    ):
+        self.text = text
+        self.lang = lang
+        self.style = style
+        self.total_step = total_step
+        self.speed = speed
+        self.seed = seed
+        self.future: Future = Future()
+
+
+class TTSBatchScheduler:
+    """
+    여러 요청(로봇/스레드)의 _infer 호출을 모아서 한 번의 batch 추론으로 처리
+    - max_wait_ms 동안 요청을 모은 뒤 (total_step, speed, 텍스트 길이 구간)별로 묶음
+    - 서로 다른 voice style은 Style batch로 쌓아서 함께 추론
+    - 결과 waveform은 각 요청의 Future로 돌려줌
+    """
+
+    def __init__(
+        self,
+        tts: TextToSpeech,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        length_bucket: int = 40,
+    ):
+        self.tts = tts
+        self.sample_rate = tts.sample_rate
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.length_bucket = length_bucket
+
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._padded_chars = 0
+        self._text_chars = 0
+        self._max_queue_depth = 0
+        # close() 이후 submit은 거부 (queue의 종료 표시 뒤에 들어가 영원히 처리되지 않는 요청 방지)
+        self._close_lock = threading.Lock()
+        self._closed = False
+
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    # -----------------------------
+    # Public
+    # -----------------------------
+    def submit(
+        self,
+        text: str,
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float = 1.05,
+        seed: Optional[int] = None,
+    ) -> Future:
+        """청크 1개 추론 요청 → Future[(wav (1, n), dur (1,))]"""
+        assert style.ttl.shape[0] == 1, "Submit one style per request"
+        req = _Request(text, lang, style, total_step, speed, seed)
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("scheduler closed")
+            self._queue.put(req)
+        with self._stats_lock:
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return req.future
+
+    def __call__(
+        self,
+        text: str,
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float = 1.05,
+        silence_duration: float = 0.3,
+        batch_size: int = 1,
+        seed: Optional[int] = None,
+        cancel: Optional[threading.Event] = None,
+        on_chunk: Optional[Callable[[], None]] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        TextToSpeech.__call__과 같은 시그니처 (batch_size는 스케줄러가 결정하므로 무시)
+        - cancel: 다른 요청과 같은 batch로 추론 중인 청크는 멈추지 않고,
+          청크 결과를 받을 때마다 확인해 아직 batch에 들어가지 않은 청크를 취소
+        """
+        max_len = 120 if lang == "ko" else 300
+        texts = chunk_text(text, max_len=max_len)
+        futures = [self.submit(t, lang, style, total_step, speed, seed) for t in texts]
+
+        def results():
+            try:
+                for fut in futures:
+                    check_cancel(cancel)
+                    yield fut.result()
+            finally:
+                for fut in futures:
+                    fut.cancel()
+
+        return self.tts.join_chunks(
+            results(),
+            silence_duration,
+            char_counts=[len(t) for t in texts],
+            on_chunk=on_chunk
+        )
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            batches = self._batches
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": batches,
+                "requests": self._requests,
+                "avg_batch_size": self._requests / batches if batches else 0.0,
+                "batch_occupancy": (
+                    self._requests / (batches * self.max_batch_size) if batches else 0.0
+                ),
+                "padding_ratio": (
+                    1 - self._text_chars / self._padded_chars if self._padded_chars else 0.0
+                ),
+            }
+
+    def close(self) -> None:
+        """
+        진행 중인 batch만 끝내고 종료
+        - 아직 batch에 들어가지 못한 요청의 Future는 RuntimeError("scheduler closed")로 실패 처리
+          (shutdown 때 future.result()에서 영원히 기다리지 않도록)
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._fail_queued()
+            self._queue.put(None)
+        self._worker.join()
+        self._fail_queued()
+
+    # -----------------------------
+    # Internal
+    # -----------------------------
+    def _fail_queued(self) -> None:
+        while True:
+            try:
+                req = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if req is not None and req.future.set_running_or_notify_cancel():
+                req.future.set_exception(RuntimeError("scheduler closed"))
+
+    def _collect(self, first: _Request) -> tuple[list[_Request], bool]:
+        pending = [first]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(pending) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                req = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if req is None:
+                return pending, True
+            pending.append(req)
+
+        return pending, False
+
+    def _bucketize(self, pending: list[_Request]) -> list[list[_Request]]:
+        buckets: dict[tuple, list[_Request]] = {}
+        for req in pending:
+            # seed가 지정된 요청은 같은 seed끼리만 묶음 (batch 단위로 rng를 만들기 때문)
+            key = (req.total_step, req.speed, req.seed, len(req.text) // self.length_bucket)
+            buckets.setdefault(key, []).append(req)
+        return list(buckets.values())
+
+    def _infer_batch(self, batch: list[_Request]) -> None:
+        bsz = len(batch)
+        style = Style(
+            np.concatenate([r.style.ttl for r in batch], axis=0),
+            np.concatenate([r.style.dp for r in batch], axis=0),
+        )
+
+        seed = batch[0].seed
+        try:
+            wav, dur_onnx = self.tts._infer(
+                [r.text for r in batch],
+                [r.lang for r in batch],
+                style,
+                batch[0].total_step,
+                batch[0].speed,
+                np.random.default_rng(seed) if seed is not None else None,
+            )
+        except Exception as e:
+            for r in batch:
+                r.future.set_exception(e)
+            return
+
+        wav_lengths = np.minimum(self.tts._wav_lengths(dur_onnx), wav.shape[1])
+        for row, r in enumerate(batch):
+            r.future.set_result(
+                (wav[row : row + 1, : wav_lengths[row]].copy(), dur_onnx[row : row + 1])
+            )
+
+        lengths = [len(r.text) for r in batch]
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += bsz
+            self._text_chars += sum(lengths)
+            self._padded_chars += max(lengths) * bsz
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            pending, closing = self._collect(first)
+            # 취소된 요청은 제외, 나머지는 running으로 표시 (이후 cancel()은 무시됨)
+            pending = [r for r in pending if r.future.set_running_or_notify_cancel()]
+            for batch in self._bucketize(pending):
+                self._infer_batch(batch)
+
+            if closing:
+                break
@@ -0,0 +1,183 @@
+# tts_cache.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+
+class WaveformCache:
+    """
+    content-addressed waveform 캐시
+    - 키: (정규화된 텍스트, lang, voice, speed, total_step, seed, model)의 sha256
+      model: 모델 파일 hash/variant, fused 여부, 샘플레이트, 무음 trim 설정 등
+      → 모델이나 후처리가 바뀌면 디스크 캐시의 이전 오디오를 쓰지 않음
+    - 1차: 메모리 LRU (max_bytes 기준으로 오래된 항목부터 제거)
+    - 2차(선택): disk_dir에 <key>.npy 저장, disk_max_bytes 초과 시 오래 안 쓴 파일부터 삭제
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 << 20,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 512 << 20,
+    ):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._mem: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._mem_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        self.mem_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(
+                os.path.getsize(os.path.join(disk_dir, f))
+                for f in os.listdir(disk_dir)
+                if f.endswith(".npy")
+            )
+
+    @staticmethod
+    def make_key(
+        text: str,
+        lang: str,
+        voice: str,
+        speed: float,
+        total_step: int,
+        seed: Optional[int],
+        model: Optional[dict] = None,
+    ) -> str:
+        payload = json.dumps(
+            [text, lang, voice, round(float(speed), 4), int(total_step), seed, model],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # -----------------------------
+    # Public
+    # -----------------------------
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            wav = self._mem.get(key)
+            if wav is not None:
+                self._mem.move_to_end(key)
+                self.mem_hits += 1
+                self.bytes_saved += wav.nbytes
+                return wav
+
+        wav = self._disk_get(key)
+        with self._lock:
+            if wav is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self.bytes_saved += wav.nbytes
+            self._mem_put(key, wav)
+        return wav
+
+    def put(self, key: str, wav: np.ndarray) -> None:
+        # 캐시에 들어간 배열은 호출자가 수정하지 못하도록 read-only 복사본으로 보관
+        wav = np.array(wav, dtype=np.float32, copy=True)
+        wav.flags.writeable = False
+        with self._lock:
+            self._mem_put(key, wav)
+        self._disk_put(key, wav)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.mem_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "hits": hits,
+                "mem_hits": self.mem_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / total if total else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "mem_entries": len(self._mem),
+                "mem_bytes": self._mem_bytes,
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._mem_bytes = 0
+
+    # -----------------------------
+    # Internal
+    # -----------------------------
+    def _mem_put(self, key: str, wav: np.ndarray) -> None:
+        if wav.nbytes > self.max_bytes:
+            return
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= old.nbytes
+        self._mem[key] = wav
+        self._mem_bytes += wav.nbytes
+        while self._mem_bytes > self.max_bytes:
+            _, evicted = self._mem.popitem(last=False)
+            self._mem_bytes -= evicted.nbytes
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.npy")
+
+    def _disk_get(self, key: str) -> Optional[np.ndarray]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            wav = np.load(path)
+            os.utime(path)  # LRU eviction용 접근 시각 갱신
+        except (OSError, ValueError):
+            return None
+        wav.flags.writeable = False
+        return wav
+
+    def _disk_put(self, key: str, wav: np.ndarray) -> None:
+        if not self.disk_dir or wav.nbytes > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, wav)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._disk_bytes += os.path.getsize(path)
+            if self._disk_bytes > self.disk_max_bytes:
+                self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        entries = []
+        for f in os.listdir(self.disk_dir):
+            if f.endswith(".npy"):
+                p = os.path.join(self.disk_dir, f)
+                st = os.stat(p)
+                entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(p)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
@@ -1,16 +1,14 @@
 # tts_core.py
 import os
 import time
-import queue
 import threading
-import platform
-import subprocess
 import re
+from collections import deque
 from typing import Optional
 
-from scipy.io import wavfile
+from tts_audio_sink import AudioSink, latency_stats, open_sink
 from tts_engine import TTSEngine
-import numpy as np
+from tts_filler import FillerBank, FillerScheduler
 
 
 def split_text(text: str, first_free: bool = True, min_len: int = 40):
@@ -54,31 +52,43 @@ def split_text(text: str, first_free: bool = True, min_len: int = 40):
 
 class TTSService:
     """
-    - 서버 프로세스 시작 시 ONNX 엔진을 1회 로딩하고 재사용
+    - 서버 프로세스 시작 시 ONNX 엔진과 오디오 출력 stream을 1회 열고 재사용
     - speak_async()로 백그라운드 합성/재생 실행
-    - stop() 호출 시, 다음 청크부터 재생/생성을 중단(협조적 취소)
+    - 합성된 PCM은 바로 sink(ring buffer)에 씀 → 청크 사이 공백 없이 이어서 재생
+    - stop() 호출 시 재생 대기 오디오를 버려 즉시 조용해지고(barge-in),
+      진행 중인 합성도 다음 denoising step 전에 중단
     """
 
-    def __init__(self):
+    def __init__(self, sink: Optional[AudioSink] = None):
         # laptop 폴더 기준으로 BASE_DIR = MIRAE (.., ..)
         self.base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
         self.engine = TTSEngine(
             onnx_dir=os.path.join(self.base_dir, "assets", "onnx"),
             voice_style_path=os.path.join(self.base_dir, "assets", "voice_styles", "M1.json"),
+            pipeline=True,  # 다음 문장의 encode/denoise를 현재 문장의 vocoding과 겹쳐 실행
         )
 
-        self.filler_wav = os.path.join(self.base_dir, "assets", "fillers", "um.wav")
+        # 출력 stream 하나를 계속 열어 둠 (청크마다 aplay 프로세스/장치 open 없음)
+        self.sink = sink or open_sink(self.engine.sample_rate)
 
-        # 임시 wav 청크 저장 폴더
-        self.temp_dir = os.path.join(os.path.dirname(__file__), "..", "_tmp_audio")
-        os.makedirs(self.temp_dir, exist_ok=True)
+        # filler bank(assets/fillers/*.wav)는 시작 시 메모리에 올려 둠
+        # 예상 첫 소리 지연이 길 때만, 그 공백 길이에 맞는 filler를 sink에 먼저 씀
+        self.filler_dir = os.path.join(self.base_dir, "assets", "fillers")
+        self.fillers = FillerScheduler(
+            self.engine.step_policy,
+            FillerBank.from_dir(self.filler_dir, self.engine.sample_rate),
+        )
 
-        # 실행 제어
+        # 실행 제어 (작업마다 새 Event → 이전 작업이 새 작업의 clear()에 되살아나지 않음)
         self._stop_event = threading.Event()
         self._worker_thread: Optional[threading.Thread] = None
         self._lock = threading.Lock()
 
+        # stop() → 합성 스레드 종료까지 걸린 시간(초) (무음까지의 시간은 sink가 측정)
+        self._stop_at = 0.0
+        self._abort_latency: deque = deque(maxlen=256)
+
     # -----------------------------
     # Public API
     # -----------------------------
@@ -87,8 +97,10 @@ class TTSService:
         return t is not None and t.is_alive()
 
     def stop(self) -> None:
-        """현재 진행 중인 재생/생성을 중단 요청."""
+        """현재 진행 중인 재생/생성을 중단 (재생은 즉시, 합성은 다음 denoising step 전에)"""
+        self._stop_at = time.perf_counter()
         self._stop_event.set()
+        self.sink.clear()
 
     def speak_async(self, text: str) -> None:
         """
@@ -102,155 +114,129 @@ class TTSService:
         with self._lock:
             # 기존 실행 중이면 중단 요청
             if self.is_running():
-                self._stop_event.set()
+                self.stop()
 
             # 새 작업 준비
-            self._stop_event.clear()
+            self._stop_event = threading.Event()
             self._worker_thread = threading.Thread(
                 target=self._run_pipeline,
-                args=(text,),
+                args=(text, self._stop_event),
                 daemon=True
             )
             self._worker_thread.start()
 
+    def audio_stats(self) -> dict:
+        """sink underrun / latency, stop → 무음 / stop → 합성 중단 지연, filler 선택 통계"""
+        return {
+            **self.sink.stats(),
+            **latency_stats("synth_abort", self._abort_latency),
+            "filler": self.fillers.stats(),
+        }
+
     # -----------------------------
     # Internal helpers
     # -----------------------------
-    def _play_wav(self, path: str) -> None:
-        system = platform.system()
-        try:
-            if system == "Windows":
-                import winsound
-                winsound.PlaySound(path, winsound.SND_FILENAME)
-            elif system == "Darwin":
-                subprocess.run(["afplay", path], check=False)
-            else:
-                subprocess.run(["aplay", path], check=False)
-        except Exception as e:
-            print(f"⚠️ 재생 실패: {e}")
-
-    def _play_filler(self, program_start: float) -> None:
-        if self._stop_event.is_set():
+    def _play_filler(
+        self,
+        first_chunk: str,
+        program_start: float,
+        stop_event: threading.Event,
+        generation: int,
+    ) -> None:
+        if stop_event.is_set():
             return
-        if not os.path.exists(self.filler_wav):
+        if not len(self.fillers.bank):
             print("⚠️ filler 음성 파일이 없습니다.")
             return
 
+        choice = self.fillers.plan(first_chunk, self.sink.buffered_sec)
+        predicted = self.fillers.predict_ttfa(first_chunk)
+        if choice is None:
+            print(f"🎧 filler 생략 (예상 첫 소리까지 {predicted:.2f}초)")
+            return
+
+        name, wav = choice
         latency = time.time() - program_start
-        print("🎧 filler 재생 시작: 음...")
+        print(
+            f"🎧 filler 재생 시작: {name} ({len(wav) / self.engine.sample_rate:.2f}초, "
+            f"예상 첫 소리까지 {predicted:.2f}초)"
+        )
         print(f"⏱️ filler 재생 시작까지: {latency:.3f}초")
-        self._play_wav(self.filler_wav)
-
-    def _producer(self, text: str, audio_q: queue.Queue) -> None:
+        self.sink.write(wav, generation=generation)
+
+    def _producer(
+        self,
+        chunks: list[str],
+        program_start: float,
+        stop_event: threading.Event,
+        generation: int,
+    ) -> None:
         print("\n=== TTS GENERATION START ===")
 
-        chunks = split_text(text, first_free=True, min_len=40)
-
         for i, chunk in enumerate(chunks, start=1):
-            if self._stop_event.is_set():
+            if stop_event.is_set():
                 break
 
             preview = chunk.replace("\n", " ")[:50]
             print(f"[GEN {i:02d}] {preview}")
-
-            wav_parts = []
             start = time.time()
-
-            for wav, _ in self.engine.synthesize_streaming(chunk):
-                if self._stop_event.is_set():
+            first_audio = i == 1
+
+            # 재생 대기 오디오 = sink buffer에 남은 길이 → adaptive tier 선택에 사용
+            # stop_event를 cancel로 넘겨 진행 중인 문장도 denoising step 사이에서 중단
+            for wav, _ in self.engine.synthesize_streaming(
+                chunk,
+                reply_start=(i == 1),
+                buffered_sec=lambda: self.sink.buffered_sec,
+                cancel=stop_event
+            ):
+                # stop() 뒤에 끝난 청크는 generation이 달라 sink가 버림 (확인과 write 사이 경합 없음)
+                if not self.sink.write(wav, generation=generation):
                     break
-                wav_parts.append(wav)
-
-            if not wav_parts:
-                continue
+                if first_audio:
+                    # 실제 첫 소리 지연 → 다음 filler 결정의 예측 보정
+                    self.fillers.observe(chunk, time.time() - program_start)
+                    first_audio = False
 
+            if stop_event.is_set():
+                break
             elapsed = time.time() - start
 
             # 🔥 각 GEN마다 한 번씩만 출력
             print(f"   ✅ 완료 ({elapsed:.2f}초, {len(chunk)}자)")
 
-            merged = np.concatenate(wav_parts, axis=0)
-            temp_file = os.path.join(self.temp_dir, f"chunk_{i}.wav")
-            wavfile.write(temp_file, self.engine.sample_rate, merged)
-            audio_q.put((i, temp_file))
-
-        audio_q.put(None)
         print("=== GENERATION END ===\n")
 
-    def _consumer(self, audio_q: queue.Queue) -> None:
-        print("=== PLAYBACK START ===")
-
-        while True:
-            item = audio_q.get()
-            if item is None:
-                print("=== PLAYBACK END ===")
-                break
-
-            if self._stop_event.is_set():
-                idx, audio_file = item
-                if os.path.exists(audio_file):
-                    try:
-                        os.remove(audio_file)
-                    except:
-                        pass
-
-                # 큐 비우기
-                while True:
-                    rest = audio_q.get()
-                    if rest is None:
-                        break
-                    _, f = rest
-                    if os.path.exists(f):
-                        try:
-                            os.remove(f)
-                        except:
-                            pass
-                break  # ← 이 break는 try 블록 바깥
-
-            idx, audio_file = item
-            print(f"[PLAY {idx:02d}]")
-            self._play_wav(audio_file)
-
-            if os.path.exists(audio_file):
-                try:
-                    os.remove(audio_file)
-                except:
-                    pass
-
-    def _run_pipeline(self, text: str) -> None:
+    def _run_pipeline(self, text: str, stop_event: threading.Event) -> None:
         program_start = time.time()
         print(f"📝 텍스트 로드 완료 ({len(text)}자)")
         print("=" * 60)
 
-        audio_q: queue.Queue = queue.Queue(maxsize=3)
+        chunks = split_text(text, first_free=True, min_len=40)
 
-        # filler는 즉시 재생(별도 스레드)
-        threading.Thread(
-            target=self._play_filler,
-            args=(program_start,),
-            daemon=True
-        ).start()
+        # stop()은 stop_event.set() 후 sink.clear()이므로 generation을 먼저 읽은 뒤 stop_event를 확인
+        # → 그 사이 stop()이 있었으면 아래에서 stop_event로 멈추고, 이후의 stop()은 write를 버림
+        generation = self.sink.generation
 
-        # producer / consumer
-        producer_t = threading.Thread(
-            target=self._producer,
-            args=(text, audio_q),
-            daemon=True
-        )
-        consumer_t = threading.Thread(
-            target=self._consumer,
-            args=(audio_q,),
-            daemon=True
-        )
+        # filler를 먼저 buffer에 넣고, 합성된 첫 청크는 같은 stream에서 그 뒤에 바로 이어서 재생
+        self._play_filler(chunks[0] if chunks else text, program_start, stop_event, generation)
+        self._producer(chunks, program_start, stop_event, generation)
+        if stop_event.is_set():
+            self._abort_latency.append(time.perf_counter() - self._stop_at)
 
-        producer_t.start()
-        consumer_t.start()
-
-        producer_t.join()
-        consumer_t.join()
+        # 남은 오디오 재생이 끝날 때까지 대기 (중단됐으면 sink는 이미 다음 작업 몫)
+        if not stop_event.is_set():
+            self.sink.end_of_stream()
+        while not stop_event.is_set() and not self.sink.drain(timeout=0.1):
+            pass
 
+        stats = self.sink.stats()
         print("=" * 60)
-        if self._stop_event.is_set():
-            print("🛑 중단 요청으로 종료")
+        print(
+            f"🔈 underrun {stats['underruns']}회 ({stats['underrun_sec'] * 1000:.0f} ms), "
+            f"장치 latency {stats['device_latency_sec'] * 1000:.0f} ms"
+        )
+        if stop_event.is_set():
+            print(f"🛑 중단 요청으로 종료 (무음까지 {stats['stop_to_silence_last_ms'] or 0:.0f} ms)")
         else:
             print("🎉 프로그램 종료")
@@ -1,14 +1,30 @@
 # tts_engine.py
 import os
+import queue
+import threading
+import time
 import uuid
+from typing import Callable, Optional
 import numpy as np
 from scipy.io import wavfile
 import re
+from collections import deque
 
 from helper import (
+    SessionConfig,
+    SilenceTrimmer,
+    StageProfiler,
+    SynthesisCancelled,
+    chunk_text,
     load_text_to_speech,
+    VoiceStyleRegistry,
     load_voice_style,
 )
+from tts_batcher import TTSBatchScheduler
+from tts_cache import WaveformCache
+from tts_output import encode_audio
+from tts_pipeline import StagePipeline
+from tts_policy import StepPolicy
 
 # --------------------------------------------------
 # 텍스트 정제 유틸
@@ -26,42 +42,305 @@ def sanitize_text(text: str) -> str:
     return text
 
 
+class _AnyEvent:
+    """여러 Event 중 하나라도 set이면 set인 cancel (합성 경로는 cancel.is_set()만 사용)"""
+
+    def __init__(self, *events: Optional[threading.Event]):
+        self._events = [e for e in events if e is not None]
+
+    def is_set(self) -> bool:
+        return any(e.is_set() for e in self._events)
+
+
+def _prefetch(items, lookahead: int):
+    """
+    items(generator)를 백그라운드 스레드에서 최대 lookahead개 앞서 생성, 순서대로 yield
+    - 소비자가 닫으면 생산 스레드는 더 만들지 않고 종료
+      (진행 중인 합성까지 멈추려면 items에 넘긴 cancel을 함께 set)
+    """
+    results: queue.Queue = queue.Queue(maxsize=lookahead)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except Exception as e:
+            put((done, e))
+        finally:
+            items.close()
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item, error = results.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+
+
 class TTSEngine:
     def __init__(
         self,
         onnx_dir: str,
         voice_style_path: str,
-        lang: str = "ko"
+        lang: str = "ko",
+        micro_batch: bool = False,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        session_config: Optional[SessionConfig] = None,
+        warmup: bool = True,
+        cache_bytes: int = 64 << 20,
+        cache_dir: Optional[str] = None,
+        cache_disk_bytes: int = 512 << 20,
+        step_policy: Optional[StepPolicy] = None,
+        pipeline: bool = False,
+        profiler: Optional[StageProfiler] = None,
+        trim_silence: bool = True
     ):
         self.lang = lang
-        self.tts = load_text_to_speech(onnx_dir, use_gpu=True)
-        self.voice_style = load_voice_style([voice_style_path])
+        self._ready = threading.Event()
+        self.startup_stats = {}
+
+        start = time.perf_counter()
+        # session_config: ORT 최적화 레벨/스레드 수, 최적화된 모델 캐시(<onnx_dir>/ort_cache)
+        self.tts = load_text_to_speech(
+            onnx_dir, use_gpu=True, session_config=session_config
+        )
+        # voice_styles 폴더의 모든 voice를 packed/mmap 레지스트리로 상주
+        # (voice_style_path의 voice가 기본 voice)
+        self.styles = VoiceStyleRegistry(os.path.dirname(os.path.abspath(voice_style_path)))
+        self.default_voice = os.path.splitext(os.path.basename(voice_style_path))[0]
+        if self.default_voice in self.styles:
+            self.voice_style = self.styles.get(self.default_voice)
+        else:
+            self.voice_style = load_voice_style([voice_style_path])
         self.sample_rate = self.tts.sample_rate
+        self.startup_stats["load_sec"] = time.perf_counter() - start
+
+        # warmup: 더미 입력으로 전체 경로를 미리 실행 → 첫 발화 지연(TTFA) 안정화
+        if warmup:
+            self.warmup()
+
+        # 자주 반복되는 문장("박수를 칩니다!" 등)은 waveform 캐시에서 바로 반환
+        # cache_bytes=0이면 비활성, cache_dir을 주면 디스크 캐시도 사용
+        self.cache = None
+        self._model_fingerprint = None
+        if cache_bytes > 0:
+            self.cache = WaveformCache(
+                max_bytes=cache_bytes,
+                disk_dir=cache_dir,
+                disk_max_bytes=cache_disk_bytes
+            )
+            # 캐시 키에 넣을 모델 구성 (모델 파일/variant/fused가 바뀌면 디스크 캐시도 새로)
+            self._model_fingerprint = self.tts.fingerprint()
+
+        # 품질 tier(total_step) 선택 정책: 첫 문장은 빠르게, 재생이 밀리면 step 수를 낮춤
+        self.step_policy = step_policy or StepPolicy()
+
+        # pipeline: 청크/문장 N+1의 encode와 N의 denoise, N-1의 vocoding을 겹쳐 실행
+        # (stage별 스레드 수는 session_config=StagePipeline.session_config(...)로 지정)
+        self.pipeline = None
+        if pipeline and not micro_batch:
+            self.pipeline = StagePipeline(self.tts)
+            self.tts.pipeline = self.pipeline
+
+        # profiler: 단계별 시간 기록 (warmup 이후에 연결하므로 warmup은 기록되지 않음)
+        self.tts.profiler = profiler
+
+        # trim_silence: 청크 앞뒤 dead air 제거 → 첫 소리까지의 지연과 전송 bytes 감소
+        self.tts.trimmer = SilenceTrimmer(self.sample_rate) if trim_silence else None
+
+        # micro_batch: 동시 요청들의 청크를 모아서 batch 추론 (서버용)
+        self.scheduler = None
+        self._synth = self.tts
+        if micro_batch:
+            self.scheduler = TTSBatchScheduler(
+                self.tts,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms
+            )
+            self._synth = self.scheduler
 
     # --------------------------------------------------
-    # 일반 단일 합성
+    # warmup / readiness
     # --------------------------------------------------
-    def synthesize(
+    def warmup(self) -> None:
+        times = self.tts.warmup(self.voice_style, lang=self.lang)
+        self.startup_stats["warmup_cold_sec"] = times[0]
+        self.startup_stats["warmup_steady_sec"] = times[-1]
+        self._ready.set()
+
+    def get_style(self, voice: Optional[str] = None):
+        """voice 이름(F1–F5, M1–M5)으로 Style 선택, None이면 기본 voice"""
+        if voice is None or voice == self.default_voice:
+            return self.voice_style
+        return self.styles.get(voice)
+
+    def _cache_key(
         self,
         text: str,
-        output_path: str,
-        speed: float = 1.05,
-        total_step: int = 5
-    ):
-        text = sanitize_text(text)
+        voice: Optional[str],
+        speed: float,
+        total_step: int,
+        seed: Optional[int],
+    ) -> str:
+        """waveform 캐시 키 = 요청 + 모델 구성 + 무음 trim 설정 (trimmer는 pool이 교체할 수 있어 매번 읽음)"""
+        trimmer = self.tts.trimmer
+        model = dict(self._model_fingerprint, trim=trimmer.config() if trimmer else None)
+        return WaveformCache.make_key(
+            text, self.lang, voice or self.default_voice, speed, total_step, seed, model
+        )
+
+    def _synth_cached(
+        self,
+        text: str,
+        voice: Optional[str],
+        speed: float,
+        total_step: int,
+        seed: Optional[int] = None,
+        batch_size: int = 1,
+        tier: Optional[str] = None,
+        cancel: Optional[threading.Event] = None,
+        on_chunk: Optional[Callable[[], None]] = None
+    ) -> np.ndarray:
+        """
+        (정제된 텍스트, voice, speed, total_step, seed) 기준 캐시 → 없으면 합성
+        - tier가 주어지면 실제 합성 시간으로 해당 tier의 RTF를 기록
+        - cancel이 set되면 SynthesisCancelled (캐시/RTF 기록 없음)
+        - on_chunk: 청크 합성이 끝날 때마다 호출 (캐시 hit이면 호출 없음)
+        """
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(text, voice, speed, total_step, seed)
+            wav = self.cache.get(key)
+            if wav is not None:
+                return wav
 
-        wav, _ = self.tts(
+        start = time.perf_counter()
+        wav, _ = self._synth(
             text=text,
             lang=self.lang,
-            style=self.voice_style,
+            style=self.get_style(voice),
             total_step=total_step,
-            speed=speed
+            speed=speed,
+            batch_size=batch_size,
+            seed=seed,
+            cancel=cancel,
+            on_chunk=on_chunk
         )
+        wav = wav.squeeze()
+        if tier is not None:
+            self.step_policy.record(
+                tier, len(text), time.perf_counter() - start, len(wav) / self.sample_rate
+            )
+
+        if key is not None:
+            self.cache.put(key, wav)
+        return wav
+
+    def resolve_steps(
+        self, total_step: Optional[int] = None, tier: Optional[str] = None
+    ) -> tuple[int, Optional[str]]:
+        """명시한 total_step > tier > 정책의 기본 tier 순으로 (total_step, tier) 결정"""
+        if total_step is not None:
+            return total_step, None
+        tier = tier or self.step_policy.default_tier
+        return StepPolicy.total_step(tier), tier
+
+    def estimate_samples(self, text: str) -> int:
+        """측정된 글자당 오디오 길이로 예상한 샘플 수 (조립 버퍼 크기용, 모르면 0)"""
+        sec = self.step_policy.predict_audio_sec(len(text))
+        return int(sec * self.sample_rate * 1.1) if sec else 0
+
+    def tier_stats(self) -> dict:
+        """tier별 total_step / 측정된 RTF / 샘플 수"""
+        return self.step_policy.stats()
 
-        final_wav = wav.squeeze()
+    def trim_stats(self) -> dict:
+        """잘라낸 앞/뒤 무음 길이 합계 (trim_silence=False면 빈 dict)"""
+        trimmer = self.tts.trimmer
+        return trimmer.stats() if trimmer is not None else {}
+
+    def cache_stats(self) -> dict:
+        """waveform 캐시 + dp/text encoder 중간 결과 캐시 통계"""
+        encoder_cache = self.tts.encoder_cache
+        return {
+            "waveform": self.cache.stats() if self.cache is not None else {},
+            "encoder": encoder_cache.stats() if encoder_cache is not None else {},
+        }
+
+    def is_ready(self) -> bool:
+        """warmup이 끝나 첫 발화 지연이 안정된 상태인지"""
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    # --------------------------------------------------
+    # 일반 단일 합성
+    # --------------------------------------------------
+    def synthesize(
+        self,
+        text: str,
+        output_path: str,
+        speed: float = 1.05,
+        total_step: Optional[int] = None,
+        batch_size: int = 1,
+        voice: Optional[str] = None,
+        seed: Optional[int] = None,
+        tier: Optional[str] = None
+    ):
+        final_wav = self.synthesize_audio(
+            text, "float32", None, speed, total_step, batch_size, voice, seed, tier
+        )
         wavfile.write(output_path, self.sample_rate, final_wav)
         return output_path
 
+    def synthesize_audio(
+        self,
+        text: str,
+        format: str = "float32",
+        target_rate: Optional[int] = None,
+        speed: float = 1.05,
+        total_step: Optional[int] = None,
+        batch_size: int = 1,
+        voice: Optional[str] = None,
+        seed: Optional[int] = None,
+        tier: Optional[str] = None,
+        on_chunk: Optional[Callable[[], None]] = None
+    ):
+        """
+        디스크를 거치지 않고 메모리로 반환
+        - format: "float32" (ndarray) | "int16" (ndarray, 크기 절반) | "wav" (int16 WAV bytes)
+        - target_rate: 장치 샘플레이트(16000, 48000 등)로 resampling
+        - on_chunk: 청크 합성이 끝날 때마다 호출 (worker farm의 heartbeat)
+        """
+        text = sanitize_text(text)
+        total_step, tier = self.resolve_steps(total_step, tier)
+
+        # batch_size > 1: 긴 텍스트의 청크들을 padded batch로 묶어 추론
+        wav = self._synth_cached(
+            text, voice, speed, total_step, seed, batch_size, tier, on_chunk=on_chunk
+        )
+        return encode_audio(wav, self.sample_rate, format, target_rate)
+
     # --------------------------------------------------
     # 스트리밍 합성
     # --------------------------------------------------
@@ -69,43 +348,234 @@ class TTSEngine:
         self,
         text: str,
         speed: float = 1.2,
-        total_step: int = 5,
-        min_chunk_length: int = 50
+        total_step: Optional[int] = None,
+        min_chunk_length: int = 50,
+        voice: Optional[str] = None,
+        seed: Optional[int] = None,
+        block_frames: Optional[int] = None,
+        tier: Optional[str] = None,
+        reply_start: bool = True,
+        buffered_sec: Optional[Callable[[], float]] = None,
+        lookahead: int = 1,
+        cancel: Optional[threading.Event] = None
     ):
+        """
+        문장 단위로 (wav, idx)를 yield
+        - block_frames 지정 시 한 문장을 vocoder window 단위 PCM block으로 나눠 yield
+          (같은 idx로 여러 번 yield, 문장 전체 vocoding을 기다리지 않음)
+        - total_step/tier를 주지 않으면 step_policy가 문장마다 tier를 선택
+          · reply_start=True면 첫 문장은 first_tier (답변 중간 청크면 False)
+          · buffered_sec(): 아직 재생되지 않은 오디오 길이(초)
+            주지 않으면 첫 yield부터 실시간 재생된다고 가정하고 추정
+        - lookahead: 소비자가 청크 k를 재생/전송하는 동안 미리 합성해 둘 청크 수 (0이면 요청 시 합성)
+          · 순서는 항상 유지, 문장이 1개면 미리 합성할 것이 없으므로 스레드 없이 바로 합성
+          · generator를 닫으면(소비자의 break 등) 미리 합성 중인 청크도 다음 denoising step 전에 중단
+        - cancel(threading.Event): set되면 진행 중인 합성도 다음 denoising step(또는 vocoder
+          window) 전에 멈추고 generator가 조용히 끝남 (barge-in)
+        """
         sentences = self._split_sentences_only(text)
         if not sentences:
             return
 
-        # 1️⃣ 첫 문장 즉시 생성
-        first_sentence = sanitize_text(sentences[0])
-        if first_sentence:
-            wav, _ = self.tts(
-                text=first_sentence,
-                lang=self.lang,
-                style=self.voice_style,
-                total_step=total_step,
-                speed=speed
-            )
-            yield wav.squeeze(), 1
+        adaptive = total_step is None and tier is None
+        produced_sec = 0.0
+        play_start = None
 
-        # 2️⃣ 나머지 병합
+        def pick(sentence: str, is_first: bool) -> tuple[int, Optional[str]]:
+            if not adaptive:
+                return self.resolve_steps(total_step, tier)
+            is_first = is_first and reply_start
+            if buffered_sec is not None:
+                buffered = buffered_sec()
+            elif play_start is not None:
+                buffered = produced_sec - (time.perf_counter() - play_start)
+            else:
+                buffered = None
+            chosen = self.step_policy.choose(len(sentence), is_first, buffered)
+            return StepPolicy.total_step(chosen), chosen
+
+        # 1️⃣ 첫 문장은 단독으로 (즉시 생성), 2️⃣ 나머지는 병합
+        units = [(1, sanitize_text(sentences[0]))]
         merged_sentences = self._merge_sentences(
             sentences[1:], min_chunk_length
         )
+        units += [
+            (i, sanitize_text(sentence))
+            for i, sentence in enumerate(merged_sentences, start=2)
+        ]
+        units = [(i, sentence) for i, sentence in units if sentence]
 
-        for i, sentence in enumerate(merged_sentences, start=2):
-            sentence = sanitize_text(sentence)
-            if not sentence:
-                continue
+        # generator가 닫히면 set → 미리 합성 중인 문장도 호출자의 cancel과 같이 멈춤
+        closed = threading.Event()
+        synth_cancel = _AnyEvent(cancel, closed)
+        if self.pipeline is not None and block_frames is None:
+            # 문장 N을 내보내기 전에 문장 N+1..N+lookahead를 stage 파이프라인에 미리 투입
+            items = self._pipelined_units(
+                units, pick, voice, speed, seed, lookahead, synth_cancel
+            )
+        else:
+            items = self._sequential_units(
+                units, pick, voice, speed, seed, block_frames, synth_cancel
+            )
+            if lookahead > 0 and len(units) > 1:
+                items = _prefetch(items, lookahead)
 
-            wav, _ = self.tts(
-                text=sentence,
-                lang=self.lang,
-                style=self.voice_style,
-                total_step=total_step,
-                speed=speed
+        try:
+            for wav, i in items:
+                if cancel is not None and cancel.is_set():
+                    return
+                if play_start is None:
+                    play_start = time.perf_counter()
+                produced_sec += len(wav) / self.sample_rate
+                yield wav, i
+        except SynthesisCancelled:
+            return
+        finally:
+            closed.set()
+            items.close()
+
+    def _sequential_units(self, units, pick, voice, speed, seed, block_frames, cancel=None):
+        is_first = True
+        for i, sentence in units:
+            steps, chosen = pick(sentence, is_first)
+            is_first = False
+            for wav in self._sentence_blocks(
+                sentence, voice, speed, steps, seed, block_frames, chosen, cancel
+            ):
+                yield wav, i
+
+    def _pipelined_units(self, units, pick, voice, speed, seed, lookahead: int, cancel=None):
+        pending = deque()
+        try:
+            is_first = True
+            for i, sentence in units:
+                steps, chosen = pick(sentence, is_first)
+                is_first = False
+                pending.append(
+                    (i, self._submit_sentence(
+                        sentence, voice, speed, steps, seed, chosen, cancel
+                    ))
+                )
+                if len(pending) > lookahead:
+                    i, job = pending.popleft()
+                    yield self._collect_sentence(*job), i
+            while pending:
+                i, job = pending.popleft()
+                yield self._collect_sentence(*job), i
+        finally:
+            # 소비자가 중간에 닫으면 파이프라인에 남은 청크 취소 (시작 전인 청크는 건너뜀)
+            for _, job in pending:
+                for fut in job[4] or ():
+                    fut.cancel()
+
+    def _submit_sentence(
+        self,
+        text: str,
+        voice: Optional[str],
+        speed: float,
+        total_step: int,
+        seed: Optional[int],
+        tier: Optional[str],
+        cancel: Optional[threading.Event] = None
+    ) -> tuple:
+        """캐시에 없으면 문장의 청크들을 파이프라인에 투입 → _collect_sentence로 결과 수집"""
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(text, voice, speed, total_step, seed)
+            wav = self.cache.get(key)
+            if wav is not None:
+                return text, key, tier, wav, None
+
+        max_len = 120 if self.lang == "ko" else 300
+        futures = self.pipeline.submit(
+            chunk_text(text, max_len=max_len),
+            self.lang,
+            self.get_style(voice),
+            total_step,
+            speed,
+            np.random.default_rng(seed) if seed is not None else None,
+            cancel
+        )
+        return text, key, tier, None, futures
+
+    def _collect_sentence(
+        self,
+        text: str,
+        key: Optional[str],
+        tier: Optional[str],
+        wav: Optional[np.ndarray],
+        futures: Optional[list]
+    ) -> np.ndarray:
+        if wav is not None:
+            return wav
+
+        results = [fut.result() for fut in futures]
+        wav, _ = self.tts.join_chunks((w, d) for w, d, _ in results)
+        wav = wav.squeeze()
+
+        if tier is not None:
+            synth_sec = sum(busy for _, _, busy in results)
+            self.step_policy.record(tier, len(text), synth_sec, len(wav) / self.sample_rate)
+        if key is not None:
+            self.cache.put(key, wav)
+        return wav
+
+    def _sentence_blocks(
+        self,
+        text: str,
+        voice: Optional[str],
+        speed: float,
+        total_step: int,
+        seed: Optional[int],
+        block_frames: Optional[int],
+        tier: Optional[str] = None,
+        cancel: Optional[threading.Event] = None
+    ):
+        if block_frames is None:
+            yield self._synth_cached(
+                text, voice, speed, total_step, seed, tier=tier, cancel=cancel
             )
-            yield wav.squeeze(), i
+            return
+
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(text, voice, speed, total_step, seed)
+            wav = self.cache.get(key)
+            if wav is not None:
+                yield wav
+                return
+
+        blocks = []
+        stream = self.tts.stream(
+            text,
+            self.lang,
+            self.get_style(voice),
+            total_step,
+            speed,
+            window_frames=block_frames,
+            overlap_frames=max(1, block_frames // 4),
+            seed=seed,
+            cancel=cancel
+        )
+        # RTF는 소비자가 block을 처리하는 시간을 빼고 합성에 걸린 시간만 합산
+        synth_sec = 0.0
+        while True:
+            start = time.perf_counter()
+            block = next(stream, None)
+            synth_sec += time.perf_counter() - start
+            if block is None:
+                break
+            blocks.append(block)
+            yield block
+
+        # 끝까지 소비된 경우에만 RTF 기록 / 캐시에 저장
+        if not blocks:
+            return
+        wav = np.concatenate(blocks)
+        if tier is not None:
+            self.step_policy.record(tier, len(text), synth_sec, len(wav) / self.sample_rate)
+        if key is not None:
+            self.cache.put(key, wav)
 
     # --------------------------------------------------
     def _split_sentences_only(self, text: str):
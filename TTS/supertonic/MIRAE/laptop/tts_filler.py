@@ -0,0 +1,152 @@
+# tts_filler.py
+import glob
+import os
+import re
+import threading
+from typing import Optional
+
+import numpy as np
+
+from tts_output import read_wav
+from tts_policy import StepPolicy
+
+# assets/fillers/<이름>.wav로 만들 filler (make_sound_file.py), 길이가 서로 다르게
+DEFAULT_FILLER_TEXTS = {
+    "um": "음...",
+    "well": "음, 글쎄요.",
+    "moment": "잠시만요.",
+    "think": "음, 어디 한번 생각해 볼게요.",
+}
+
+def first_sentence(text: str) -> str:
+    """TTSEngine.synthesize_streaming이 단독으로 먼저 합성하는 첫 문장"""
+    m = re.match(r"\s*[^.!?]*[.!?]?", text)
+    return m.group().strip() if m else text.strip()
+
+
+class FillerBank:
+    """
+    filler 음성("음...", "잠시만요." 등)을 메모리에 올려 두고 길이로 고르는 bank
+    - 모두 출력 샘플레이트로 미리 resampling → 재생 시 디스크/변환 비용 없음
+    - pick(gap_sec): 예상 공백 안에 끝나는 가장 긴 filler (다 길면 가장 짧은 것)
+      → filler가 끝나자마자 첫 청크가 이어지도록
+    """
+
+    def __init__(self, fillers: dict[str, np.ndarray], sample_rate: int):
+        self.sample_rate = sample_rate
+        # 짧은 순
+        self._items = sorted(
+            ((name, wav, len(wav) / sample_rate) for name, wav in fillers.items() if len(wav)),
+            key=lambda item: item[2],
+        )
+
+    @classmethod
+    def from_dir(cls, filler_dir: str, sample_rate: int) -> "FillerBank":
+        fillers = {}
+        for path in sorted(glob.glob(os.path.join(filler_dir, "*.wav"))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            fillers[name], _ = read_wav(path, sample_rate)
+        return cls(fillers, sample_rate)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def durations(self) -> dict[str, float]:
+        return {name: sec for name, _, sec in self._items}
+
+    def pick(self, gap_sec: float) -> Optional[tuple[str, np.ndarray]]:
+        if not self._items:
+            return None
+        fitting = [item for item in self._items if item[2] <= gap_sec]
+        name, wav, _ = fitting[-1] if fitting else self._items[0]
+        return name, wav
+
+
+class FillerScheduler:
+    """
+    첫 소리까지의 예상 대기(TTFA)로 filler 재생 여부와 길이를 결정
+    - 예상 TTFA = 첫 문장 글자 수 × 글자당 오디오 길이 × first_tier RTF (StepPolicy 측정값)
+      + 합성 외 지연(전처리/스레드 전달 등, 실제 TTFA와의 차이를 EMA로 학습)
+    - 측정값이 없으면(첫 요청) 지금까지 관측한 TTFA, 그것도 없으면 default_ttfa_sec
+    - 예상 공백 = 예상 TTFA - 이미 재생 대기 중인 오디오, threshold_sec 미만이면 filler 없음
+    - 고른 filler는 출력 sink에 먼저 쓰고 첫 청크를 그 뒤에 이어 씀 (같은 stream에서 바로 이어짐)
+    """
+
+    def __init__(
+        self,
+        policy: StepPolicy,
+        bank: FillerBank,
+        threshold_sec: float = 0.35,
+        default_ttfa_sec: float = 0.8,
+        ema: float = 0.3,
+    ):
+        self.policy = policy
+        self.bank = bank
+        self.threshold_sec = threshold_sec
+        self.default_ttfa_sec = default_ttfa_sec
+        self.ema = ema
+
+        self._lock = threading.Lock()
+        self._overhead: Optional[float] = None
+        self._ttfa: Optional[float] = None
+        self._played: dict[str, int] = {}
+        self._skipped = 0
+        self._observed = 0
+        self._abs_error = 0.0
+        self._last: dict = {}
+
+    def predict_ttfa(self, text: str) -> float:
+        """text를 지금 합성하기 시작했을 때 첫 오디오가 나올 때까지의 예상 시간(초)"""
+        synth = self.policy.predict_synth_sec(self.policy.first_tier, len(first_sentence(text)))
+        with self._lock:
+            if synth is not None:
+                return synth + (self._overhead or 0.0)
+            return self._ttfa if self._ttfa is not None else self.default_ttfa_sec
+
+    def plan(self, text: str, buffered_sec: float = 0.0) -> Optional[tuple[str, np.ndarray]]:
+        """재생할 filler (이름, PCM), 필요 없으면 None"""
+        predicted = self.predict_ttfa(text)
+        gap = predicted - buffered_sec
+        choice = self.bank.pick(gap) if gap >= self.threshold_sec else None
+        with self._lock:
+            if choice is None:
+                self._skipped += 1
+            else:
+                self._played[choice[0]] = self._played.get(choice[0], 0) + 1
+            self._last = {
+                "predicted_ttfa_sec": predicted,
+                "gap_sec": gap,
+                "filler": choice[0] if choice else None,
+            }
+        return choice
+
+    def observe(self, text: str, ttfa_sec: float) -> None:
+        """실제 TTFA로 합성 외 지연과 예측 오차 갱신 (직전 plan과 같은 text)"""
+        synth = self.policy.predict_synth_sec(self.policy.first_tier, len(first_sentence(text)))
+        with self._lock:
+            predicted = self._last.get("predicted_ttfa_sec")
+            if predicted is None:
+                predicted = self.default_ttfa_sec
+            self._observed += 1
+            self._abs_error += abs(ttfa_sec - predicted)
+            self._ttfa = ttfa_sec if self._ttfa is None else (
+                (1 - self.ema) * self._ttfa + self.ema * ttfa_sec
+            )
+            if synth is not None:
+                overhead = max(0.0, ttfa_sec - synth)
+                self._overhead = overhead if self._overhead is None else (
+                    (1 - self.ema) * self._overhead + self.ema * overhead
+                )
+            self._last["actual_ttfa_sec"] = ttfa_sec
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "fillers": self.bank.durations(),
+                "threshold_sec": self.threshold_sec,
+                "played": dict(self._played),
+                "skipped": self._skipped,
+                "overhead_sec": self._overhead,
+                "mean_abs_error_sec": self._abs_error / self._observed if self._observed else None,
+                "last": dict(self._last),
+            }
@@ -0,0 +1,140 @@
+# tts_output.py
+import os
+import platform
+import struct
+import subprocess
+import tempfile
+from functools import lru_cache
+from math import gcd
+from typing import Optional, Union
+
+import numpy as np
+
+# float32: 모델 출력 그대로 / int16: PCM 16-bit (크기 절반) / wav: int16 PCM + WAV 헤더 bytes
+AUDIO_FORMATS = ("float32", "int16", "wav")
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_IEEE_FLOAT = 3
+
+
+def resample(wav: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """
+    polyphase resampling (scipy.signal.resample_poly, Kaiser window FIR)
+    - 44.1 kHz → 16 kHz / 48 kHz 등 장치 샘플레이트에 맞출 때 사용
+    """
+    if src_rate == dst_rate:
+        return wav
+    from scipy.signal import resample_poly
+
+    g = gcd(src_rate, dst_rate)
+    out = resample_poly(wav, dst_rate // g, src_rate // g, axis=-1, window=("kaiser", 8.0))
+    return out.astype(np.float32, copy=False)
+
+
+def to_int16(wav: np.ndarray) -> np.ndarray:
+    out = np.empty(wav.shape, dtype=np.int16)
+    np.multiply(np.clip(wav, -1.0, 1.0), 32767, out=out, casting="unsafe")
+    return out
+
+
+@lru_cache(maxsize=16)
+def _header_template(sample_rate: int, bits: int, channels: int) -> bytes:
+    """크기 필드(RIFF, data)만 0인 44바이트 WAV 헤더 (포맷별로 한 번만 생성)"""
+    fmt_tag = _WAVE_FORMAT_IEEE_FLOAT if bits == 32 else _WAVE_FORMAT_PCM
+    block_align = channels * bits // 8
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0, b"WAVE",
+        b"fmt ", 16, fmt_tag, channels, sample_rate, sample_rate * block_align, block_align, bits,
+        b"data", 0,
+    )
+
+
+def wav_header(sample_rate: int, num_samples: int, bits: int = 16, channels: int = 1) -> bytes:
+    data_size = num_samples * channels * bits // 8
+    header = bytearray(_header_template(sample_rate, bits, channels))
+    struct.pack_into("<I", header, 4, 36 + data_size)
+    struct.pack_into("<I", header, 40, data_size)
+    return bytes(header)
+
+
+def wav_bytes(wav: np.ndarray, sample_rate: int) -> bytes:
+    """float32 또는 int16 PCM → WAV 파일 bytes (디스크를 거치지 않음)"""
+    bits = 16 if wav.dtype == np.int16 else 32
+    pcm = np.ascontiguousarray(wav, dtype=np.int16 if bits == 16 else np.float32).reshape(-1)
+    return wav_header(sample_rate, len(pcm), bits) + pcm.tobytes()
+
+
+def encode_audio(
+    wav: np.ndarray,
+    sample_rate: int,
+    format: str = "float32",
+    target_rate: Optional[int] = None,
+) -> Union[np.ndarray, bytes]:
+    """
+    float32 waveform → 요청한 형식
+    - format: "float32" | "int16" | "wav" (wav는 int16 PCM)
+    - target_rate: 지정 시 해당 샘플레이트로 resampling 후 변환
+    """
+    if format not in AUDIO_FORMATS:
+        raise ValueError(f"Unknown audio format: {format} (available: {AUDIO_FORMATS})")
+
+    wav = np.asarray(wav, dtype=np.float32).reshape(-1)
+    if target_rate is not None and target_rate != sample_rate:
+        wav = resample(wav, sample_rate, target_rate)
+        sample_rate = target_rate
+
+    if format == "float32":
+        return wav
+    pcm = to_int16(wav)
+    if format == "int16":
+        return pcm
+    return wav_bytes(pcm, sample_rate)
+
+
+def read_wav(path: str, sample_rate: Optional[int] = None) -> tuple[np.ndarray, int]:
+    """
+    WAV 파일 → (float32 mono PCM, 샘플레이트)
+    - int16/int32/uint8 PCM은 [-1, 1]로 정규화, 다채널은 평균
+    - sample_rate: 지정 시 해당 샘플레이트로 resampling
+    """
+    from scipy.io import wavfile
+
+    sr, data = wavfile.read(path)
+    if data.dtype.kind in "iu":
+        info = np.iinfo(data.dtype)
+        data = (data.astype(np.float32) - (info.max + info.min + 1) / 2) / ((info.max - info.min + 1) / 2)
+    wav = np.asarray(data, dtype=np.float32)
+    if wav.ndim > 1:
+        wav = wav.mean(axis=1)
+    if sample_rate is not None and sample_rate != sr:
+        wav, sr = resample(wav, sr, sample_rate), sample_rate
+    return wav, sr
+
+
+def play_wav(src: Union[str, bytes]) -> None:
+    """
+    WAV 파일 경로 또는 WAV bytes를 재생 (끝날 때까지 블로킹)
+    - bytes: Windows는 winsound 메모리 재생, Linux는 aplay stdin → 디스크를 거치지 않음
+      (macOS afplay는 파일만 받으므로 bytes일 때만 임시 파일 사용)
+    """
+    system = platform.system()
+    if system == "Windows":
+        import winsound
+        flag = winsound.SND_MEMORY if isinstance(src, bytes) else winsound.SND_FILENAME
+        winsound.PlaySound(src, flag)
+    elif system == "Darwin":
+        if not isinstance(src, bytes):
+            subprocess.run(["afplay", src], check=False)
+            return
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(src)
+            subprocess.run(["afplay", path], check=False)
+        finally:
+            os.remove(path)
+    elif isinstance(src, bytes):
+        subprocess.run(["aplay", "-q", "-"], input=src, check=False)
+    else:
+        subprocess.run(["aplay", src], check=False)
@@ -0,0 +1,221 @@
+# tts_pipeline.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Iterator, Optional
+
+import numpy as np
+
+from helper import SessionConfig, Style, SynthesisCancelled, TextToSpeech
+
+PIPELINE_STAGES = ("encode", "denoise", "vocode")
+
+
+class _Job:
+    __slots__ = (
+        "text", "lang", "style", "total_step", "speed", "rng", "cancel", "future", "busy_sec"
+    )
+
+    def __init__(
+        self,
+        text: str,
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float,
+        rng: Optional[np.random.Generator],
+        cancel: Optional[threading.Event] = None,
+    ):
+        self.text = text
+        self.lang = lang
+        self.style = style
+        self.total_step = total_step
+        self.speed = speed
+        self.rng = rng
+        self.cancel = cancel
+        self.future: Future = Future()
+        self.busy_sec = 0.0
+
+
+class StagePipeline:
+    """
+    청크 단위 stage 파이프라인
+    - encode(dp + text encoder) → denoise(vector estimator loop) → vocode 를 stage별 스레드로 실행
+    - stage 사이는 bounded queue (queue_size) → 앞 stage가 너무 앞서가지 않도록 backpressure
+    - chunk N을 denoising하는 동안 chunk N+1의 encode, chunk N-1의 vocoding이 동시에 진행
+    - stage마다 스레드 1개 + FIFO이므로 출력 순서는 제출 순서와 같음
+      (같은 rng를 쓰는 청크들도 순차 실행과 동일한 noise를 받음)
+    - stage별 ORT 스레드 수는 session_config()로 만든 SessionConfig로 로딩할 때 지정
+    - cancel(threading.Event)이 set된 청크는 남은 stage를 건너뛰고, denoising 중이면
+      다음 step 전에 멈춤 → Future는 SynthesisCancelled
+    """
+
+    def __init__(self, tts: TextToSpeech, queue_size: int = 2):
+        self.tts = tts
+        self.sample_rate = tts.sample_rate
+
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in PIPELINE_STAGES]
+        self._stats_lock = threading.Lock()
+        self._busy = {stage: 0.0 for stage in PIPELINE_STAGES}
+        self._items = {stage: 0 for stage in PIPELINE_STAGES}
+        self._stats_start = time.perf_counter()
+
+        targets = (self._encode_worker, self._denoise_worker, self._vocode_worker)
+        self._workers = [threading.Thread(target=t, daemon=True) for t in targets]
+        for w in self._workers:
+            w.start()
+
+    @staticmethod
+    def session_config(
+        encode_threads: int = 1,
+        denoise_threads: int = 0,
+        vocode_threads: int = 1,
+        **kwargs,
+    ) -> SessionConfig:
+        """stage별 intra-op 스레드 예산 (0이면 ORT 기본값)"""
+        return SessionConfig(
+            stage_threads={
+                "duration_predictor": (encode_threads, 1),
+                "text_encoder": (encode_threads, 1),
+                "vector_estimator": (denoise_threads, 1),
+                "vocoder": (vocode_threads, 1),
+            },
+            **kwargs,
+        )
+
+    # -----------------------------
+    # Public
+    # -----------------------------
+    def submit(
+        self,
+        text_list: list[str],
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float = 1.0,
+        rng: Optional[np.random.Generator] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> list[Future]:
+        """
+        청크들을 순서대로 투입 → 청크별 Future[(wav (1, n), dur (1,), busy_sec)]
+        - busy_sec: 이 청크가 세 stage에서 실제로 계산에 쓴 시간 (RTF 측정용)
+        - 첫 stage queue가 가득 차면 자리가 날 때까지 대기
+        """
+        futures = []
+        for text in text_list:
+            job = _Job(text, lang, style, total_step, speed, rng, cancel)
+            self._queues[0].put(job)
+            futures.append(job.future)
+        return futures
+
+    def map(
+        self,
+        text_list: list[str],
+        lang: str,
+        style: Style,
+        total_step: int,
+        speed: float = 1.0,
+        rng: Optional[np.random.Generator] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """_infer([text], ...)를 청크마다 호출한 것과 같은 결과를 순서대로 yield"""
+        for fut in self.submit(text_list, lang, style, total_step, speed, rng, cancel):
+            wav, dur_onnx, _ = fut.result()
+            yield wav, dur_onnx
+
+    def stats(self) -> dict:
+        """stage별 처리 수 / 계산 시간 / utilization (reset_stats() 이후 경과 시간 대비)"""
+        with self._stats_lock:
+            elapsed = time.perf_counter() - self._stats_start
+            return {
+                stage: {
+                    "items": self._items[stage],
+                    "busy_sec": self._busy[stage],
+                    "utilization": self._busy[stage] / elapsed if elapsed > 0 else 0.0,
+                    "queue_depth": self._queues[i].qsize(),
+                }
+                for i, stage in enumerate(PIPELINE_STAGES)
+            }
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._busy = {stage: 0.0 for stage in PIPELINE_STAGES}
+            self._items = {stage: 0 for stage in PIPELINE_STAGES}
+            self._stats_start = time.perf_counter()
+
+    def close(self) -> None:
+        self._queues[0].put(None)
+        for w in self._workers:
+            w.join()
+
+    # -----------------------------
+    # Internal
+    # -----------------------------
+    def _record(self, stage: str, job: _Job, start: float) -> None:
+        sec = time.perf_counter() - start
+        job.busy_sec += sec
+        with self._stats_lock:
+            self._busy[stage] += sec
+            self._items[stage] += 1
+
+    def _stage_loop(self, index: int, fn) -> None:
+        """queue[index]에서 (job, payload)를 꺼내 fn 실행 → 다음 queue로 전달"""
+        stage = PIPELINE_STAGES[index]
+        in_q = self._queues[index]
+        out_q = self._queues[index + 1] if index + 1 < len(self._queues) else None
+
+        while True:
+            item = in_q.get()
+            if item is None:
+                if out_q is not None:
+                    out_q.put(None)
+                break
+
+            job, payload = item if index > 0 else (item, None)
+            if index == 0:
+                # 첫 stage에서 running으로 표시 → 이후 Future.cancel()은 시작 전 청크에만 적용
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+            elif job.future.done():
+                continue
+            if job.cancel is not None and job.cancel.is_set():
+                job.future.set_exception(SynthesisCancelled())
+                continue
+
+            start = time.perf_counter()
+            try:
+                result = fn(job, payload)
+            except Exception as e:
+                job.future.set_exception(e)
+                continue
+            self._record(stage, job, start)
+
+            if out_q is not None:
+                out_q.put((job, result))
+            else:
+                wav, dur_onnx = result
+                job.future.set_result((wav, dur_onnx, job.busy_sec))
+
+    def _encode_worker(self) -> None:
+        def encode(job: _Job, _):
+            return self.tts._encode_stage([job.text], [job.lang], job.style, job.speed)
+
+        self._stage_loop(0, encode)
+
+    def _denoise_worker(self) -> None:
+        def denoise(job: _Job, encoded):
+            text_emb, text_mask, dur_onnx = encoded
+            xt = self.tts._denoise_stage(
+                text_emb, text_mask, job.style, dur_onnx, job.total_step, job.rng, job.cancel
+            )
+            return xt, dur_onnx
+
+        self._stage_loop(1, denoise)
+
+    def _vocode_worker(self) -> None:
+        def vocode(job: _Job, denoised):
+            xt, dur_onnx = denoised
+            return self.tts._vocode_stage(xt), dur_onnx
+
+        self._stage_loop(2, vocode)
@@ -0,0 +1,99 @@
+# tts_policy.py
+import threading
+from typing import Optional
+
+# 품질 tier → denoising step 수 (비용 높은 순)
+QUALITY_TIERS = {
+    "quality": 5,
+    "balanced": 3,
+    "fast": 2,
+}
+TIER_ORDER = list(QUALITY_TIERS)
+
+
+class StepPolicy:
+    """
+    문장마다 total_step(tier)을 고르는 adaptive 정책
+    - 답변의 첫 문장: first_tier (TTFA 단축)
+    - 이후 문장: default_tier
+    - 재생 대기 중인 오디오(buffered_sec)가 다음 문장 예상 합성 시간보다 적으면
+      (= producer가 실시간보다 뒤처지면) 측정된 RTF로 충분히 빠른 tier까지 단계적으로 낮춤
+    - tier별 RTF(합성 시간 / 오디오 길이)와 글자당 오디오 길이는 EMA로 계속 갱신
+    """
+
+    def __init__(
+        self,
+        first_tier: str = "fast",
+        default_tier: str = "quality",
+        safety: float = 1.2,
+        ema: float = 0.3,
+    ):
+        self.first_tier = first_tier
+        self.default_tier = default_tier
+        self.safety = safety
+        self.ema = ema
+
+        self._rtf: dict[str, float] = {}
+        self._samples: dict[str, int] = {}
+        self._sec_per_char: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def total_step(tier: str) -> int:
+        if tier not in QUALITY_TIERS:
+            raise ValueError(f"Unknown quality tier: {tier} (available: {TIER_ORDER})")
+        return QUALITY_TIERS[tier]
+
+    def record(self, tier: str, text_len: int, synth_sec: float, audio_sec: float) -> None:
+        if audio_sec <= 0:
+            return
+        rtf = synth_sec / audio_sec
+        with self._lock:
+            prev = self._rtf.get(tier)
+            self._rtf[tier] = rtf if prev is None else (1 - self.ema) * prev + self.ema * rtf
+            self._samples[tier] = self._samples.get(tier, 0) + 1
+            if text_len > 0:
+                spc = audio_sec / text_len
+                prev = self._sec_per_char
+                self._sec_per_char = spc if prev is None else (1 - self.ema) * prev + self.ema * spc
+
+    def predict_audio_sec(self, text_len: int) -> Optional[float]:
+        """글자 수로 예상한 오디오 길이(초), 측정값이 없으면 None"""
+        with self._lock:
+            spc = self._sec_per_char
+        return None if spc is None else spc * text_len
+
+    def predict_synth_sec(self, tier: str, text_len: int) -> Optional[float]:
+        """측정값이 없으면 None"""
+        with self._lock:
+            rtf = self._rtf.get(tier)
+            spc = self._sec_per_char
+        if rtf is None or spc is None:
+            return None
+        return rtf * spc * text_len
+
+    def choose(
+        self, text_len: int, is_first: bool, buffered_sec: Optional[float] = None
+    ) -> str:
+        if is_first:
+            return self.first_tier
+        if buffered_sec is None:
+            return self.default_tier
+
+        candidates = TIER_ORDER[TIER_ORDER.index(self.default_tier):]
+        for tier in candidates:
+            predicted = self.predict_synth_sec(tier, text_len)
+            if predicted is None or predicted * self.safety <= buffered_sec:
+                return tier
+        return candidates[-1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                tier: {
+                    "total_step": steps,
+                    "rtf": self._rtf.get(tier),
+                    "samples": self._samples.get(tier, 0),
+                }
+                for tier, steps in QUALITY_TIERS.items()
+            }
@@ -0,0 +1,172 @@
+# tts_pool.py
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from helper import SessionConfig
+from tts_engine import TTSEngine
+from tts_policy import StepPolicy
+
+
+def default_pool_size(threads_per_engine: int = 2) -> int:
+    """코어 수 기준 replica 수 (replica마다 threads_per_engine개의 intra-op 스레드)"""
+    return max(1, (os.cpu_count() or 1) // threads_per_engine)
+
+
+class TTSEnginePool:
+    """
+    TTSEngine(세션 4개 묶음) replica N개를 두고 요청마다 하나를 빌려 쓰는 pool
+    - 하나의 엔진을 여러 스레드가 공유하면 같은 세션과 ORT 스레드 풀에서 서로 경쟁
+      → replica마다 코어를 나눠(intra_op_threads) 동시 요청을 독립적으로 처리
+    - checkout(timeout): 빈 replica가 없으면 timeout까지 대기, 넘으면 TimeoutError
+    - waveform 캐시, tier 정책(StepPolicy), 무음 trim 통계는 모든 replica가 공유
+    - replica마다 모델 세션이 따로 올라가므로 메모리는 size배
+    - micro_batch=True: replica마다 TTSBatchScheduler를 두고 replica 하나를
+      requests_per_engine개(기본 max_batch_size) 요청이 함께 빌려 씀
+      → 같은 replica에 동시에 들어온 요청의 청크가 한 batch로 묶임
+    """
+
+    def __init__(
+        self,
+        onnx_dir: str,
+        voice_style_path: str,
+        size: Optional[int] = None,
+        threads_per_engine: Optional[int] = None,
+        checkout_timeout: Optional[float] = 30.0,
+        requests_per_engine: Optional[int] = None,
+        **engine_kwargs
+    ):
+        cores = os.cpu_count() or 1
+        if size is None:
+            size = default_pool_size(threads_per_engine or 2)
+        if threads_per_engine is None:
+            threads_per_engine = max(1, cores // size)
+        if requests_per_engine is None:
+            requests_per_engine = (
+                engine_kwargs.get("max_batch_size", 8) if engine_kwargs.get("micro_batch") else 1
+            )
+
+        self.size = size
+        self.threads_per_engine = threads_per_engine
+        self.requests_per_engine = requests_per_engine
+        self.checkout_timeout = checkout_timeout
+
+        engine_kwargs.setdefault("step_policy", StepPolicy())
+        # 호출자가 준 session_config는 그대로 쓰고 스레드 수만 replica 몫으로 바꿈
+        base_config = engine_kwargs.pop("session_config", None) or SessionConfig()
+        self.engines: list[TTSEngine] = []
+        for _ in range(size):
+            config = base_config.replace(intra_op_threads=threads_per_engine, inter_op_threads=1)
+            engine = TTSEngine(
+                onnx_dir, voice_style_path, session_config=config, **engine_kwargs
+            )
+            if self.engines:
+                engine.cache = self.engines[0].cache
+                engine.tts.trimmer = self.engines[0].tts.trimmer
+            self.engines.append(engine)
+
+        first = self.engines[0]
+        self.sample_rate = first.sample_rate
+        self.default_voice = first.default_voice
+        self.styles = first.styles
+        self.startup_stats = first.startup_stats
+
+        # replica마다 requests_per_engine개의 자리 (replica를 번갈아 넣어 고르게 분산)
+        self._slots = size * requests_per_engine
+        self._idle: "queue.Queue[TTSEngine]" = queue.Queue()
+        for _ in range(requests_per_engine):
+            for engine in self.engines:
+                self._idle.put(engine)
+
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_sec = 0.0
+        self._max_wait_sec = 0.0
+
+    # --------------------------------------------------
+    # checkout / checkin
+    # --------------------------------------------------
+    def acquire(self, timeout: Optional[float] = None) -> TTSEngine:
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        try:
+            engine = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise TimeoutError(
+                f"No idle TTS engine within {timeout}s "
+                f"(pool size {self.size} x {self.requests_per_engine} requests)"
+            ) from None
+
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self._checkouts += 1
+            self._wait_sec += waited
+            self._max_wait_sec = max(self._max_wait_sec, waited)
+        return engine
+
+    def release(self, engine: TTSEngine) -> None:
+        self._idle.put(engine)
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[TTSEngine]:
+        engine = self.acquire(timeout)
+        try:
+            yield engine
+        finally:
+            self.release(engine)
+
+    # --------------------------------------------------
+    # TTSEngine과 같은 인터페이스
+    # --------------------------------------------------
+    def synthesize(self, text: str, output_path: str, **kwargs):
+        with self.checkout() as engine:
+            return engine.synthesize(text, output_path, **kwargs)
+
+    def synthesize_audio(self, text: str, **kwargs):
+        with self.checkout() as engine:
+            return engine.synthesize_audio(text, **kwargs)
+
+    def synthesize_streaming(self, text: str, **kwargs):
+        """generator가 끝나거나 close될 때까지 replica 하나를 점유"""
+        with self.checkout() as engine:
+            yield from engine.synthesize_streaming(text, **kwargs)
+
+    def is_ready(self) -> bool:
+        return all(engine.is_ready() for engine in self.engines)
+
+    def cache_stats(self) -> dict:
+        return self.engines[0].cache_stats()
+
+    def tier_stats(self) -> dict:
+        return self.engines[0].tier_stats()
+
+    def trim_stats(self) -> dict:
+        return self.engines[0].trim_stats()
+
+    def scheduler_stats(self) -> Optional[list[dict]]:
+        """replica별 micro-batching 스케줄러 상태 (micro_batch가 아니면 None)"""
+        if self.engines[0].scheduler is None:
+            return None
+        return [engine.scheduler.stats() for engine in self.engines]
+
+    def stats(self) -> dict:
+        """pool 크기 / 사용 중인 자리 수 / checkout 대기 시간 / timeout 횟수"""
+        idle = self._idle.qsize()
+        with self._stats_lock:
+            return {
+                "size": self.size,
+                "threads_per_engine": self.threads_per_engine,
+                "requests_per_engine": self.requests_per_engine,
+                "idle": idle,
+                "in_use": self._slots - idle,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": self._wait_sec / self._checkouts * 1000 if self._checkouts else 0.0,
+                "max_wait_ms": self._max_wait_sec * 1000,
+            }
@@ -1,88 +1,125 @@
 # tts_queue_service.py
 import os
-import platform
 import queue
-import subprocess
 import threading
 import time
-from typing import Optional, Tuple
+from collections import deque
+from typing import Optional
 
-import numpy as np
-from scipy.io import wavfile
 
+from tts_audio_sink import AudioSink, latency_stats, open_sink
 from tts_engine import TTSEngine
+from tts_filler import FillerBank, FillerScheduler
 
 
 class TTSQueueService:
-    def __init__(self):
+    def __init__(self, sink: Optional[AudioSink] = None):
         self.base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
         self.engine = TTSEngine(
             onnx_dir=os.path.join(self.base_dir, "assets", "onnx"),
             voice_style_path=os.path.join(self.base_dir, "assets", "voice_styles", "M1.json"),
+            pipeline=True,  # 다음 문장의 encode/denoise를 현재 문장의 vocoding과 겹쳐 실행
         )
 
-        self.filler_wav = os.path.join(self.base_dir, "assets", "fillers", "um.wav")
-        self.temp_dir = os.path.join(os.path.dirname(__file__), "..", "_tmp_audio")
-        os.makedirs(self.temp_dir, exist_ok=True)
+        # 출력 stream 하나를 계속 열어 둠 → producer가 합성한 PCM을 바로 씀 (consumer 스레드 없음)
+        self.sink = sink or open_sink(self.engine.sample_rate)
 
-        # 텍스트 큐 (LLM → TTS)
-        self._text_q: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=20)
-        # 오디오 큐 (Producer → Consumer)
-        self._audio_q: "queue.Queue[Optional[Tuple[int, str, str]]]" = queue.Queue(maxsize=3)
+        # filler bank(assets/fillers/*.wav)를 메모리에 올려 두고 예상 첫 소리 지연이 길 때만 재생
+        self.filler_dir = os.path.join(self.base_dir, "assets", "fillers")
+        self.fillers = FillerScheduler(
+            self.engine.step_policy,
+            FillerBank.from_dir(self.filler_dir, self.engine.sample_rate),
+        )
+        self._request_at = 0.0
+
+        # 텍스트 큐 (LLM → TTS): (텍스트, 답변의 첫 텍스트 여부), None은 답변 끝 표시(end_reply)
+        self._text_q: "queue.Queue[Optional[tuple[str, bool]]]" = queue.Queue(maxsize=20)
+
+        # 답변 진행 상태는 producer 스레드 밖에 둠 (producer는 잠깐 쉬면 종료했다가 다시 시작됨)
+        # → 답변 도중 재시작돼도 filler/빠른 tier가 다시 적용되지 않음, end_reply()/stop()에서만 초기화
+        self._in_reply = False
 
         self._stop_event = threading.Event()
         self._producer: Optional[threading.Thread] = None
-        self._consumer: Optional[threading.Thread] = None
         self._lock = threading.Lock()
 
+        # stop() → 합성 스레드 종료까지 걸린 시간(초) (무음까지의 시간은 sink가 측정)
+        self._stop_at = 0.0
+        self._abort_latency: deque = deque(maxlen=256)
+
     # -----------------------------
     # Public
     # -----------------------------
     def is_running(self) -> bool:
+        # 생성이 끝났어도 sink에 재생할 오디오가 남아 있으면 실행 중
         return (
             self._producer is not None and self._producer.is_alive()
-        ) or (
-            self._consumer is not None and self._consumer.is_alive()
-        )
+        ) or self.sink.buffered_sec > 0
 
     def is_idle(self) -> bool:
-        return (
-            self._text_q.empty()
-            and self._audio_q.empty()
-            and not self.is_running()
-        )
-
-    def start_if_needed(self) -> None:
+        return self._text_q.empty() and not self.is_running()
+
+    def audio_stats(self) -> dict:
+        """sink underrun / latency, stop → 무음 / stop → 합성 중단 지연, filler 선택 통계"""
+        return {
+            **self.sink.stats(),
+            **latency_stats("synth_abort", self._abort_latency),
+            "filler": self.fillers.stats(),
+        }
+
+    def start_if_needed(self, first_text: Optional[str] = None) -> None:
+        """producer가 없으면 시작, first_text(첫 텍스트)로 filler 재생 여부 결정"""
         with self._lock:
-            if self.is_running():
+            # 중단 중인(stop 후 아직 끝나지 않은) producer는 기다리지 않고 새로 시작
+            if (
+                self._producer is not None
+                and self._producer.is_alive()
+                and not self._stop_event.is_set()
+            ):
                 return
 
-            self._stop_event.clear()
+            # 실행마다 새 Event → 이전 producer가 새 실행의 clear()에 되살아나지 않음
+            self._stop_event = threading.Event()
+            # 이 실행의 write는 이후 stop()(set → sink.clear())이 있으면 sink가 모두 버림
+            generation = self.sink.generation
+
+            # filler는 답변 시작 시 1회만 (아직 재생 중인 오디오가 충분하면 생략)
+            # 합성된 첫 청크는 같은 stream에서 filler 뒤에 바로 이어서 재생
+            if first_text is not None:
+                self._play_filler(first_text, generation)
 
             self._producer = threading.Thread(
                 target=self._producer_loop,
+                args=(self._stop_event, generation),
                 daemon=True
             )
-            self._consumer = threading.Thread(
-                target=self._consumer_loop,
-                daemon=True
-            )
-
             self._producer.start()
-            self._consumer.start()
-
-            # filler는 최초 1회만
-            threading.Thread(target=self._play_filler_once, daemon=True).start()
 
     def enqueue(self, text: str) -> None:
+        """답변 텍스트 추가 (답변의 첫 텍스트면 filler 판단 + 빠른 tier로 시작)"""
         text = (text or "").strip()
         if not text:
             return
-        self.start_if_needed()
-        self._text_q.put(text)
+        with self._lock:
+            reply_start = not self._in_reply
+            self._in_reply = True
+            if reply_start:
+                self._request_at = time.time()
+        self.start_if_needed(text if reply_start else None)
+        self._text_q.put((text, reply_start))
+
+    def end_reply(self) -> None:
+        """답변 끝 (LLM 스트림 종료) → 다음 enqueue는 새 답변, 남은 오디오 뒤의 공백은 underrun이 아님"""
+        with self._lock:
+            if not self._in_reply:
+                return
+            self._in_reply = False
+        self._text_q.put(None)
 
     def stop(self) -> None:
+        """barge-in: 재생은 즉시 멈추고, 진행 중인 합성은 다음 denoising step 전에 중단"""
+        self._stop_at = time.perf_counter()
         self._stop_event.set()
         try:
             while True:
@@ -90,85 +127,69 @@ class TTSQueueService:
         except queue.Empty:
             pass
 
-        try:
-            while True:
-                self._audio_q.get_nowait()
-        except queue.Empty:
-            pass
+        self.sink.clear()
+        # 답변 중단 → 다음 enqueue는 새 답변 (lock은 filler write가 끝날 때까지 잡혀 있을 수 있어 clear 뒤에)
+        with self._lock:
+            self._in_reply = False
 
     # -----------------------------
     # Internal
     # -----------------------------
-    def _play_wav(self, path: str) -> None:
-        system = platform.system()
-        try:
-            if system == "Windows":
-                import winsound
-                winsound.PlaySound(path, winsound.SND_FILENAME)
-            elif system == "Darwin":
-                subprocess.run(["afplay", path], check=False)
-            else:
-                subprocess.run(["aplay", path], check=False)
-        except Exception as e:
-            print(f"⚠️ 재생 실패: {e}")
-
-    def _play_filler_once(self) -> None:
-        if not self._stop_event.is_set() and os.path.exists(self.filler_wav):
-            self._play_wav(self.filler_wav)
+    def _play_filler(self, first_text: str, generation: int) -> None:
+        if self._stop_event.is_set():
+            return
+        choice = self.fillers.plan(first_text, self.sink.buffered_sec)
+        if choice is not None:
+            self.sink.write(choice[1], generation=generation)
 
     # -----------------------------
-    # Producer: 합성 전용
+    # Producer: 합성 → sink
     # -----------------------------
-    def _producer_loop(self) -> None:
+    def _producer_loop(self, stop_event: threading.Event, generation: int) -> None:
         idx = 0
 
-        while not self._stop_event.is_set():
+        while not stop_event.is_set():
             try:
-                text = self._text_q.get(timeout=0.2)
+                item = self._text_q.get(timeout=0.2)
             except queue.Empty:
                 if self._text_q.empty():
                     break
                 continue
 
-            idx += 1
-            start = time.time()
-            wav_parts = []
-
-            for wav, _ in self.engine.synthesize_streaming(text):
-                if self._stop_event.is_set():
-                    return
-                wav_parts.append(wav)
-
-            if not wav_parts:
+            if item is None:
+                # 답변 끝: 남은 오디오를 재생한 뒤 buffer가 비는 것은 underrun이 아님
+                self.sink.end_of_stream()
                 continue
 
-            elapsed = time.time() - start
+            text, reply_start = item
+            idx += 1
+            start = time.time()
             preview = text.replace("\n", " ")[:60]
+            first_audio = reply_start
+
+            # 답변의 첫 텍스트만 빠른 tier로 시작, 이후는 sink에 남은 재생 대기 오디오 기준으로 tier 조절
+            for wav, _ in self.engine.synthesize_streaming(
+                text,
+                reply_start=reply_start,
+                buffered_sec=lambda: self.sink.buffered_sec,
+                cancel=stop_event
+            ):
+                # stop() 뒤에 끝난 청크는 generation이 달라 sink가 버림 (확인과 write 사이 경합 없음)
+                if not self.sink.write(wav, generation=generation):
+                    break
+                if first_audio:
+                    # 실제 첫 소리 지연 → 다음 filler 결정의 예측 보정
+                    self.fillers.observe(text, time.time() - self._request_at)
+                    first_audio = False
+            if stop_event.is_set():
+                self._abort_latency.append(time.perf_counter() - self._stop_at)
+                return
 
-            merged = np.concatenate(wav_parts, axis=0)
-            temp_file = os.path.join(self.temp_dir, f"chunk_{idx}.wav")
-            wavfile.write(temp_file, self.engine.sample_rate, merged)
-
+            elapsed = time.time() - start
             print(f"[TTS GEN {idx:02d}] {preview} ({elapsed:.2f}s)")
-            self._audio_q.put((idx, preview, temp_file))
-
-        self._audio_q.put(None)
-
-    # -----------------------------
-    # Consumer: 재생 전용
-    # -----------------------------
-    def _consumer_loop(self) -> None:
-        while True:
-            item = self._audio_q.get()
-            if item is None:
-                break
 
-            idx, preview, wav_path = item
-            print(f"[TTS PLAY {idx:02d}] {preview}")
-            self._play_wav(wav_path)
-
-            if os.path.exists(wav_path):
-                try:
-                    os.remove(wav_path)
-                except Exception:
-                    pass
+        # 답변 도중 잠깐 쉬어서 종료한 경우는 그대로 둠 (다음 텍스트가 늦으면 underrun으로 집계)
+        with self._lock:
+            in_reply = self._in_reply
+        if not stop_event.is_set() and not in_reply:
+            self.sink.end_of_stream()
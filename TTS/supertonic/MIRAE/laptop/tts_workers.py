@@ -0,0 +1,431 @@
+# tts_workers.py
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Iterator, Optional
+
+import numpy as np
+from scipy.io import wavfile
+
+from tts_output import encode_audio
+
+# 부모 → 워커 메시지 종류
+_JOB = "job"
+_CANCEL = "cancel"
+
+# 워커 → 부모 메시지 종류
+_READY = "ready"
+_HEARTBEAT = "heartbeat"
+_CHUNK = "chunk"
+_DONE = "done"
+_ERROR = "error"
+
+
+# --------------------------------------------------
+# 워커 프로세스 쪽
+# --------------------------------------------------
+def _put_pcm(wav: np.ndarray) -> tuple[Optional[str], int]:
+    """float32 PCM을 새 shared memory segment에 복사 → (segment 이름, 샘플 수), 해제는 부모가 담당"""
+    wav = np.ascontiguousarray(wav, dtype=np.float32).reshape(-1)
+    if wav.size == 0:
+        return None, 0
+    shm = shared_memory.SharedMemory(create=True, size=wav.nbytes)
+    np.ndarray(wav.shape, dtype=np.float32, buffer=shm.buf)[:] = wav
+    name = shm.name
+    shm.close()
+    return name, wav.size
+
+
+def _worker_main(
+    wid: int,
+    onnx_dir: str,
+    voice_style_path: str,
+    engine_kwargs: dict,
+    requests: mp.Queue,
+    results: mp.Queue,
+    heartbeat_sec: float,
+) -> None:
+    # 무거운 import/모델 로딩은 워커 프로세스 안에서만
+    from tts_engine import TTSEngine
+
+    engine = TTSEngine(onnx_dir, voice_style_path, **engine_kwargs)
+    results.put((_READY, wid, None, (engine.sample_rate, engine.startup_stats)))
+
+    # 요청 채널은 별도 스레드가 읽음 → 합성 중에도 cancel 메시지를 바로 반영
+    jobs: queue.Queue = queue.Queue()
+    cancels: dict[int, threading.Event] = {}
+    cancels_lock = threading.Lock()
+
+    def read_requests() -> None:
+        while True:
+            req = requests.get()
+            if req is None:
+                jobs.put(None)
+                return
+            if req[0] == _CANCEL:
+                with cancels_lock:
+                    event = cancels.get(req[1])
+                if event is not None:
+                    event.set()
+                continue
+            _, rid, text, stream, kwargs = req
+            with cancels_lock:
+                cancels[rid] = threading.Event()
+            jobs.put((rid, text, stream, kwargs))
+
+    threading.Thread(target=read_requests, daemon=True).start()
+
+    # heartbeat는 합성 루프(이 스레드)에서만 보냄: 대기 중에는 heartbeat_sec마다,
+    # 합성 중에는 청크마다 (stream은 yield된 청크, 일반 합성은 on_chunk 콜백)
+    # → session.run 안에서 멈춘 워커는 heartbeat가 끊겨 부모가 재시작
+    def heartbeat() -> None:
+        results.put((_HEARTBEAT, wid, None, None))
+
+    while True:
+        try:
+            job = jobs.get(timeout=heartbeat_sec)
+        except queue.Empty:
+            heartbeat()
+            continue
+        if job is None:
+            break
+        rid, text, stream, kwargs = job
+        with cancels_lock:
+            cancel = cancels[rid]
+        try:
+            if cancel.is_set():
+                pass
+            elif stream:
+                # cancel이 set되면 다음 denoising step 전에 조용히 종료
+                for wav, idx in engine.synthesize_streaming(text, cancel=cancel, **kwargs):
+                    results.put((_CHUNK, wid, rid, (*_put_pcm(wav), idx)))
+            else:
+                wav = engine.synthesize_audio(text, "float32", on_chunk=heartbeat, **kwargs)
+                results.put((_CHUNK, wid, rid, (*_put_pcm(wav), 1)))
+            results.put((_DONE, wid, rid, None))
+        except Exception as e:
+            results.put((_ERROR, wid, rid, f"{type(e).__name__}: {e}"))
+        finally:
+            with cancels_lock:
+                cancels.pop(rid, None)
+
+
+# --------------------------------------------------
+# 부모 프로세스 쪽
+# --------------------------------------------------
+def _take_pcm(name: Optional[str], n: int) -> np.ndarray:
+    if name is None:
+        return np.zeros(0, dtype=np.float32)
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray((n,), dtype=np.float32, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+class _Worker:
+    def __init__(self, wid: int):
+        self.wid = wid
+        self.process: Optional[mp.Process] = None
+        self.requests: Optional[mp.Queue] = None
+        self.ready = False
+        self.last_heartbeat = 0.0
+        self.started = 0.0
+        self.restarts = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.inflight: set[int] = set()
+        self.startup_stats: dict = {}
+
+
+class TTSWorkerFarm:
+    """
+    TTSEngine을 별도 프로세스(워커)들에서 실행하는 worker farm
+    - 부모 프로세스(FastAPI/ASR event loop)는 요청 전달과 결과 수신만 → 전처리/denoising loop와 GIL 경쟁 없음
+    - 요청: 워커별 multiprocessing Queue (in-flight가 가장 적은 ready 워커로 배정)
+    - 결과 PCM: 워커가 shared memory segment에 쓰고 이름만 전달 (waveform을 pickle하지 않음)
+    - 취소: synthesize_streaming(cancel=Event)이 set되거나 generator가 닫히면 워커에 cancel 메시지
+      → 워커는 다음 denoising step 전에 합성을 멈추고 다음 요청으로 넘어감 (barge-in)
+    - health: 워커의 합성 루프가 대기 중에는 heartbeat_sec마다, 합성 중에는 청크마다 신호를 보냄
+      (streaming은 yield된 청크마다, 일반 합성(synthesize/synthesize_audio)은 chunk_text 청크마다)
+      프로세스가 죽거나 신호가 heartbeat_timeout 이상 끊기면(session.run에서 멈춤 등) 재시작하고
+      그 워커의 진행 중 요청은 RuntimeError로 실패 처리
+      (heartbeat_timeout은 가장 긴 청크 1개 합성 시간보다 길게)
+    - stats(): 워커별 pid / ready / 재시작 횟수 / queue depth(in-flight) / 완료 / 취소 수
+    """
+
+    def __init__(
+        self,
+        onnx_dir: str,
+        voice_style_path: str,
+        workers: int = 2,
+        heartbeat_sec: float = 1.0,
+        heartbeat_timeout: float = 30.0,
+        start_timeout: Optional[float] = 300.0,
+        **engine_kwargs
+    ):
+        self.onnx_dir = onnx_dir
+        self.voice_style_path = voice_style_path
+        self.engine_kwargs = engine_kwargs
+        self.heartbeat_sec = heartbeat_sec
+        self.heartbeat_timeout = heartbeat_timeout
+
+        # CUDA/ORT 상태를 fork로 물려받지 않도록 spawn
+        self._ctx = mp.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._lock = threading.Lock()
+        self._ready_cond = threading.Condition(self._lock)
+        self._pending: dict[int, queue.Queue] = {}
+        self._cancelled: set[int] = set()
+        self._ids = itertools.count(1)
+        self._closed = False
+        self.sample_rate: Optional[int] = None
+        self.startup_stats: dict = {}
+
+        self._workers = [_Worker(wid) for wid in range(workers)]
+        for w in self._workers:
+            self._start(w)
+
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+        self._monitor = threading.Thread(target=self._watch, daemon=True)
+        self._monitor.start()
+
+        if start_timeout is not None and not self.wait_ready(start_timeout):
+            raise TimeoutError(f"TTS workers not ready within {start_timeout}s")
+
+        self.startup_stats = self._workers[0].startup_stats
+
+    # --------------------------------------------------
+    # Public
+    # --------------------------------------------------
+    def submit(self, text: str, stream: bool = False, **kwargs) -> tuple[int, queue.Queue]:
+        """요청을 워커에 배정 → (요청 id, 결과 이벤트 queue) (내부용, synthesize*/synthesize_streaming 사용 권장)"""
+        rid = next(self._ids)
+        events: queue.Queue = queue.Queue()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("TTSWorkerFarm is closed")
+            worker = min(
+                self._workers, key=lambda w: (not w.ready, len(w.inflight), w.wid)
+            )
+            worker.inflight.add(rid)
+            self._pending[rid] = events
+            worker.requests.put((_JOB, rid, text, stream, kwargs))
+        return rid, events
+
+    def cancel(self, rid: int) -> None:
+        """요청 취소: 결과는 더 받지 않고(shared memory는 해제) 워커에 cancel 메시지 전송"""
+        with self._lock:
+            if self._pending.pop(rid, None) is None:
+                return
+            for w in self._workers:
+                if rid in w.inflight:
+                    self._cancelled.add(rid)
+                    w.requests.put((_CANCEL, rid))
+                    break
+
+    def synthesize_array(self, text: str, timeout: Optional[float] = None, **kwargs) -> np.ndarray:
+        """전체 텍스트 → float32 PCM (TTSEngine.synthesize와 같은 kwargs)"""
+        _, events = self.submit(text, **kwargs)
+        chunks = [wav for wav, _ in self._iter_events(events, timeout)]
+        return chunks[0] if chunks else np.zeros(0, dtype=np.float32)
+
+    def synthesize_audio(
+        self,
+        text: str,
+        format: str = "float32",
+        target_rate: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **kwargs
+    ):
+        """TTSEngine.synthesize_audio와 같음 (형식 변환/resampling은 부모 프로세스에서)"""
+        wav = self.synthesize_array(text, timeout, **kwargs)
+        return encode_audio(wav, self.sample_rate, format, target_rate)
+
+    def synthesize(self, text: str, output_path: str, timeout: Optional[float] = None, **kwargs):
+        wavfile.write(output_path, self.sample_rate, self.synthesize_array(text, timeout, **kwargs))
+        return output_path
+
+    def synthesize_streaming(
+        self,
+        text: str,
+        timeout: Optional[float] = None,
+        cancel: Optional[threading.Event] = None,
+        **kwargs
+    ) -> Iterator[tuple[np.ndarray, int]]:
+        """
+        TTSEngine.synthesize_streaming과 같은 (wav, idx)를 워커에서 받아 yield
+        - cancel이 set되거나 generator가 중간에 닫히면 워커의 합성도 취소하고 종료
+        """
+        rid, events = self.submit(text, stream=True, **kwargs)
+        finished = False
+        try:
+            yield from self._iter_events(events, timeout, cancel)
+            finished = cancel is None or not cancel.is_set()
+        finally:
+            if not finished:
+                self.cancel(rid)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        with self._ready_cond:
+            return self._ready_cond.wait_for(
+                lambda: all(w.ready for w in self._workers), timeout
+            )
+
+    def is_ready(self) -> bool:
+        with self._lock:
+            return all(w.ready for w in self._workers)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "workers": [
+                    {
+                        "id": w.wid,
+                        "pid": w.process.pid if w.process is not None else None,
+                        "alive": w.process is not None and w.process.is_alive(),
+                        "ready": w.ready,
+                        "restarts": w.restarts,
+                        "queue_depth": len(w.inflight),
+                        "completed": w.completed,
+                        "failed": w.failed,
+                        "cancelled": w.cancelled,
+                        "heartbeat_age_sec": now - w.last_heartbeat if w.ready else None,
+                    }
+                    for w in self._workers
+                ],
+                "pending": len(self._pending),
+            }
+
+    def close(self, timeout: float = 10.0) -> None:
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+        for w in workers:
+            w.requests.put(None)
+        for w in workers:
+            w.process.join(timeout)
+            if w.process.is_alive():
+                w.process.terminate()
+        self._results.put(None)
+        self._collector.join(timeout)
+
+    # --------------------------------------------------
+    # Internal
+    # --------------------------------------------------
+    def _start(self, w: _Worker) -> None:
+        w.requests = self._ctx.Queue()
+        w.ready = False
+        w.started = w.last_heartbeat = time.monotonic()
+        w.process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                w.wid, self.onnx_dir, self.voice_style_path, self.engine_kwargs,
+                w.requests, self._results, self.heartbeat_sec,
+            ),
+            name=f"tts-worker-{w.wid}",
+            daemon=True,
+        )
+        w.process.start()
+
+    def _iter_events(
+        self,
+        events: queue.Queue,
+        timeout: Optional[float],
+        cancel: Optional[threading.Event] = None,
+    ):
+        """cancel이 있으면 짧게 나눠 기다리며 확인 (set되면 조용히 종료, 취소 메시지는 호출 쪽이 전송)"""
+        while True:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                if cancel is not None and cancel.is_set():
+                    return
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"TTS worker did not respond within {timeout}s")
+                wait = remaining if cancel is None else min(0.02, remaining or 0.02)
+                try:
+                    kind, payload = events.get(timeout=wait)
+                    break
+                except queue.Empty:
+                    continue
+            if kind == _CHUNK:
+                yield payload
+            elif kind == _DONE:
+                return
+            else:
+                raise RuntimeError(payload)
+
+    def _collect(self) -> None:
+        """결과 queue → 요청별 이벤트 queue (shared memory PCM은 여기서 꺼내고 해제)"""
+        while True:
+            msg = self._results.get()
+            if msg is None:
+                break
+            kind, wid, rid, payload = msg
+            with self._lock:
+                w = self._workers[wid]
+                w.last_heartbeat = time.monotonic()
+                if kind == _READY:
+                    w.ready = True
+                    self.sample_rate, w.startup_stats = payload
+                    self._ready_cond.notify_all()
+                    continue
+                if kind == _HEARTBEAT:
+                    continue
+                events = self._pending.get(rid)
+                if kind in (_DONE, _ERROR):
+                    self._pending.pop(rid, None)
+                    w.inflight.discard(rid)
+                    if rid in self._cancelled:
+                        self._cancelled.discard(rid)
+                        w.cancelled += 1
+                    elif kind == _DONE:
+                        w.completed += 1
+                    else:
+                        w.failed += 1
+
+            if kind == _CHUNK:
+                name, n, idx = payload
+                wav = _take_pcm(name, n)  # 요청이 이미 실패 처리됐어도 segment는 해제
+                if events is not None:
+                    events.put((_CHUNK, (wav, idx)))
+            elif events is not None:
+                events.put((kind, payload))
+
+    def _watch(self) -> None:
+        """죽었거나 heartbeat가 끊긴 워커 재시작, 진행 중이던 요청은 실패 처리"""
+        while True:
+            time.sleep(self.heartbeat_sec)
+            now = time.monotonic()
+            with self._lock:
+                if self._closed:
+                    return
+                for w in self._workers:
+                    alive = w.process.is_alive()
+                    # 로딩 중(ready 전)에는 heartbeat가 없으므로 프로세스 생존만 확인
+                    stalled = w.ready and now - w.last_heartbeat > self.heartbeat_timeout
+                    if alive and not stalled:
+                        continue
+
+                    reason = "exited" if not alive else "stopped sending heartbeats"
+                    print(f"[WARN] TTS worker {w.wid} (pid {w.process.pid}) {reason} → 재시작")
+                    if alive:
+                        w.process.kill()
+                    w.process.join()
+                    for rid in w.inflight:
+                        self._cancelled.discard(rid)
+                        events = self._pending.pop(rid, None)
+                        if events is not None:
+                            events.put((_ERROR, f"TTS worker {w.wid} {reason}"))
+                    w.failed += len(w.inflight)
+                    w.inflight.clear()
+                    w.restarts += 1
+                    self._start(w)
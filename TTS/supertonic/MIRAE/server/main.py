@@ -105,3 +105,9 @@ def speak(text: str = Form(...)):
 def stop():
     tts_service.stop()
     return {"status": "stopped"}
+
+
+@app.get("/audio-stats")
+def audio_stats():
+    # 재생 underrun / stop → 무음, stop → 합성 중단 지연
+    return tts_service.audio_stats()
@@ -122,6 +122,8 @@ def _llm_worker(user_text: str) -> None:
         print("LLM ERROR:", e)
 
     finally:
+        # 답변 끝 표시 → 다음 질문의 첫 텍스트에서만 filler/빠른 tier 적용
+        tts.end_reply()
         _llm_done_event.set()
 
 
@@ -279,3 +281,9 @@ def status():
         "state": state,
         "text": _get_latest_text()
     })
+
+
+@app.get("/audio-stats")
+def audio_stats():
+    # 재생 underrun / stop → 무음, stop → 합성 중단 지연
+    return JSONResponse(tts.audio_stats())
@@ -25,22 +25,26 @@ transcription_engine = None
 tts_engine = None
 SUPERTONIC_AVAILABLE = False
 
-# TTS 엔진 로드
+# TTS 엔진 로드: 이 저장소의 TTS/supertonic 패키지 (worker farm은 여기에만 있음)
+# 실패해도 ASR 서버는 그대로 뜨고 /tts는 503 → 클라이언트가 gTTS로 폴백
+TTS_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "TTS", "supertonic"))
+TTS_ONNX_DIR = os.path.join(TTS_ROOT, "assets", "onnx")
+TTS_VOICE_STYLE = os.path.join(TTS_ROOT, "assets", "voice_styles", "M1.json")
+TTS_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "TTS_output")
+# TTS는 별도 프로세스에서 실행 → WhisperLiveKit/WebSocket 처리와 GIL을 나눠 쓰지 않음
+TTS_WORKERS = 1
 try:
-    sys.path.append(os.path.join(os.path.dirname(__file__), "TTS", "supertonic2", "MIRAE", "laptop"))
-    from tts_engine import TTSEngine
-    from scipy.io import wavfile
+    sys.path.append(os.path.join(TTS_ROOT, "MIRAE", "laptop"))
+    from tts_workers import TTSWorkerFarm
 
-    TTS_ONNX_DIR = os.path.join(os.path.dirname(__file__), "TTS", "supertonic2", "onnx")
-    TTS_VOICE_STYLE = os.path.join(os.path.dirname(__file__), "TTS", "supertonic2", "voice_styles", "M1.json")
-    TTS_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "TTS_output")
     os.makedirs(TTS_OUTPUT_DIR, exist_ok=True)
 
     SUPERTONIC_AVAILABLE = True
-    print("Supertonic2 TTS 사용 가능")
+    print("Supertonic TTS 사용 가능")
 except Exception as e:
-    print(f"Supertonic2 로드 실패: {e}")
-    print("TTS 기능이 비활성화됩니다")
+    print(f"Supertonic TTS 로드 실패 ({TTS_ROOT}/MIRAE/laptop): {e}")
+    print("→ pip install -r TTS/supertonic/supertonic_requirements.txt")
+    print("TTS 기능이 비활성화됩니다 (/tts는 503, 클라이언트는 gTTS로 폴백)")
 
 
 def serialize_response(obj):
@@ -94,13 +98,21 @@ async def lifespan(app: FastAPI):
     if SUPERTONIC_AVAILABLE:
         print("\n[TTS] Supertonic2 초기화 중...")
         try:
-            tts_engine = TTSEngine(
+            tts_engine = TTSWorkerFarm(
                 onnx_dir=TTS_ONNX_DIR,
-                voice_style_path=TTS_VOICE_STYLE
+                voice_style_path=TTS_VOICE_STYLE,
+                workers=TTS_WORKERS
             )
-            print("[TTS] 초기화 완료!")
+            print(f"[TTS] 초기화 완료! (워커 프로세스 {TTS_WORKERS}개)")
             print(f"- 샘플링 레이트: {tts_engine.sample_rate} Hz")
             print(f"- 음성 스타일: M1")
+            stats = tts_engine.startup_stats
+            print(f"- 모델 로딩: {stats['load_sec']:.2f}초")
+            if tts_engine.is_ready():
+                print(
+                    f"- warmup 완료 (cold {stats['warmup_cold_sec']:.2f}초 → "
+                    f"steady {stats['warmup_steady_sec']:.2f}초), 첫 응답 지연 안정화"
+                )
         except Exception as e:
             print(f"[TTS] 초기화 실패: {e}")
             tts_engine = None
@@ -111,6 +123,8 @@ async def lifespan(app: FastAPI):
     yield
 
     print("서버 종료 중...")
+    if tts_engine is not None:
+        tts_engine.close()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -328,11 +342,9 @@ async def text_to_speech(request: dict):
 
         # TTS 생성
         print(f"[TTS] 음성 생성 중: {text[:50]}...")
-        for wav, idx in tts_engine.synthesize_streaming(text):
-            # 첫 번째 청크 저장 (전체 텍스트)
-            wavfile.write(output_path, tts_engine.sample_rate, wav)
-            print(f"[TTS] 음성 저장 완료: {output_path}")
-            break
+        # 워커 결과를 기다리는 동안 event loop(ASR WebSocket)를 막지 않도록 스레드에서 대기
+        await asyncio.to_thread(tts_engine.synthesize, text, output_path)
+        print(f"[TTS] 음성 저장 완료: {output_path}")
 
         # 파일 반환
         return FileResponse(
@@ -349,6 +361,14 @@ async def text_to_speech(request: dict):
         )
 
 
+@app.get("/tts-workers")
+async def tts_workers():
+    """TTS 워커 프로세스 상태 (pid, ready, 재시작 횟수, queue depth)"""
+    if tts_engine is None:
+        return JSONResponse(status_code=503, content={"error": "TTS 엔진이 사용 불가능합니다"})
+    return tts_engine.stats()
+
+
 async def handle_websocket_results(websocket: WebSocket, results_generator, connection_active):
     """WebSocket으로 결과 전송"""
     try: